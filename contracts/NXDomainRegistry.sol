@@ -93,6 +93,7 @@ contract NXDomainRegistry is ERC721URIStorage, AccessControl, ReentrancyGuard, P
     uint256 public constant NXD_DECIMALS = 18;
     uint256 public constant BASIS_POINTS = 10000;
     uint256 public constant MIN_TLD_STAKE = 100_000 * 10**NXD_DECIMALS;
+    uint256 public constant MAX_BATCH_REGISTRATIONS = 50;
 
     // Events
     event DomainRegistered(
@@ -227,6 +228,46 @@ contract NXDomainRegistry is ERC721URIStorage, AccessControl, ReentrancyGuard, P
         bool _payWithNXD,
         uint256 _whiteLabelId
     ) external payable nonReentrant whenNotPaused {
+        uint256 registrationFee = _registerDomain(_name, _tld, _ipfsHash, _subscriptionTier, _payWithNXD, _whiteLabelId);
+        if (!_payWithNXD) {
+            require(msg.value >= registrationFee, "Insufficient payment");
+        }
+    }
+
+    /**
+     * @dev Register several domains in one transaction; ETH payments cover the summed fees
+     */
+    function registerDomainsBatch(
+        string[] calldata _names,
+        string[] calldata _tlds,
+        string[] calldata _ipfsHashes,
+        uint256 _subscriptionTier,
+        bool _payWithNXD,
+        uint256 _whiteLabelId
+    ) external payable nonReentrant whenNotPaused {
+        require(_names.length > 0 && _names.length <= MAX_BATCH_REGISTRATIONS, "Invalid batch size");
+        require(_names.length == _tlds.length && _names.length == _ipfsHashes.length, "Batch length mismatch");
+
+        uint256 totalFee = 0;
+        for (uint256 i = 0; i < _names.length; i++) {
+            totalFee += _registerDomain(_names[i], _tlds[i], _ipfsHashes[i], _subscriptionTier, _payWithNXD, _whiteLabelId);
+        }
+        if (!_payWithNXD) {
+            require(msg.value >= totalFee, "Insufficient payment");
+        }
+    }
+
+    /**
+     * @dev Mint one domain to the caller; takes NXD payments and returns the ETH fee owed
+     */
+    function _registerDomain(
+        string memory _name,
+        string memory _tld,
+        string memory _ipfsHash,
+        uint256 _subscriptionTier,
+        bool _payWithNXD,
+        uint256 _whiteLabelId
+    ) internal returns (uint256) {
         string memory fullDomain = string(abi.encodePacked(_name, ".", _tld));
         require(domainToTokenId[fullDomain] == 0, "Domain already registered");
         require(tlds[_tld].isActive, "TLD not active");
@@ -244,8 +285,6 @@ contract NXDomainRegistry is ERC721URIStorage, AccessControl, ReentrancyGuard, P
             // Burn 10% of NXD payment
             uint256 burnAmount = nxdPrice / 10;
             nxdToken.burnFromFees(burnAmount, "Domain registration fee burn");
-        } else {
-            require(msg.value >= registrationFee, "Insufficient payment");
         }
 
         // Create domain
@@ -268,6 +307,8 @@ contract NXDomainRegistry is ERC721URIStorage, AccessControl, ReentrancyGuard, P
         _setTokenURI(tokenId, _ipfsHash);
 
         emit DomainRegistered(tokenId, _name, _tld, msg.sender, _subscriptionTier, _whiteLabelId, _payWithNXD);
+
+        return registrationFee;
     }
 
     /**
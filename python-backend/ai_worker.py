@@ -0,0 +1,46 @@
+"""
+NXD Platform AI Worker
+Consumes queued autonomous AI decisions; run as many copies as needed against one Redis
+"""
+import asyncio
+import signal
+
+import structlog
+
+from api.ai import AUTONOMOUS_DECISION_JOB
+from core.config import settings
+from services.ai_gateway import AIGateway
+from services.job_queue import JobWorker, get_job_queue
+
+logger = structlog.get_logger()
+
+def build_worker(ai_gateway: AIGateway) -> JobWorker:
+    """Worker wired to the AI gateway's job handlers"""
+    return JobWorker(
+        get_job_queue(),
+        {AUTONOMOUS_DECISION_JOB: ai_gateway.run_decision_job},
+        concurrency=settings.AI_JOB_WORKER_CONCURRENCY,
+        lease_seconds=settings.AI_JOB_LEASE_SECONDS
+    )
+
+async def main():
+    ai_gateway = AIGateway()
+    await ai_gateway.startup()
+    worker = build_worker(ai_gateway)
+
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    logger.info("AI worker started", concurrency=worker.concurrency)
+    worker.start()
+    await stopping.wait()
+
+    logger.info("AI worker stopping")
+    await worker.stop()
+    await ai_gateway.shutdown()
+    await get_job_queue().close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
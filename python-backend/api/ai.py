@@ -2,13 +2,19 @@
 AI Integration API Routes
 Handles AI-powered features and autonomous operations
 """
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, WebSocket, WebSocketDisconnect
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+import asyncio
+import hashlib
 import structlog
 
+from api.dependencies import get_ai_gateway, get_domain_service, get_job_queue
 from services.ai_gateway import AIGateway
+from services.ai_rate_limiter import PRIORITY_AUTONOMOUS
 from services.domain_service import DomainService
+from services.job_queue import JobQueue
+from services.prompt_templates import canonical_json
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/ai", tags=["ai"])
@@ -31,11 +37,36 @@ class AutonomousDecisionRequest(BaseModel):
     decision_type: str  # domain_approval, fee_adjustment, proposal_generation
     context: Dict[str, Any]
     requires_approval: bool = True
+    # Lower values run first; callers may only defer their job, never jump interactive work
+    priority: int = Field(PRIORITY_AUTONOMOUS, ge=PRIORITY_AUTONOMOUS, le=100)
+
+AUTONOMOUS_DECISION_JOB = "autonomous_decision"
+
+def _analysis_response(domain: str, analysis) -> Dict[str, Any]:
+    return {
+        "domain": domain,
+        "analysis": analysis.analysis,
+        "score": analysis.score,
+        "market_insights": analysis.market_insights,
+        "recommendations": analysis.recommendations,
+        "confidence": analysis.confidence
+    }
+
+def _job_response(job) -> Dict[str, Any]:
+    return {
+        "decision_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
 
 @router.post("/chat", response_model=ChatResponse)
 async def ai_chat(
     request: ChatRequest,
-    ai_gateway: AIGateway = Depends(lambda: AIGateway())
+    ai_gateway: AIGateway = Depends(get_ai_gateway)
 ):
     """
     Chat with AI assistant for platform help and domain suggestions
@@ -60,8 +91,8 @@ async def ai_chat(
 @router.post("/analyze/domain")
 async def analyze_domain(
     request: DomainAnalysisRequest,
-    ai_gateway: AIGateway = Depends(lambda: AIGateway()),
-    domain_service: DomainService = Depends(lambda: DomainService())
+    ai_gateway: AIGateway = Depends(get_ai_gateway),
+    domain_service: DomainService = Depends(get_domain_service)
 ):
     """
     Get AI analysis of domain value and market potential
@@ -77,61 +108,111 @@ async def analyze_domain(
             analysis_type=request.analysis_type
         )
         
-        return {
-            "domain": request.domain,
-            "analysis": analysis.analysis,
-            "score": analysis.score,
-            "market_insights": analysis.market_insights,
-            "recommendations": analysis.recommendations,
-            "confidence": analysis.confidence
-        }
+        return _analysis_response(request.domain, analysis)
         
     except Exception as e:
         logger.error("Domain analysis failed", domain=request.domain, error=str(e))
         raise HTTPException(status_code=500, detail="Domain analysis failed")
 
-@router.post("/autonomous/decision")
+@router.websocket("/analyze/domain/ws")
+async def stream_domain_analysis(
+    websocket: WebSocket,
+    ai_gateway: AIGateway = Depends(get_ai_gateway),
+    domain_service: DomainService = Depends(get_domain_service)
+):
+    """
+    Domain analysis streamed while the model writes it: the client sends one analysis
+    request and gets each field as soon as it parses, then the final analysis.
+    Streamed fields are provisional; a provider fallback sends them again.
+    """
+    await websocket.accept()
+    try:
+        request = DomainAnalysisRequest(**await websocket.receive_json())
+    except WebSocketDisconnect:
+        return
+    except (ValueError, TypeError):
+        await websocket.close(code=4400, reason="Invalid analysis request")
+        return
+
+    fields: asyncio.Queue = asyncio.Queue()
+    analysis = None
+    try:
+        domain_data = await domain_service.get_domain_data(request.domain)
+        analysis = asyncio.ensure_future(ai_gateway.analyze_domain(
+            domain=request.domain,
+            domain_data=domain_data,
+            analysis_type=request.analysis_type,
+            on_field=lambda name, value: fields.put_nowait((name, value))
+        ))
+        # None marks the end of the stream
+        analysis.add_done_callback(lambda _: fields.put_nowait(None))
+
+        while True:
+            field = await fields.get()
+            if field is None:
+                break
+            name, value = field
+            await websocket.send_json({"type": "field", "field": name, "value": value})
+        await websocket.send_json({"type": "analysis", **_analysis_response(request.domain, analysis.result())})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("Streamed domain analysis failed", domain=request.domain, error=str(e))
+        await websocket.close(code=1011, reason="Domain analysis failed")
+    finally:
+        if analysis is not None and not analysis.done():
+            analysis.cancel()
+
+@router.post("/autonomous/decision", status_code=202)
 async def autonomous_decision(
     request: AutonomousDecisionRequest,
-    background_tasks: BackgroundTasks,
-    ai_gateway: AIGateway = Depends(lambda: AIGateway())
+    job_queue: JobQueue = Depends(get_job_queue)
 ):
     """
-    Process autonomous AI decisions for platform operations
+    Queue an autonomous AI decision; poll the returned decision id for the result
     """
     try:
-        decision = await ai_gateway.make_autonomous_decision(
-            decision_type=request.decision_type,
-            context=request.context,
-            requires_approval=request.requires_approval
+        payload = {
+            "decision_type": request.decision_type,
+            "context": request.context,
+            "requires_approval": request.requires_approval
+        }
+        # Identical requests share one job while it is queued, running or recently done
+        dedup_key = hashlib.sha256(canonical_json(payload).encode()).hexdigest()
+
+        job = await job_queue.enqueue(
+            AUTONOMOUS_DECISION_JOB,
+            payload,
+            priority=request.priority,
+            dedup_key=dedup_key
         )
         
-        if decision.auto_execute and not request.requires_approval:
-            # Execute decision immediately
-            background_tasks.add_task(
-                ai_gateway.execute_decision,
-                decision
-            )
-            
-        return {
-            "decision_id": decision.id,
-            "decision": decision.action,
-            "confidence": decision.confidence,
-            "reasoning": decision.reasoning,
-            "auto_executed": decision.auto_execute and not request.requires_approval,
-            "requires_approval": decision.requires_approval
-        }
+        return _job_response(job)
         
     except Exception as e:
-        logger.error("Autonomous decision failed", error=str(e))
+        logger.error("Autonomous decision enqueue failed", error=str(e))
         raise HTTPException(status_code=500, detail="Autonomous decision failed")
 
+@router.get("/autonomous/decision/{decision_id}")
+async def get_autonomous_decision(
+    decision_id: str,
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """
+    Poll the status and result of a queued autonomous decision
+    """
+    job = await job_queue.get(decision_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Decision not found")
+    return _job_response(job)
+
 @router.get("/suggestions/domains")
 async def get_domain_suggestions(
     prompt: str,
     category: Optional[str] = None,
     count: int = 10,
-    ai_gateway: AIGateway = Depends(lambda: AIGateway())
+    ai_gateway: AIGateway = Depends(get_ai_gateway)
 ):
     """
     Get AI-powered domain name suggestions
@@ -153,7 +234,7 @@ async def get_domain_suggestions(
 async def get_ai_predictions(
     metric: str,  # domain_registrations, staking_trends, revenue
     timeframe: str = "30d",
-    ai_gateway: AIGateway = Depends(lambda: AIGateway())
+    ai_gateway: AIGateway = Depends(get_ai_gateway)
 ):
     """
     Get AI predictions for platform metrics
@@ -180,7 +261,7 @@ async def get_ai_predictions(
 @router.post("/voice/process")
 async def process_voice_command(
     audio_data: str,  # Base64 encoded audio
-    ai_gateway: AIGateway = Depends(lambda: AIGateway())
+    ai_gateway: AIGateway = Depends(get_ai_gateway)
 ):
     """
     Process voice commands through AI
@@ -202,7 +283,7 @@ async def process_voice_command(
 
 @router.get("/status")
 async def get_ai_status(
-    ai_gateway: AIGateway = Depends(lambda: AIGateway())
+    ai_gateway: AIGateway = Depends(get_ai_gateway)
 ):
     """
     Get AI services status and health
@@ -212,6 +293,7 @@ async def get_ai_status(
         
         return {
             "providers": status.provider_status,
+            "provider_metrics": status.provider_metrics,
             "autonomous_operations": status.autonomous_enabled,
             "decisions_pending": status.pending_decisions,
             "last_prediction": status.last_prediction_time,
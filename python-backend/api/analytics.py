@@ -7,6 +7,7 @@ from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 import structlog
 
+from api.dependencies import get_analytics_service
 from services.analytics_service import AnalyticsService
 
 logger = structlog.get_logger()
@@ -20,7 +21,7 @@ class MetricsRequest(BaseModel):
 @router.get("/dashboard")
 async def get_dashboard_metrics(
     timeframe: Optional[str] = "7d",
-    analytics_service: AnalyticsService = Depends(lambda: AnalyticsService())
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
     Get key dashboard metrics
@@ -36,7 +37,7 @@ async def get_dashboard_metrics(
 @router.get("/domains")
 async def get_domain_analytics(
     timeframe: Optional[str] = "7d",
-    analytics_service: AnalyticsService = Depends(lambda: AnalyticsService())
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
     Get domain registration and search analytics
@@ -76,7 +77,7 @@ async def get_domain_analytics(
 @router.get("/staking")
 async def get_staking_analytics(
     timeframe: Optional[str] = "7d",
-    analytics_service: AnalyticsService = Depends(lambda: AnalyticsService())
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
     Get staking analytics and trends
@@ -269,7 +270,7 @@ async def get_revenue_analytics():
 @router.post("/custom-report")
 async def generate_custom_report(
     request: MetricsRequest,
-    analytics_service: AnalyticsService = Depends(lambda: AnalyticsService())
+    analytics_service: AnalyticsService = Depends(get_analytics_service)
 ):
     """
     Generate custom analytics report
@@ -7,6 +7,7 @@ from typing import List, Optional
 from pydantic import BaseModel
 import structlog
 
+from api.dependencies import get_communication_service
 from services.communication_service import CommunicationService
 
 logger = structlog.get_logger()
@@ -27,7 +28,7 @@ class CallRequest(BaseModel):
 @router.post("/messages")
 async def send_message(
     request: MessageRequest,
-    comm_service: CommunicationService = Depends(lambda: CommunicationService())
+    comm_service: CommunicationService = Depends(get_communication_service)
 ):
     """
     Send encrypted message via Waku network
@@ -56,7 +57,7 @@ async def send_message(
 async def get_messages(
     address: str,
     limit: Optional[int] = 50,
-    comm_service: CommunicationService = Depends(lambda: CommunicationService())
+    comm_service: CommunicationService = Depends(get_communication_service)
 ):
     """
     Get messages for user address
@@ -72,7 +73,7 @@ async def get_messages(
 @router.post("/calls/initiate")
 async def initiate_call(
     request: CallRequest,
-    comm_service: CommunicationService = Depends(lambda: CommunicationService())
+    comm_service: CommunicationService = Depends(get_communication_service)
 ):
     """
     Initiate WebRTC voice/video call
@@ -100,7 +101,7 @@ async def upload_file_to_ipfs(
     file_hash: str,
     file_name: str,
     uploader: str,
-    comm_service: CommunicationService = Depends(lambda: CommunicationService())
+    comm_service: CommunicationService = Depends(get_communication_service)
 ):
     """
     Upload file to IPFS cluster
@@ -135,7 +136,7 @@ async def websocket_endpoint(websocket: WebSocket, user_address: str):
 
 @router.get("/status")
 async def get_communication_status(
-    comm_service: CommunicationService = Depends(lambda: CommunicationService())
+    comm_service: CommunicationService = Depends(get_communication_service)
 ):
     """
     Get communication services status
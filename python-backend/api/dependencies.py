@@ -0,0 +1,57 @@
+"""
+API Dependencies
+Providers for the app-scoped service instances created once in the application lifespan
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from starlette.requests import HTTPConnection
+
+if TYPE_CHECKING:
+    from services.ai_gateway import AIGateway
+    from services.analytics_service import AnalyticsService
+    from services.blockchain_service import BlockchainService
+    from services.communication_service import CommunicationService
+    from services.domain_service import DomainService
+    from services.event_indexer import EventIndexer
+    from services.governance_tally import GovernanceTally
+    from services.ipfs_service import IPFSService
+    from services.job_queue import JobQueue
+    from services.receipt_watcher import ReceiptWatcher
+    from services.voting_power import VotingPowerStore
+
+# HTTPConnection rather than Request so the same providers work in WebSocket routes
+
+def get_ai_gateway(connection: HTTPConnection) -> AIGateway:
+    return connection.app.state.ai_gateway
+
+def get_domain_service(connection: HTTPConnection) -> DomainService:
+    return connection.app.state.domain_service
+
+def get_blockchain_service(connection: HTTPConnection) -> BlockchainService:
+    return connection.app.state.blockchain_service
+
+def get_communication_service(connection: HTTPConnection) -> CommunicationService:
+    return connection.app.state.communication_service
+
+def get_analytics_service(connection: HTTPConnection) -> AnalyticsService:
+    return connection.app.state.analytics_service
+
+def get_ipfs_service(connection: HTTPConnection) -> IPFSService:
+    return connection.app.state.ipfs_service
+
+def get_job_queue(connection: HTTPConnection) -> JobQueue:
+    return connection.app.state.job_queue
+
+def get_event_indexer(connection: HTTPConnection) -> EventIndexer:
+    return connection.app.state.event_indexer
+
+def get_receipt_watcher(connection: HTTPConnection) -> ReceiptWatcher:
+    return connection.app.state.receipt_watcher
+
+def get_governance_tally(connection: HTTPConnection) -> GovernanceTally:
+    return connection.app.state.governance_tally
+
+def get_voting_power_store(connection: HTTPConnection) -> VotingPowerStore:
+    return connection.app.state.voting_power_store
@@ -2,15 +2,30 @@
 Domain Management API Routes
 Handles domain registration, search, and management operations
 """
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, WebSocket, WebSocketDisconnect
 from typing import List, Optional
 from pydantic import BaseModel, validator
 import structlog
 
+from api.dependencies import (
+    get_ai_gateway,
+    get_blockchain_service,
+    get_domain_service,
+    get_event_indexer,
+    get_receipt_watcher
+)
 from core.database import get_db
 from services.domain_service import DomainService
-from services.blockchain_service import BlockchainService
+from services.blockchain_service import (
+    BATCH_REGISTRATION_BASE_GAS,
+    BATCH_REGISTRATION_GAS_PER_DOMAIN,
+    MAX_BATCH_REGISTRATIONS,
+    REGISTRATION_GAS,
+    BlockchainService
+)
 from services.ai_gateway import AIGateway
+from services.event_indexer import EventIndexer
+from services.receipt_watcher import FINAL_STATUSES, ReceiptWatcher, WatchedTransaction
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/domains", tags=["domains"])
@@ -29,6 +44,32 @@ class DomainRegistrationRequest(BaseModel):
     ipfs_content: Optional[str] = None
     auto_renew: Optional[bool] = False
 
+class BatchRegistrationItem(BaseModel):
+    name: str
+    tld: str = "nxd"
+    duration_years: int = 1
+    ipfs_content: Optional[str] = None
+
+class BatchRegistrationRequest(BaseModel):
+    domains: List[BatchRegistrationItem]
+    payment_token: str = "ETH"  # ETH or NXD
+
+    @validator("domains")
+    def limit_domains(cls, domains):
+        if not domains or len(domains) > MAX_BATCH_REGISTRATIONS:
+            raise ValueError(f"Provide between 1 and {MAX_BATCH_REGISTRATIONS} domains")
+        return domains
+
+class BatchPricingRequest(BaseModel):
+    domains: List[str]
+    network: str = "ethereum"
+
+    @validator("domains")
+    def limit_domains(cls, domains):
+        if not domains or len(domains) > 100:
+            raise ValueError("Provide between 1 and 100 domains")
+        return domains
+
 class DomainResponse(BaseModel):
     id: int
     full_domain: str
@@ -57,8 +98,9 @@ async def search_domains(
     query: str,
     tlds: Optional[str] = "nxd",
     max_results: Optional[int] = 10,
-    domain_service: DomainService = Depends(lambda: DomainService()),
-    ai_gateway: AIGateway = Depends(lambda: AIGateway())
+    ai_rerank: bool = False,
+    domain_service: DomainService = Depends(get_domain_service),
+    ai_gateway: AIGateway = Depends(get_ai_gateway)
 ):
     """
     Search for available domains with AI-powered suggestions
@@ -73,8 +115,12 @@ async def search_domains(
             max_results=max_results
         )
         
-        # Enhance with AI scoring
-        enhanced_suggestions = await ai_gateway.enhance_domain_suggestions(suggestions)
+        # Rank by relevance to the query locally; LLM scoring only when asked for
+        enhanced_suggestions = await ai_gateway.enhance_domain_suggestions(
+            suggestions,
+            query=query,
+            use_llm=ai_rerank
+        )
         
         return enhanced_suggestions
         
@@ -82,10 +128,33 @@ async def search_domains(
         logger.error("Domain search failed", error=str(e))
         raise HTTPException(status_code=500, detail="Domain search failed")
 
+async def _registration_gas_quotes(
+    blockchain_service: BlockchainService,
+    count: int,
+    network: str = "ethereum"
+) -> Optional[List[dict]]:
+    """Per-speed registration gas costs in ETH for `count` registrations, from one fee snapshot"""
+    try:
+        quotes = await blockchain_service.quote_gas([REGISTRATION_GAS] * count, network)
+    except Exception as e:
+        logger.warning("Gas quote unavailable", network=network, error=str(e))
+        return None
+    return [
+        {
+            speed: {
+                "expected_eth": f"{quote['expected_wei'] / 10**18:.6f}",
+                "max_eth": f"{quote['max_wei'] / 10**18:.6f}"
+            }
+            for speed, quote in per_speed.items()
+        }
+        for per_speed in quotes
+    ]
+
 @router.get("/check/{domain}")
 async def check_domain_availability(
     domain: str,
-    domain_service: DomainService = Depends(lambda: DomainService())
+    domain_service: DomainService = Depends(get_domain_service),
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
     """
     Check if a specific domain is available
@@ -96,26 +165,68 @@ async def check_domain_availability(
             
         availability = await domain_service.check_availability(domain)
         pricing = await domain_service.get_domain_pricing(domain)
+        gas_quotes = await _registration_gas_quotes(blockchain_service, 1)
         
         return {
             "domain": domain,
-            "available": availability.available,
-            "premium": availability.premium,
-            "price_eth": pricing.price_eth,
-            "price_nxd": pricing.price_nxd,
-            "estimated_gas": pricing.estimated_gas
+            "available": availability["available"],
+            "premium": availability["premium"],
+            "price_eth": pricing["price_eth"],
+            "price_nxd": pricing["price_nxd"],
+            "estimated_gas": gas_quotes[0]["standard"]["expected_eth"] if gas_quotes else pricing["estimated_gas"],
+            "gas_quote": gas_quotes[0] if gas_quotes else None
         }
         
     except Exception as e:
         logger.error("Domain availability check failed", domain=domain, error=str(e))
         raise HTTPException(status_code=500, detail="Availability check failed")
 
+@router.post("/pricing/batch")
+async def get_batch_pricing(
+    request: BatchPricingRequest,
+    domain_service: DomainService = Depends(get_domain_service),
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
+):
+    """
+    Prices and registration gas quotes for many domains at once
+    """
+    try:
+        domains = [domain if "." in domain else f"{domain}.nxd" for domain in request.domains]
+        pricings = [await domain_service.get_domain_pricing(domain) for domain in domains]
+        gas_quotes = await _registration_gas_quotes(blockchain_service, len(domains), request.network)
+
+        return {
+            "network": request.network,
+            "registration_gas": REGISTRATION_GAS,
+            "domains": [
+                {
+                    "domain": domain,
+                    "price_eth": pricing["price_eth"],
+                    "price_nxd": pricing["price_nxd"],
+                    "premium": pricing.get("is_premium", False),
+                    "estimated_gas": gas_quotes[index]["standard"]["expected_eth"] if gas_quotes else pricing["estimated_gas"],
+                    "gas_quote": gas_quotes[index] if gas_quotes else None
+                }
+                for index, (domain, pricing) in enumerate(zip(domains, pricings))
+            ]
+        }
+
+    except Exception as e:
+        logger.error("Batch pricing failed", count=len(request.domains), error=str(e))
+        raise HTTPException(status_code=500, detail="Batch pricing failed")
+
+def _on_registration_final(domain_service: DomainService, domain_id: int):
+    """Receipt watcher callback recording the final status of a registration"""
+    async def update(tx: WatchedTransaction):
+        await domain_service.update_domain_status(domain_id, tx.tx_hash, tx.status)
+    return update
+
 @router.post("/register")
 async def register_domain(
     request: DomainRegistrationRequest,
-    background_tasks: BackgroundTasks,
-    domain_service: DomainService = Depends(lambda: DomainService()),
-    blockchain_service: BlockchainService = Depends(lambda: BlockchainService())
+    domain_service: DomainService = Depends(get_domain_service),
+    blockchain_service: BlockchainService = Depends(get_blockchain_service),
+    receipt_watcher: ReceiptWatcher = Depends(get_receipt_watcher)
 ):
     """
     Register a new domain
@@ -125,7 +236,7 @@ async def register_domain(
         
         # Validate domain availability
         availability = await domain_service.check_availability(full_domain)
-        if not availability.available:
+        if not availability["available"]:
             raise HTTPException(status_code=400, detail="Domain not available")
         
         # Initiate blockchain registration
@@ -145,15 +256,15 @@ async def register_domain(
             ipfs_hash=request.ipfs_content
         )
         
-        # Schedule follow-up tasks
-        background_tasks.add_task(
-            domain_service.update_domain_status,
-            domain_record.id,
-            registration_result.tx_hash
-        )
+        # The record's status follows the transaction receipt; demo hashes never get one
+        if not registration_result.placeholder:
+            receipt_watcher.watch(
+                registration_result.tx_hash,
+                on_final=_on_registration_final(domain_service, domain_record["id"])
+            )
         
         return {
-            "domain_id": domain_record.id,
+            "domain_id": domain_record["id"],
             "transaction_hash": registration_result.tx_hash,
             "estimated_confirmation": "2-5 minutes",
             "domain": full_domain
@@ -163,10 +274,123 @@ async def register_domain(
         logger.error("Domain registration failed", request=request.dict(), error=str(e))
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
 
+@router.post("/register-batch")
+async def register_domains_batch(
+    request: BatchRegistrationRequest,
+    domain_service: DomainService = Depends(get_domain_service),
+    blockchain_service: BlockchainService = Depends(get_blockchain_service),
+    receipt_watcher: ReceiptWatcher = Depends(get_receipt_watcher)
+):
+    """
+    Register many domains in one transaction, reporting the ones that could not be included
+    """
+    try:
+        registrations = []
+        unavailable = []
+        ipfs_hashes = {}
+        for item in request.domains:
+            full_domain = f"{item.name}.{item.tld}"
+            availability = await domain_service.check_availability(full_domain)
+            if availability["available"]:
+                registrations.append({
+                    "name": item.name,
+                    "tld": item.tld,
+                    "duration": item.duration_years,
+                    "ipfs_content": item.ipfs_content
+                })
+                ipfs_hashes[full_domain.lower()] = item.ipfs_content
+            else:
+                unavailable.append({"domain": full_domain, "error": "Domain not available"})
+
+        result = await blockchain_service.register_domains_batch(registrations, request.payment_token)
+
+        registered = []
+        for registration in result.registered:
+            domain_record = await domain_service.create_domain_record(
+                full_domain=registration.domain,
+                owner_address=registration.owner,
+                transaction_hash=registration.tx_hash,
+                ipfs_hash=ipfs_hashes.get(registration.domain)
+            )
+            if not registration.placeholder:
+                receipt_watcher.watch(
+                    registration.tx_hash,
+                    on_final=_on_registration_final(domain_service, domain_record["id"])
+                )
+            registered.append({
+                "domain_id": domain_record["id"],
+                "domain": registration.domain,
+                "transaction_hash": registration.tx_hash
+            })
+
+        gas_quote = None
+        if registered:
+            try:
+                gas_units = BATCH_REGISTRATION_BASE_GAS + BATCH_REGISTRATION_GAS_PER_DOMAIN * len(registered)
+                quote = (await blockchain_service.quote_gas([gas_units]))[0]["standard"]
+                gas_quote = {"gas_units": gas_units, "expected_eth": f"{quote['expected_wei'] / 10**18:.6f}"}
+            except Exception as e:
+                logger.warning("Gas quote unavailable", error=str(e))
+
+        return {
+            "registered": registered,
+            "failed": unavailable + result.failed,
+            "transaction_hashes": result.tx_hashes,
+            "total_fee_eth": f"{result.total_fee / 10**18:.6f}",
+            "estimated_gas": gas_quote,
+            "estimated_confirmation": "2-5 minutes"
+        }
+
+    except Exception as e:
+        logger.error("Batch domain registration failed", count=len(request.domains), error=str(e))
+        raise HTTPException(status_code=500, detail=f"Batch registration failed: {str(e)}")
+
+@router.get("/transactions/{tx_hash}")
+async def get_transaction_status(
+    tx_hash: str,
+    receipt_watcher: ReceiptWatcher = Depends(get_receipt_watcher)
+):
+    """
+    Confirmation status of a transaction submitted by the platform
+    """
+    watched = receipt_watcher.get(tx_hash)
+    if watched is None:
+        raise HTTPException(status_code=404, detail="Transaction not tracked")
+    return watched.to_dict()
+
+@router.websocket("/transactions/{tx_hash}/ws")
+async def stream_transaction_status(
+    websocket: WebSocket,
+    tx_hash: str,
+    receipt_watcher: ReceiptWatcher = Depends(get_receipt_watcher)
+):
+    """
+    Push every status change of a transaction until it is confirmed, failed or dropped
+    """
+    await websocket.accept()
+    watched = receipt_watcher.get(tx_hash)
+    if watched is None:
+        await websocket.close(code=4404, reason="Transaction not tracked")
+        return
+
+    queue = receipt_watcher.subscribe(tx_hash)
+    try:
+        update = watched.to_dict()
+        while True:
+            await websocket.send_json(update)
+            if update["status"] in FINAL_STATUSES:
+                break
+            update = await queue.get()
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receipt_watcher.unsubscribe(tx_hash, queue)
+
 @router.get("/user/{address}", response_model=List[DomainResponse])
 async def get_user_domains(
     address: str,
-    domain_service: DomainService = Depends(lambda: DomainService())
+    domain_service: DomainService = Depends(get_domain_service)
 ):
     """
     Get all domains owned by a user
@@ -179,10 +403,39 @@ async def get_user_domains(
         logger.error("Failed to get user domains", address=address, error=str(e))
         raise HTTPException(status_code=500, detail="Failed to retrieve domains")
 
+@router.get("/user/{address}/onchain")
+async def get_user_domains_onchain(
+    address: str,
+    event_indexer: EventIndexer = Depends(get_event_indexer)
+):
+    """
+    Get domains owned by a user according to indexed registry events
+    """
+    try:
+        domains = await event_indexer.get_domains_by_owner(address)
+        return {
+            "domains": [
+                {
+                    "token_id": domain.token_id,
+                    "domain": domain.domain,
+                    "tld": domain.tld,
+                    "owner_address": domain.owner,
+                    "registered_block": domain.registered_block,
+                    "updated_block": domain.updated_block
+                }
+                for domain in domains
+            ],
+            "indexed_through_block": await event_indexer.get_checkpoint()
+        }
+        
+    except Exception as e:
+        logger.error("Failed to get indexed domains", address=address, error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to retrieve domains")
+
 @router.get("/trending")
 async def get_trending_domains(
     limit: int = 10,
-    domain_service: DomainService = Depends(lambda: DomainService())
+    domain_service: DomainService = Depends(get_domain_service)
 ):
     """
     Get trending domain registrations
@@ -199,7 +452,7 @@ async def get_trending_domains(
 async def get_ai_domain_suggestions(
     prompt: str,
     category: Optional[str] = None,
-    ai_gateway: AIGateway = Depends(lambda: AIGateway())
+    ai_gateway: AIGateway = Depends(get_ai_gateway)
 ):
     """
     Get AI-powered domain name suggestions
@@ -7,7 +7,16 @@ from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 import structlog
 
+from api.dependencies import get_blockchain_service, get_event_indexer, get_governance_tally, get_voting_power_store
 from services.blockchain_service import BlockchainService
+from services.event_indexer import EventIndexer
+from services.governance_tally import (
+    STAKE_POWER_DENOMINATOR,
+    STAKE_POWER_NUMERATOR,
+    GovernanceTally,
+    voting_power
+)
+from services.voting_power import VotingPowerStore
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/governance", tags=["governance"])
@@ -30,23 +39,33 @@ class Proposal(BaseModel):
     title: str
     description: str
     proposer: str
-    status: str  # pending, active, passed, failed, executed
+    status: str  # pending, active, passed, failed, queued, executed, canceled
     votes_for: str
     votes_against: str
-    created_at: str
-    voting_ends_at: str
+    votes_abstain: Optional[str] = None
+    voters: Optional[int] = None
+    quorum: Optional[str] = None
+    quorum_reached: Optional[bool] = None
+    created_at: Optional[str] = None
+    voting_ends_at: Optional[str] = None
+    snapshot_block: Optional[int] = None
+    voting_ends_block: Optional[int] = None
     execution_eta: Optional[str] = None
 
 @router.get("/proposals", response_model=List[Proposal])
 async def get_proposals(
     status: Optional[str] = None,
-    limit: Optional[int] = 20
+    limit: Optional[int] = 20,
+    governance_tally: GovernanceTally = Depends(get_governance_tally)
 ):
     """
     Get governance proposals
     """
     try:
-        # Mock proposals data
+        if governance_tally.enabled:
+            return await governance_tally.list_proposals(status, limit)
+
+        # Mock proposals data until the DAO contract ABI is loaded
         proposals = [
             {
                 "id": 1,
@@ -85,10 +104,23 @@ async def get_proposals(
         raise HTTPException(status_code=500, detail="Failed to retrieve proposals")
 
 @router.get("/proposals/{proposal_id}")
-async def get_proposal(proposal_id: int):
+async def get_proposal(
+    proposal_id: int,
+    governance_tally: GovernanceTally = Depends(get_governance_tally)
+):
     """
     Get specific proposal details
     """
+    if governance_tally.enabled:
+        try:
+            proposal = await governance_tally.get_proposal(proposal_id)
+        except Exception as e:
+            logger.error("Failed to get proposal", proposal_id=proposal_id, error=str(e))
+            raise HTTPException(status_code=500, detail="Failed to retrieve proposal")
+        if proposal is None:
+            raise HTTPException(status_code=404, detail="Proposal not found")
+        return proposal
+
     try:
         # Mock proposal detail
         proposal = {
@@ -128,7 +160,7 @@ async def get_proposal(proposal_id: int):
 @router.post("/proposals")
 async def create_proposal(
     request: ProposalRequest,
-    blockchain_service: BlockchainService = Depends(lambda: BlockchainService())
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
     """
     Create a new governance proposal
@@ -156,7 +188,7 @@ async def create_proposal(
 @router.post("/vote")
 async def vote_on_proposal(
     request: VoteRequest,
-    blockchain_service: BlockchainService = Depends(lambda: BlockchainService())
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
     """
     Vote on a governance proposal
@@ -185,29 +217,36 @@ async def vote_on_proposal(
         raise HTTPException(status_code=500, detail=f"Voting failed: {str(e)}")
 
 @router.get("/voting-power/{address}")
-async def get_voting_power(address: str):
+async def get_voting_power(
+    address: str,
+    block: Optional[int] = None,
+    blockchain_service: BlockchainService = Depends(get_blockchain_service),
+    voting_power_store: VotingPowerStore = Depends(get_voting_power_store)
+):
     """
-    Get user's voting power
+    Get user's voting power, currently or at a past block such as a proposal snapshot
     """
     try:
-        # Mock voting power calculation
-        nxd_balance = "5000000000000000000000"   # 5000 NXD
-        staked_balance = "3000000000000000000000" # 3000 NXD
-        
-        # Voting power = NXD balance + 1.5x staked balance
-        base_power = int(nxd_balance)
-        staked_power = int(float(staked_balance) * 1.5)
-        total_power = base_power + staked_power
-        
+        if block is not None and voting_power_store.complete:
+            balances = await voting_power_store.balances_at([address], block)
+        else:
+            balances = await blockchain_service.get_voting_balances([address], block="latest" if block is None else block)
+        nxd_balance, staked_balance = balances[address.lower()]
+
+        # Voting power = NXD balance + 1.5x staked balance, in exact wei
+        total_power = voting_power(nxd_balance, staked_balance)
+        staked_power = total_power - nxd_balance
+
         return {
             "address": address,
-            "nxd_balance": nxd_balance,
-            "staked_balance": staked_balance,
+            "block": block,
+            "nxd_balance": str(nxd_balance),
+            "staked_balance": str(staked_balance),
             "voting_power": str(total_power),
             "voting_power_breakdown": {
-                "from_balance": str(base_power),
+                "from_balance": str(nxd_balance),
                 "from_staking": str(staked_power),
-                "staking_multiplier": 1.5
+                "staking_multiplier": STAKE_POWER_NUMERATOR / STAKE_POWER_DENOMINATOR
             }
         }
         
@@ -216,12 +255,35 @@ async def get_voting_power(address: str):
         raise HTTPException(status_code=500, detail="Failed to calculate voting power")
 
 @router.get("/user-votes/{address}")
-async def get_user_votes(address: str):
+async def get_user_votes(
+    address: str,
+    limit: int = 100,
+    event_indexer: EventIndexer = Depends(get_event_indexer)
+):
     """
     Get user's voting history
     """
     try:
-        # Mock voting history
+        if event_indexer.enabled:
+            events = await event_indexer.get_account_events(
+                address, contract="dao", events=["VoteCast", "VoteCastWithParams"], limit=limit
+            )
+            return {
+                "votes": [
+                    {
+                        "proposal_id": event.args.get("proposalId"),
+                        # GovernorCountingSimple: 0 = against, 1 = for, 2 = abstain
+                        "support": event.args.get("support") == "1",
+                        "voting_power": event.args.get("weight"),
+                        "reason": event.args.get("reason"),
+                        "block_number": event.block_number,
+                        "tx_hash": event.tx_hash
+                    }
+                    for event in events
+                ]
+            }
+
+        # Mock voting history until the DAO contract ABI is loaded
         votes = [
             {
                 "proposal_id": 1,
@@ -248,11 +310,14 @@ async def get_user_votes(address: str):
         raise HTTPException(status_code=500, detail="Failed to retrieve voting history")
 
 @router.get("/stats")
-async def get_governance_stats():
+async def get_governance_stats(governance_tally: GovernanceTally = Depends(get_governance_tally)):
     """
     Get governance statistics
     """
     try:
+        if governance_tally.enabled:
+            return await governance_tally.stats()
+
         return {
             "total_proposals": 12,
             "active_proposals": 2,
@@ -4,10 +4,13 @@ Handles NXD token staking operations and rewards
 """
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from typing import List, Optional
+from datetime import datetime, timezone
 from pydantic import BaseModel
 import structlog
 
+from api.dependencies import get_blockchain_service, get_event_indexer
 from services.blockchain_service import BlockchainService
+from services.event_indexer import EventIndexer
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/api/staking", tags=["staking"])
@@ -34,7 +37,7 @@ class StakingPosition(BaseModel):
 async def stake_tokens(
     request: StakeRequest,
     background_tasks: BackgroundTasks,
-    blockchain_service: BlockchainService = Depends(lambda: BlockchainService())
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
     """
     Stake NXD tokens for rewards
@@ -62,7 +65,7 @@ async def stake_tokens(
 @router.post("/unstake")
 async def unstake_tokens(
     request: UnstakeRequest,
-    blockchain_service: BlockchainService = Depends(lambda: BlockchainService())
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
     """
     Unstake NXD tokens and claim rewards
@@ -86,7 +89,7 @@ async def unstake_tokens(
 @router.get("/positions/{address}")
 async def get_staking_positions(
     address: str,
-    blockchain_service: BlockchainService = Depends(lambda: BlockchainService())
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
     """
     Get user's staking positions
@@ -100,19 +103,29 @@ async def get_staking_positions(
         raise HTTPException(status_code=500, detail="Failed to retrieve staking positions")
 
 @router.get("/stats")
-async def get_staking_stats():
+async def get_staking_stats(
+    blockchain_service: BlockchainService = Depends(get_blockchain_service),
+    event_indexer: EventIndexer = Depends(get_event_indexer)
+):
     """
     Get global staking statistics
     """
     try:
-        # Mock staking stats - in production, calculate from blockchain data
+        # Everyone who ever staked, from indexed Staked events; their current stakes are read in one multicall
+        stakers = await event_indexer.get_event_accounts("nxd_token", "Staked") if event_indexer.enabled else []
+        stats = await blockchain_service.get_staking_stats(stakers)
         return {
-            "totalStaked": "500000000000000000000000",  # 500k NXD
-            "currentApy": "18.5",
-            "poolUtilization": 0.65,
-            "nextRewardTime": "2025-07-07T00:00:00Z",
-            "totalStakers": 1250,
-            "averageStakeDuration": 120  # days
+            "totalStaked": stats["total_staked"],
+            "currentApy": stats["average_apy"],
+            "baseApy": stats["base_apy"],
+            "poolUtilization": stats["pool_utilization"],
+            # Rewards accrue every second and are paid on claim
+            "nextRewardTime": None,
+            "totalStakers": stats["total_stakers"],
+            "averageStakeDuration": stats["average_stake_days"],
+            "pendingRewards": stats["pending_rewards"],
+            "annualEmission": stats["annual_emission"],
+            "tiers": stats["tiers"]
         }
         
     except Exception as e:
@@ -120,17 +133,32 @@ async def get_staking_stats():
         raise HTTPException(status_code=500, detail="Failed to retrieve staking statistics")
 
 @router.get("/rewards/{address}")
-async def get_pending_rewards(address: str):
+async def get_pending_rewards(
+    address: str,
+    blockchain_service: BlockchainService = Depends(get_blockchain_service),
+    event_indexer: EventIndexer = Depends(get_event_indexer)
+):
     """
     Get pending staking rewards for user
     """
     try:
-        # Mock rewards calculation
+        staking_info = await blockchain_service.get_staking_info(address)
+        pending = int(staking_info["rewards_earned"])
+
+        last_claim = max((position["last_claim"] for position in staking_info["staking_positions"]), default=None)
+
+        # Rewards already paid out, from indexed RewardsClaimed events
+        claimed = 0
+        if event_indexer.enabled:
+            claimed = await event_indexer.sum_account_event_values(address, "nxd_token", "RewardsClaimed", "amount")
+
         return {
-            "pending_rewards": "25000000000000000000",  # 25 NXD
-            "last_claim": "2025-07-01T00:00:00Z",
-            "next_distribution": "2025-07-07T00:00:00Z",
-            "total_earned": "150000000000000000000"  # 150 NXD
+            "pending_rewards": str(pending),
+            "last_claim": datetime.fromtimestamp(last_claim, tz=timezone.utc).isoformat() if last_claim else None,
+            # Rewards accrue every second and are paid on claim
+            "next_distribution": None,
+            "total_earned": str(pending + claimed),
+            "projected_rewards": [position["projected_rewards"] for position in staking_info["staking_positions"]]
         }
         
     except Exception as e:
@@ -140,7 +168,7 @@ async def get_pending_rewards(address: str):
 @router.post("/claim-rewards")
 async def claim_rewards(
     address: str,
-    blockchain_service: BlockchainService = Depends(lambda: BlockchainService())
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
     """
     Claim pending staking rewards
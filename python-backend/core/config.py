@@ -20,12 +20,79 @@ class Settings(BaseSettings):
     XAI_API_KEY: Optional[str] = os.getenv("XAI_API_KEY")
     DEEPSEEK_API_KEY: Optional[str] = os.getenv("DEEPSEEK_API_KEY")
     POE_API_KEY: Optional[str] = os.getenv("POE_API_KEY")
-    
+
+    # AI Gateway
+    AI_COALESCE_WINDOW_SECONDS: float = float(os.getenv("AI_COALESCE_WINDOW_SECONDS", "2.0"))
+    AI_BATCH_MAX_SIZE: int = int(os.getenv("AI_BATCH_MAX_SIZE", "20"))
+    AI_BATCH_MAX_WAIT_MS: float = float(os.getenv("AI_BATCH_MAX_WAIT_MS", "50"))
+    AI_RATE_LIMIT_MAX_WAIT_SECONDS: float = float(os.getenv("AI_RATE_LIMIT_MAX_WAIT_SECONDS", "30"))
+    AI_DEFAULT_DAILY_BUDGET_USD: float = float(os.getenv("AI_DEFAULT_DAILY_BUDGET_USD", "10.0"))
+    AI_DECISION_LOG_CAPACITY: int = int(os.getenv("AI_DECISION_LOG_CAPACITY", "1000"))
+    AI_DECISION_LOG_PERSIST_BATCH_SIZE: int = int(os.getenv("AI_DECISION_LOG_PERSIST_BATCH_SIZE", "100"))
+    AI_DECISION_LOG_PERSIST_INTERVAL_SECONDS: float = float(os.getenv("AI_DECISION_LOG_PERSIST_INTERVAL_SECONDS", "10"))
+    AI_HEALTH_WINDOW_SECONDS: float = float(os.getenv("AI_HEALTH_WINDOW_SECONDS", "300"))
+
+    # AI job queue ("redis", or "memory" for tests and single-process development)
+    AI_JOB_QUEUE_BACKEND: str = os.getenv("AI_JOB_QUEUE_BACKEND", "redis")
+    AI_JOB_RUN_IN_PROCESS: bool = os.getenv("AI_JOB_RUN_IN_PROCESS", "false").lower() == "true"
+    AI_JOB_WORKER_CONCURRENCY: int = int(os.getenv("AI_JOB_WORKER_CONCURRENCY", "4"))
+    AI_JOB_MAX_ATTEMPTS: int = int(os.getenv("AI_JOB_MAX_ATTEMPTS", "3"))
+    AI_JOB_LEASE_SECONDS: float = float(os.getenv("AI_JOB_LEASE_SECONDS", "120"))
+    AI_JOB_DEDUP_TTL_SECONDS: float = float(os.getenv("AI_JOB_DEDUP_TTL_SECONDS", "600"))
+    AI_JOB_RESULT_TTL_SECONDS: float = float(os.getenv("AI_JOB_RESULT_TTL_SECONDS", "86400"))
+
+    # Local AI provider stand-in (offline mode routes every provider to it)
+    AI_OFFLINE_MODE: bool = os.getenv("AI_OFFLINE_MODE", "false").lower() == "true"
+    AI_LOCAL_LATENCY_MEDIAN_MS: float = float(os.getenv("AI_LOCAL_LATENCY_MEDIAN_MS", "300"))
+    AI_LOCAL_LATENCY_SIGMA: float = float(os.getenv("AI_LOCAL_LATENCY_SIGMA", "0.5"))
+    AI_LOCAL_TOKENS_PER_SECOND: float = float(os.getenv("AI_LOCAL_TOKENS_PER_SECOND", "200"))
+    AI_LOCAL_ERROR_RATE: float = float(os.getenv("AI_LOCAL_ERROR_RATE", "0.0"))
+    AI_LOCAL_OUTPUT_TOKENS: int = int(os.getenv("AI_LOCAL_OUTPUT_TOKENS", "0"))
+    AI_LOCAL_SEED: Optional[int] = int(os.getenv("AI_LOCAL_SEED")) if os.getenv("AI_LOCAL_SEED") else None
+
     # Blockchain
     ETHEREUM_RPC_URL: str = os.getenv("ETHEREUM_RPC_URL", "https://eth-mainnet.g.alchemy.com/v2/your-api-key")
     POLYGON_RPC_URL: str = os.getenv("POLYGON_RPC_URL", "https://polygon-mainnet.g.alchemy.com/v2/your-api-key")
     BASE_RPC_URL: str = os.getenv("BASE_RPC_URL", "https://base-mainnet.g.alchemy.com/v2/your-api-key")
+    # Comma-separated extra endpoints per network for load balancing and failover
+    ETHEREUM_RPC_FALLBACK_URLS: str = os.getenv("ETHEREUM_RPC_FALLBACK_URLS", "")
+    POLYGON_RPC_FALLBACK_URLS: str = os.getenv("POLYGON_RPC_FALLBACK_URLS", "")
+    BASE_RPC_FALLBACK_URLS: str = os.getenv("BASE_RPC_FALLBACK_URLS", "")
+    RPC_ENDPOINT_RATE_LIMIT: float = float(os.getenv("RPC_ENDPOINT_RATE_LIMIT", "0"))  # Requests/s per endpoint, 0 = unlimited
+    RPC_MAX_HEAD_LAG: int = int(os.getenv("RPC_MAX_HEAD_LAG", "3"))  # Blocks an endpoint may trail before it is skipped
+    RPC_PROBE_SECONDS: float = float(os.getenv("RPC_PROBE_SECONDS", "10"))
+    RPC_POOL_SIZE: int = int(os.getenv("RPC_POOL_SIZE", "32"))  # Connections per network
+    RPC_TIMEOUT_SECONDS: float = float(os.getenv("RPC_TIMEOUT_SECONDS", "10"))
+    RPC_BATCH_MAX_SIZE: int = int(os.getenv("RPC_BATCH_MAX_SIZE", "100"))
+    RPC_BATCH_MAX_WAIT_MS: float = float(os.getenv("RPC_BATCH_MAX_WAIT_MS", "5"))
+    MULTICALL3_ADDRESS: str = os.getenv("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+    MULTICALL_MAX_CALLS: int = int(os.getenv("MULTICALL_MAX_CALLS", "500"))
+    CHAIN_HEAD_POLL_SECONDS: float = float(os.getenv("CHAIN_HEAD_POLL_SECONDS", "2"))
+    CHAIN_CACHE_MAX_ENTRIES: int = int(os.getenv("CHAIN_CACHE_MAX_ENTRIES", "10000"))  # Per network
+    GAS_ORACLE_POLL_SECONDS: float = float(os.getenv("GAS_ORACLE_POLL_SECONDS", "6"))
+    GAS_ORACLE_SAMPLE_BLOCKS: int = int(os.getenv("GAS_ORACLE_SAMPLE_BLOCKS", "20"))  # Blocks per eth_feeHistory call
+    GAS_ORACLE_WINDOW_BLOCKS: int = int(os.getenv("GAS_ORACLE_WINDOW_BLOCKS", "200"))  # Rolling window for tip percentiles
+
+    # Contract event indexer
+    INDEXER_ENABLED: bool = os.getenv("INDEXER_ENABLED", "true").lower() == "true"
+    INDEXER_START_BLOCK: Optional[int] = int(os.getenv("INDEXER_START_BLOCK")) if os.getenv("INDEXER_START_BLOCK") else None
+    INDEXER_BATCH_BLOCKS: int = int(os.getenv("INDEXER_BATCH_BLOCKS", "2000"))
+    INDEXER_CONFIRMATIONS: int = int(os.getenv("INDEXER_CONFIRMATIONS", "2"))
+    INDEXER_REORG_DEPTH: int = int(os.getenv("INDEXER_REORG_DEPTH", "128"))
+    INDEXER_POLL_SECONDS: float = float(os.getenv("INDEXER_POLL_SECONDS", "4"))
+
+    # NXD balance history for voting power snapshots
+    VOTING_POWER_RETAIN_BLOCKS: int = int(os.getenv("VOTING_POWER_RETAIN_BLOCKS", "50400"))  # ~7 days of exact history
+    VOTING_POWER_COMPACT_BLOCKS: int = int(os.getenv("VOTING_POWER_COMPACT_BLOCKS", "7200"))
+
+    # Transaction receipt watcher
+    RECEIPT_CONFIRMATIONS: int = int(os.getenv("RECEIPT_CONFIRMATIONS", "2"))
+    RECEIPT_POLL_SECONDS: float = float(os.getenv("RECEIPT_POLL_SECONDS", "2"))
+    RECEIPT_DROP_AFTER_SECONDS: float = float(os.getenv("RECEIPT_DROP_AFTER_SECONDS", "1800"))  # No receipt by then: dropped
     PRIVATE_KEY: Optional[str] = os.getenv("PRIVATE_KEY")
+    TX_MAX_CONCURRENCY: int = int(os.getenv("TX_MAX_CONCURRENCY", "16"))  # Transactions signed and broadcast at once
+    CONTRACT_ARTIFACTS_DIR: str = os.getenv("CONTRACT_ARTIFACTS_DIR", "../artifacts")  # Hardhat build output
+    CONTRACT_ABI_CACHE_DIR: str = os.getenv("CONTRACT_ABI_CACHE_DIR", ".cache/abi")
     
     # Smart Contract Addresses
     NXD_TOKEN_ADDRESS: str = os.getenv("NXD_TOKEN_ADDRESS", "0x...")
@@ -39,7 +39,7 @@ async def init_db():
             from models import (
                 user, domain, tld, staking, governance, 
                 marketplace, ai, communication, satellite, 
-                iot, audit, cst, analytics
+                iot, audit, cst, analytics, chain_index
             )
             
             # Create all tables
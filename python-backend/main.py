@@ -15,7 +15,7 @@ from prometheus_client import generate_latest, Counter, Histogram, Gauge
 from starlette.responses import Response
 
 from core.config import settings
-from core.database import init_db, get_db
+from core.database import AsyncSessionLocal, init_db, get_db
 from services.ai_gateway import AIGateway
 from services.ipfs_service import IPFSService
 from services.domain_service import DomainService
@@ -25,6 +25,11 @@ from services.satellite_service import SatelliteService
 from services.iot_service import IoTService
 from services.analytics_service import AnalyticsService
 from services.cst_service import CSTService
+from services.event_indexer import EventIndexer
+from services.governance_tally import GovernanceTally
+from services.receipt_watcher import ReceiptWatcher
+from services.voting_power import VotingPowerStore
+from services.job_queue import get_job_queue
 from api.domains import router as domains_router
 from api.ai import router as ai_router
 from api.staking import router as staking_router
@@ -32,6 +37,7 @@ from api.governance import router as governance_router
 from api.marketplace import router as marketplace_router
 from api.communication import router as communication_router
 from api.analytics import router as analytics_router
+from ai_worker import build_worker
 
 # Configure structured logging
 logger = structlog.get_logger()
@@ -52,7 +58,7 @@ async def lifespan(app: FastAPI):
     # Initialize database
     await init_db()
     
-    # Initialize services
+    # Initialize services once; routes receive these instances through api.dependencies
     app.state.ai_gateway = AIGateway()
     app.state.ipfs_service = IPFSService()
     app.state.domain_service = DomainService()
@@ -62,12 +68,60 @@ async def lifespan(app: FastAPI):
     app.state.iot_service = IoTService()
     app.state.analytics_service = AnalyticsService()
     app.state.cst_service = CSTService()
+    app.state.job_queue = get_job_queue()
+    await app.state.ai_gateway.startup()
+    await app.state.blockchain_service.startup()
+
+    # Contract logs into the local database, so read endpoints avoid chain queries
+    app.state.event_indexer = EventIndexer(
+        app.state.blockchain_service,
+        AsyncSessionLocal,
+        batch_blocks=settings.INDEXER_BATCH_BLOCKS,
+        confirmations=settings.INDEXER_CONFIRMATIONS,
+        reorg_depth=settings.INDEXER_REORG_DEPTH,
+        poll_interval=settings.INDEXER_POLL_SECONDS,
+        start_block=settings.INDEXER_START_BLOCK
+    )
+    # NXD balance history and DAO vote totals are folded in as the indexer stores each batch;
+    # the tally prices votes from the history, so the store goes first
+    app.state.voting_power_store = VotingPowerStore(
+        app.state.event_indexer,
+        retain_blocks=settings.VOTING_POWER_RETAIN_BLOCKS,
+        compact_blocks=settings.VOTING_POWER_COMPACT_BLOCKS
+    )
+    app.state.governance_tally = GovernanceTally(app.state.event_indexer, app.state.voting_power_store)
+    app.state.event_indexer.add_projection(app.state.voting_power_store)
+    app.state.event_indexer.add_projection(app.state.governance_tally)
+    if settings.INDEXER_ENABLED:
+        app.state.event_indexer.start()
+
+    # One loop follows every submitted transaction until it is confirmed
+    app.state.receipt_watcher = ReceiptWatcher(
+        app.state.blockchain_service,
+        confirmations=settings.RECEIPT_CONFIRMATIONS,
+        poll_interval=settings.RECEIPT_POLL_SECONDS,
+        drop_after=settings.RECEIPT_DROP_AFTER_SECONDS
+    )
+    app.state.receipt_watcher.start()
+    
+    # The in-memory queue is only visible to this process, so it needs a local worker
+    app.state.ai_worker = None
+    if settings.AI_JOB_RUN_IN_PROCESS or settings.AI_JOB_QUEUE_BACKEND == "memory":
+        app.state.ai_worker = build_worker(app.state.ai_gateway)
+        app.state.ai_worker.start()
     
     logger.info("NXD Platform Backend started successfully")
     
     yield
     
     logger.info("Shutting down NXD Platform Backend")
+    if app.state.ai_worker is not None:
+        await app.state.ai_worker.stop()
+    await app.state.event_indexer.stop()
+    await app.state.receipt_watcher.stop()
+    await app.state.ai_gateway.shutdown()
+    await app.state.blockchain_service.shutdown()
+    await app.state.job_queue.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -0,0 +1,3 @@
+"""
+NXD Platform Database Models
+"""
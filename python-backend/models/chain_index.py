@@ -0,0 +1,127 @@
+"""
+Chain Index Models
+Contract logs ingested by the event indexer, its checkpoints, derived domain ownership, NXD balance history and governance tallies
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import JSON, BigInteger, DateTime, Index, Integer, SmallInteger, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database import Base
+
+class IndexerCheckpoint(Base):
+    """Last block fully indexed on a network"""
+    __tablename__ = "indexer_checkpoints"
+
+    network: Mapped[str] = mapped_column(String(32), primary_key=True)
+    block_number: Mapped[int] = mapped_column(BigInteger)
+    block_hash: Mapped[str] = mapped_column(String(66))
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class IndexedBlock(Base):
+    """Hashes of recently indexed blocks, kept to find the fork point after a reorg"""
+    __tablename__ = "indexed_blocks"
+
+    network: Mapped[str] = mapped_column(String(32), primary_key=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    block_hash: Mapped[str] = mapped_column(String(66))
+
+class ChainEvent(Base):
+    """One decoded contract log; uint256 values are stored as decimal strings"""
+    __tablename__ = "chain_events"
+    __table_args__ = (
+        UniqueConstraint("network", "tx_hash", "log_index", name="uq_chain_events_log"),
+        Index("ix_chain_events_contract_event", "contract", "event", "block_number"),
+        Index("ix_chain_events_account", "account", "contract", "event"),
+        Index("ix_chain_events_subject", "contract", "subject"),
+        Index("ix_chain_events_block", "network", "block_number"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    network: Mapped[str] = mapped_column(String(32))
+    contract: Mapped[str] = mapped_column(String(64))
+    address: Mapped[str] = mapped_column(String(42))
+    event: Mapped[str] = mapped_column(String(64))
+    block_number: Mapped[int] = mapped_column(BigInteger)
+    block_hash: Mapped[str] = mapped_column(String(66))
+    tx_hash: Mapped[str] = mapped_column(String(66))
+    log_index: Mapped[int] = mapped_column(Integer)
+    # First indexed address argument (lowercase) and first indexed id argument, for per-user and per-item lookups
+    account: Mapped[Optional[str]] = mapped_column(String(42), nullable=True)
+    subject: Mapped[Optional[str]] = mapped_column(String(78), nullable=True)
+    args: Mapped[Dict[str, Any]] = mapped_column(JSON)
+
+class IndexedDomain(Base):
+    """Current owner of each registry token, derived from registration, sale and transfer events"""
+    __tablename__ = "indexed_domains"
+    __table_args__ = (
+        Index("ix_indexed_domains_owner", "owner"),
+    )
+
+    network: Mapped[str] = mapped_column(String(32), primary_key=True)
+    token_id: Mapped[str] = mapped_column(String(78), primary_key=True)
+    domain: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    tld: Mapped[Optional[str]] = mapped_column(String(63), nullable=True)
+    owner: Mapped[str] = mapped_column(String(42))
+    registered_block: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    updated_block: Mapped[int] = mapped_column(BigInteger)
+
+class PowerCheckpoint(Base):
+    """
+    NXD liquid balance and stake of an account as of the end of a block in which
+    either changed; the zero address row carries total supply and total staked
+    """
+    __tablename__ = "power_checkpoints"
+
+    # Primary key order makes "latest checkpoint of an account at or before a block" an index seek
+    network: Mapped[str] = mapped_column(String(32), primary_key=True)
+    account: Mapped[str] = mapped_column(String(42), primary_key=True)
+    block_number: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    balance: Mapped[str] = mapped_column(String(78))
+    staked: Mapped[str] = mapped_column(String(78))
+
+class GovernanceProposal(Base):
+    """
+    Running tally of one DAO proposal; vote totals are exact decimal strings of voting
+    power at the proposal's snapshot block
+    """
+    __tablename__ = "governance_proposals"
+    __table_args__ = (
+        Index("ix_governance_proposals_snapshot", "network", "snapshot_block"),
+    )
+
+    network: Mapped[str] = mapped_column(String(32), primary_key=True)
+    proposal_id: Mapped[str] = mapped_column(String(78), primary_key=True)
+    proposer: Mapped[str] = mapped_column(String(42))
+    description: Mapped[str] = mapped_column(Text)
+    created_block: Mapped[int] = mapped_column(BigInteger)
+    snapshot_block: Mapped[int] = mapped_column(BigInteger)
+    end_block: Mapped[int] = mapped_column(BigInteger)
+    for_votes: Mapped[str] = mapped_column(String(78), default="0")
+    against_votes: Mapped[str] = mapped_column(String(78), default="0")
+    abstain_votes: Mapped[str] = mapped_column(String(78), default="0")
+    voters: Mapped[int] = mapped_column(Integer, default=0)
+    # Filled once the indexer passes the snapshot block
+    total_power: Mapped[Optional[str]] = mapped_column(String(78), nullable=True)
+    quorum: Mapped[Optional[str]] = mapped_column(String(78), nullable=True)
+    queued_block: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    executed_block: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    canceled_block: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+class GovernanceVote(Base):
+    """One counted vote with the voter's power at the proposal snapshot"""
+    __tablename__ = "governance_votes"
+    __table_args__ = (
+        Index("ix_governance_votes_voter", "voter"),
+        Index("ix_governance_votes_block", "network", "block_number"),
+    )
+
+    network: Mapped[str] = mapped_column(String(32), primary_key=True)
+    proposal_id: Mapped[str] = mapped_column(String(78), primary_key=True)
+    voter: Mapped[str] = mapped_column(String(42), primary_key=True)
+    support: Mapped[int] = mapped_column(SmallInteger)  # 0 = against, 1 = for, 2 = abstain
+    power: Mapped[str] = mapped_column(String(78))
+    block_number: Mapped[int] = mapped_column(BigInteger)
+    tx_hash: Mapped[str] = mapped_column(String(66))
+    reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -3,15 +3,59 @@ AI Gateway Service
 Integrates multiple AI providers (xAI Grok, OpenAI, Anthropic, DeepSeek, Poe) for autonomous operations
 """
 import asyncio
+import hashlib
 import json
-from typing import Dict, List, Optional, Any
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Type
 from datetime import datetime, timedelta
 import httpx
 import structlog
 from openai import AsyncOpenAI
 from anthropic import AsyncAnthropic
+from pydantic import BaseModel, ValidationError
 
 from core.config import settings
+from services.request_coalescer import RequestCoalescer
+from services.micro_batcher import MicroBatcher
+from services.decision_log import DecisionLogStore
+from services.prompt_templates import (
+    AUTONOMOUS_DECISION_PROMPT,
+    AUTONOMOUS_DECISION_SYSTEM_PROMPT,
+    CHAT_SYSTEM_PROMPT,
+    DOMAIN_ANALYSIS_PROMPT,
+    DOMAIN_ANALYSIS_SYSTEM_PROMPT,
+    DOMAIN_SUGGESTIONS_SYSTEM_PROMPT,
+    OPERATION_PROMPT_TEMPLATES,
+    PREDICTIONS_SYSTEM_PROMPT,
+    STRUCTURED_REPAIR_PROMPT,
+    STRUCTURED_REPAIR_SYSTEM_PROMPT,
+    canonical_json,
+    compact_prompt
+)
+from services.ipfs_service import IPFSService
+from services.local_ai_provider import LocalProviderTransport
+from services.ai_telemetry import AITelemetry
+from services.domain_embeddings import DOMAIN_VOCABULARY, DomainEmbeddingIndex
+from services.structured_output import (
+    AutonomousDecisionOutput,
+    DomainAnalysisOutput,
+    DomainSuggestionsOutput,
+    IncrementalJSONParser,
+    ModelT,
+    StructuredOutputError,
+    parse_structured,
+    schema_instructions
+)
+from services.ai_rate_limiter import (
+    BudgetExceededError,
+    CostBudgeter,
+    ProviderRateLimiter,
+    RateLimitTimeoutError,
+    PRIORITY_AUTONOMOUS,
+    PRIORITY_INTERACTIVE,
+    estimate_tokens
+)
 
 logger = structlog.get_logger()
 
@@ -23,6 +67,20 @@ class AIGateway:
     def __init__(self):
         self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
         self.anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY) if settings.ANTHROPIC_API_KEY else None
+
+        # In-process OpenAI-compatible emulator for offline load tests and benchmarks
+        self.local_transport = LocalProviderTransport(
+            latency_median_ms=settings.AI_LOCAL_LATENCY_MEDIAN_MS,
+            latency_sigma=settings.AI_LOCAL_LATENCY_SIGMA,
+            tokens_per_second=settings.AI_LOCAL_TOKENS_PER_SECOND,
+            error_rate=settings.AI_LOCAL_ERROR_RATE,
+            output_tokens=settings.AI_LOCAL_OUTPUT_TOKENS,
+            seed=settings.AI_LOCAL_SEED
+        )
+
+        # Pooled HTTP clients for the OpenAI-compatible providers, reused across calls
+        self.http_client = httpx.AsyncClient()
+        self.local_http_client = httpx.AsyncClient(transport=self.local_transport)
         
         # AI Provider configurations
         self.providers = {
@@ -31,33 +89,69 @@ class AIGateway:
                 "api_key": settings.XAI_API_KEY,
                 "model": "grok-3",
                 "max_tokens": 4000,
-                "priority": 1  # Highest priority for autonomous operations
+                "priority": 1,  # Highest priority for autonomous operations
+                "requests_per_minute": 480,
+                "tokens_per_minute": 200000,
+                "expected_output_tokens": 800,
+                "input_cost_per_1k": 0.003,  # USD
+                "output_cost_per_1k": 0.015
             },
             "openai": {
                 "client": self.openai_client,
                 "model": "gpt-4-turbo-preview",
                 "max_tokens": 4000,
-                "priority": 2
+                "priority": 2,
+                "requests_per_minute": 500,
+                "tokens_per_minute": 300000,
+                "expected_output_tokens": 800,
+                "input_cost_per_1k": 0.01,  # USD
+                "output_cost_per_1k": 0.03
             },
             "anthropic": {
                 "client": self.anthropic_client,
                 "model": "claude-3-opus-20240229",
                 "max_tokens": 4000,
-                "priority": 3
+                "priority": 3,
+                "requests_per_minute": 50,
+                "tokens_per_minute": 40000,
+                "expected_output_tokens": 800,
+                "input_cost_per_1k": 0.015,  # USD
+                "output_cost_per_1k": 0.075
             },
             "deepseek": {
                 "api_url": "https://api.deepseek.com/v1/chat/completions",
                 "api_key": settings.DEEPSEEK_API_KEY,
                 "model": "deepseek-chat",
                 "max_tokens": 4000,
-                "priority": 4
+                "priority": 4,
+                "requests_per_minute": 60,
+                "tokens_per_minute": 100000,
+                "expected_output_tokens": 800,
+                "input_cost_per_1k": 0.00027,  # USD
+                "output_cost_per_1k": 0.0011
             },
             "poe": {
                 "api_url": "https://api.poe.com/v1/chat/completions",
                 "api_key": settings.POE_API_KEY,
                 "model": "claude-3-opus",
                 "max_tokens": 4000,
-                "priority": 5
+                "priority": 5,
+                "requests_per_minute": 60,
+                "tokens_per_minute": 100000,
+                "expected_output_tokens": 800,
+                "input_cost_per_1k": 0.003,  # USD
+                "output_cost_per_1k": 0.015
+            },
+            "local": {
+                "api_url": "http://local-ai/v1/chat/completions",
+                "model": "local-emulator",
+                "max_tokens": 4000,
+                "priority": 6,  # Never chosen as a fallback ahead of real providers
+                "requests_per_minute": 100000,
+                "tokens_per_minute": 100000000,
+                "expected_output_tokens": 800,
+                "input_cost_per_1k": 0.0,  # USD
+                "output_cost_per_1k": 0.0
             }
         }
         
@@ -120,10 +214,94 @@ class AIGateway:
                 "provider": "grok"
             }
         }
-        
-        # Decision logging for transparency
-        self.decision_log = []
-    
+
+        # Batched variants of per-item operations, answered with one JSON array
+        self.batch_contexts = {
+            "domain_approval": {
+                "system_prompt": """You are an AI system for the NXD Platform responsible for autonomous domain approval.
+                You will receive several numbered domain registration requests. Evaluate each one independently based on:
+                1. Name appropriateness (no offensive content, spam, or trademark violations)
+                2. TLD compatibility
+                3. Compliance with platform policies
+                4. Potential value and utility
+
+                Respond with only a JSON array containing one object per request:
+                [{"index": number, "approved": boolean, "reason": string, "score": number (0-100)}]""",
+                "provider": "grok"
+            },
+            "suggestion_scoring": {
+                "system_prompt": """You are a domain valuation expert for the NXD Platform.
+                You will receive several numbered candidate domains. Score each one for brandability,
+                memorability and market potential.
+
+                Respond with only a JSON array containing one object per domain:
+                [{"index": number, "score": number (0-1)}]""",
+                "provider": "grok"
+            }
+        }
+
+        # Strip source indentation once so every request resends the shortest stable prefix
+        for contexts in (self.operation_contexts, self.batch_contexts):
+            for operation_config in contexts.values():
+                operation_config["system_prompt"] = compact_prompt(operation_config["system_prompt"])
+
+        # Micro-batchers that pack concurrent per-item requests into one provider call
+        self.approval_batcher = MicroBatcher(
+            self._run_domain_approval_batch,
+            max_batch_size=settings.AI_BATCH_MAX_SIZE,
+            max_wait_ms=settings.AI_BATCH_MAX_WAIT_MS,
+            name="domain_approval"
+        )
+        self.scoring_batcher = MicroBatcher(
+            self._run_suggestion_scoring_batch,
+            max_batch_size=settings.AI_BATCH_MAX_SIZE,
+            max_wait_ms=settings.AI_BATCH_MAX_WAIT_MS,
+            name="suggestion_scoring"
+        )
+
+        # Daily provider spend caps per operation (USD); others use AI_DEFAULT_DAILY_BUDGET_USD
+        self.operation_budgets = {
+            "domain_approval": 25.0,
+            "fee_adjustment": 5.0,
+            "governance_proposal": 5.0,
+            "market_analysis": 10.0,
+            "user_support": 25.0,
+            "anomaly_detection": 10.0,
+            "autonomous_decision": 10.0,
+            "chat": 50.0,
+            "domain_analysis": 25.0,
+            "domain_suggestions": 25.0,
+            "suggestion_scoring": 15.0,
+            "predictions": 10.0
+        }
+
+        # Per-provider request/token throughput limits and spend tracking
+        self.rate_limiters = {
+            name: ProviderRateLimiter(name, config["requests_per_minute"], config["tokens_per_minute"])
+            for name, config in self.providers.items()
+        }
+        self.cost_budgeter = CostBudgeter(self.operation_budgets, settings.AI_DEFAULT_DAILY_BUDGET_USD)
+
+        # Decision logging for transparency, persisted to IPFS in batches for audit
+        self.ipfs_service = IPFSService()
+        self.decision_log = DecisionLogStore(
+            capacity=settings.AI_DECISION_LOG_CAPACITY,
+            sink=self._persist_decision_batch,
+            persist_batch_size=settings.AI_DECISION_LOG_PERSIST_BATCH_SIZE,
+            persist_interval_seconds=settings.AI_DECISION_LOG_PERSIST_INTERVAL_SECONDS
+        )
+
+        # Identical concurrent prompts share a single provider round-trip
+        self.coalescer = RequestCoalescer(window_seconds=settings.AI_COALESCE_WINDOW_SECONDS)
+
+        # Keyword index for ranking domain names against prompts without a provider call
+        self.embedding_index = DomainEmbeddingIndex(names=DOMAIN_VOCABULARY)
+
+        # Metrics and passive provider health from live traffic
+        self.telemetry = AITelemetry(window_seconds=settings.AI_HEALTH_WINDOW_SECONDS)
+        self.autonomous_in_progress = 0
+        self.last_prediction_time: Optional[str] = None
+
     async def process_autonomous_request(
         self, 
         operation_type: str, 
@@ -133,22 +311,29 @@ class AIGateway:
         """
         Process autonomous operation requests
         """
+        self.autonomous_in_progress += 1
         try:
             if operation_type not in self.operation_contexts:
                 raise ValueError(f"Unknown operation type: {operation_type}")
             
             operation_config = self.operation_contexts[operation_type]
             provider = operation_config["provider"]
-            
-            # Prepare the prompt with context data
-            user_prompt = self._prepare_context_prompt(operation_type, context_data)
-            
-            # Get AI response
-            response = await self._call_ai_provider(
-                provider,
-                operation_config["system_prompt"],
-                user_prompt
-            )
+
+            if operation_type == "domain_approval":
+                # Approvals arrive in bursts; pack concurrent ones into one call
+                response = await self.approval_batcher.submit(context_data)
+            else:
+                # Prepare the prompt with context data
+                user_prompt = self._prepare_context_prompt(operation_type, context_data)
+
+                # Get AI response
+                response = await self._call_ai_provider(
+                    provider,
+                    operation_config["system_prompt"],
+                    user_prompt,
+                    operation=operation_type,
+                    priority=PRIORITY_AUTONOMOUS
+                )
             
             # Log the decision
             decision_log_entry = {
@@ -161,12 +346,9 @@ class AIGateway:
             }
             self.decision_log.append(decision_log_entry)
             
-            # Keep only last 1000 entries
-            if len(self.decision_log) > 1000:
-                self.decision_log = self.decision_log[-1000:]
-            
             return {
                 "success": True,
+                "decision_id": decision_log_entry["id"],
                 "operation_type": operation_type,
                 "provider": provider,
                 "response": response,
@@ -180,58 +362,267 @@ class AIGateway:
                 "operation_type": operation_type,
                 "error": str(e)
             }
+        finally:
+            self.autonomous_in_progress -= 1
     
-    async def _call_ai_provider(self, provider: str, system_prompt: str, user_prompt: str) -> str:
-        """Call specific AI provider"""
+    async def _call_ai_provider(
+        self,
+        provider: str,
+        system_prompt: str,
+        user_prompt: str,
+        operation: str = "general",
+        priority: int = PRIORITY_INTERACTIVE,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> str:
+        """Call specific AI provider, sharing the round-trip with identical in-flight calls"""
+        call = lambda: self._call_with_fallback(
+            provider, system_prompt, user_prompt, operation, priority, response_schema, on_field
+        )
+        if on_field is not None:
+            # Streamed fields are delivered to this caller only, so the call cannot be shared
+            return await call()
+
+        schema_name = response_schema.__name__ if response_schema else ""
+        key = self._coalesce_key(provider, system_prompt, user_prompt, schema_name)
+        if self.coalescer.is_shared(key):
+            self.telemetry.record_cache_hit(provider, "coalescer")
+        return await self.coalescer.run(key, call)
+
+    def _coalesce_key(self, provider: str, system_prompt: str, user_prompt: str, schema_name: str = "") -> str:
+        """Build the single-flight key for a provider call"""
+        digest = hashlib.sha256()
+        for part in (provider, system_prompt, user_prompt, schema_name):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    async def _call_with_fallback(
+        self,
+        provider: str,
+        system_prompt: str,
+        user_prompt: str,
+        operation: str,
+        priority: int,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> str:
+        """Call provider and fall back to the others by priority on failure"""
         try:
-            if provider == "grok":
-                return await self._call_grok(system_prompt, user_prompt)
-            elif provider == "openai":
-                return await self._call_openai(system_prompt, user_prompt)
-            elif provider == "anthropic":
-                return await self._call_anthropic(system_prompt, user_prompt)
-            elif provider == "deepseek":
-                return await self._call_deepseek(system_prompt, user_prompt)
-            elif provider == "poe":
-                return await self._call_poe(system_prompt, user_prompt)
-            else:
-                raise ValueError(f"Unknown provider: {provider}")
+            return await self._invoke_provider(
+                provider, system_prompt, user_prompt, operation, priority, response_schema, on_field
+            )
+        except BudgetExceededError:
+            # Budgets are per operation, so another provider would not help
+            raise
         except Exception as e:
             logger.error("AI provider call failed", provider=provider, error=str(e))
             # Fallback to next available provider
-            return await self._fallback_provider_call(provider, system_prompt, user_prompt)
-    
-    async def _call_grok(self, system_prompt: str, user_prompt: str) -> str:
-        """Call xAI Grok API"""
-        if not settings.XAI_API_KEY:
-            raise ValueError("XAI API key not configured")
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.providers["grok"]["api_url"],
-                headers={
-                    "Authorization": f"Bearer {settings.XAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.providers["grok"]["model"],
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "max_tokens": self.providers["grok"]["max_tokens"],
-                    "temperature": 0.7
-                }
+            return await self._fallback_provider_call(
+                provider, system_prompt, user_prompt, operation, priority, response_schema, on_field
             )
+
+    async def _invoke_provider(
+        self,
+        provider: str,
+        system_prompt: str,
+        user_prompt: str,
+        operation: str = "general",
+        priority: int = PRIORITY_INTERACTIVE,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> str:
+        """Dispatch a single provider call without fallback, within its rate limit and budget"""
+        if provider not in self.providers:
+            raise ValueError(f"Unknown provider: {provider}")
+
+        config = self.providers[provider]
+        input_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+        reserved_tokens = input_tokens + config["expected_output_tokens"]
+
+        try:
+            self.cost_budgeter.check(
+                operation,
+                self._estimate_cost(provider, input_tokens, config["expected_output_tokens"])
+            )
+        except BudgetExceededError:
+            self.telemetry.record_rejected(provider, operation, "budget_exceeded")
+            raise
+
+        # Queue behind higher-priority callers instead of pushing the provider into 429s
+        rate_limiter = self.rate_limiters[provider]
+        queued_at = time.perf_counter()
+        try:
+            await rate_limiter.acquire(
+                reserved_tokens,
+                priority,
+                timeout=settings.AI_RATE_LIMIT_MAX_WAIT_SECONDS
+            )
+        except RateLimitTimeoutError:
+            self.telemetry.record_rejected(provider, operation, "rate_limited")
+            raise
+        started_at = time.perf_counter()
+        self.telemetry.record_queue_wait(provider, operation, started_at - queued_at)
+
+        on_delta = None
+        if on_field is not None:
+            # Fresh parser per attempt; a fallback provider restarts the object
+            parser = IncrementalJSONParser()
+            first_token_seen = False
+
+            def _feed(text: str):
+                nonlocal first_token_seen
+                if not first_token_seen:
+                    first_token_seen = True
+                    self.telemetry.record_first_token(provider, operation, time.perf_counter() - started_at)
+                for name, value in parser.feed(text):
+                    on_field(name, value)
+
+            on_delta = _feed
+
+        try:
+            response = await self._dispatch_provider(provider, system_prompt, user_prompt, response_schema, on_delta)
+        except Exception as e:
+            self.telemetry.record_call(provider, operation, time.perf_counter() - started_at, error=str(e))
+            raise
+
+        output_tokens = estimate_tokens(response)
+        cost = self._estimate_cost(provider, input_tokens, output_tokens)
+        rate_limiter.reconcile(reserved_tokens, input_tokens + output_tokens)
+        self.cost_budgeter.charge(operation, cost)
+        self.telemetry.record_call(
+            provider,
+            operation,
+            time.perf_counter() - started_at,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost=cost
+        )
+
+        return response
+
+    def _estimate_cost(self, provider: str, input_tokens: int, output_tokens: int) -> float:
+        """Estimate the USD cost of a provider call"""
+        config = self.providers[provider]
+        return (
+            input_tokens * config["input_cost_per_1k"] +
+            output_tokens * config["output_cost_per_1k"]
+        ) / 1000
+
+    async def _dispatch_provider(
+        self,
+        provider: str,
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Send the request to the provider's API"""
+        if settings.AI_OFFLINE_MODE or provider == "local":
+            # Offline mode keeps per-provider limits and fallback but never leaves the process
+            return await self._call_local(system_prompt, user_prompt, response_schema, on_delta)
+        elif provider == "grok":
+            return await self._call_grok(system_prompt, user_prompt, response_schema, on_delta)
+        elif provider == "openai":
+            return await self._call_openai(system_prompt, user_prompt, response_schema, on_delta)
+        elif provider == "anthropic":
+            return await self._call_anthropic(system_prompt, user_prompt, response_schema, on_delta)
+        elif provider == "deepseek":
+            return await self._call_deepseek(system_prompt, user_prompt, response_schema, on_delta)
+        elif provider == "poe":
+            return await self._call_poe(system_prompt, user_prompt, response_schema, on_delta)
+        else:
+            raise ValueError(f"Unknown provider: {provider}")
+
+    async def _call_chat_completions(
+        self,
+        provider: str,
+        api_key: Optional[str],
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> str:
+        """Call an OpenAI-compatible chat completions endpoint, streaming when on_delta is given"""
+        config = self.providers[provider]
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+
+        payload = {
+            "model": config["model"],
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": config["max_tokens"],
+            "temperature": 0.7
+        }
+        if response_schema is not None:
+            payload["response_format"] = {"type": "json_object"}
+
+        client = client or self.http_client
+        if on_delta is None:
+            response = await client.post(config["api_url"], headers=headers, json=payload)
             response.raise_for_status()
             result = response.json()
+            usage = result.get("usage") or {}
+            cached_tokens = (
+                usage.get("prompt_cache_hit_tokens") or
+                (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+            )
+            if cached_tokens:
+                self.telemetry.record_cache_hit(provider, "prompt_cache")
             return result["choices"][0]["message"]["content"]
+
+        payload["stream"] = True
+        parts = []
+        async with client.stream("POST", config["api_url"], headers=headers, json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                text = choices[0].get("delta", {}).get("content") if choices else None
+                if text:
+                    parts.append(text)
+                    on_delta(text)
+        return "".join(parts)
+
+    async def _call_grok(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Call xAI Grok API"""
+        if not settings.XAI_API_KEY:
+            raise ValueError("XAI API key not configured")
+        
+        return await self._call_chat_completions(
+            "grok", settings.XAI_API_KEY, system_prompt, user_prompt, response_schema, on_delta
+        )
     
-    async def _call_openai(self, system_prompt: str, user_prompt: str) -> str:
+    async def _call_openai(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
         """Call OpenAI API"""
         if not self.openai_client:
             raise ValueError("OpenAI API key not configured")
         
+        options = {}
+        if response_schema is not None:
+            options["response_format"] = {"type": "json_object"}
+
         response = await self.openai_client.chat.completions.create(
             model=self.providers["openai"]["model"],
             messages=[
@@ -239,99 +630,309 @@ class AIGateway:
                 {"role": "user", "content": user_prompt}
             ],
             max_tokens=self.providers["openai"]["max_tokens"],
-            temperature=0.7
+            temperature=0.7,
+            stream=on_delta is not None,
+            **options
         )
-        return response.choices[0].message.content
+        if on_delta is None:
+            return response.choices[0].message.content
+
+        parts = []
+        async for chunk in response:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                parts.append(text)
+                on_delta(text)
+        return "".join(parts)
     
-    async def _call_anthropic(self, system_prompt: str, user_prompt: str) -> str:
-        """Call Anthropic Claude API"""
+    async def _call_anthropic(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Call Anthropic Claude API, forcing a tool call when a schema is requested"""
         if not self.anthropic_client:
             raise ValueError("Anthropic API key not configured")
         
+        options = {}
+        if response_schema is not None:
+            tool_name = response_schema.__name__
+            options["tools"] = [{
+                "name": tool_name,
+                "description": response_schema.__doc__ or tool_name,
+                "input_schema": response_schema.model_json_schema()
+            }]
+            options["tool_choice"] = {"type": "tool", "name": tool_name}
+
         response = await self.anthropic_client.messages.create(
             model=self.providers["anthropic"]["model"],
             max_tokens=self.providers["anthropic"]["max_tokens"],
-            system=system_prompt,
+            # System prompts are static per operation; mark them for provider-side prompt caching
+            system=[
+                {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+            ],
             messages=[
                 {"role": "user", "content": user_prompt}
             ],
-            temperature=0.7
+            temperature=0.7,
+            stream=on_delta is not None,
+            extra_headers={"anthropic-beta": "prompt-caching-2024-07-31"},
+            **options
         )
-        return response.content[0].text
+        if on_delta is None:
+            if getattr(response.usage, "cache_read_input_tokens", None):
+                self.telemetry.record_cache_hit("anthropic", "prompt_cache")
+            for block in response.content:
+                if block.type == "tool_use":
+                    return json.dumps(block.input)
+            return "".join(block.text for block in response.content if block.type == "text")
+
+        parts = []
+        async for event in response:
+            if event.type != "content_block_delta":
+                continue
+            # Tool input arrives as partial JSON, plain replies as text
+            text = getattr(event.delta, "partial_json", None) or getattr(event.delta, "text", None)
+            if text:
+                parts.append(text)
+                on_delta(text)
+        return "".join(parts)
     
-    async def _call_deepseek(self, system_prompt: str, user_prompt: str) -> str:
+    async def _call_deepseek(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
         """Call DeepSeek API"""
         if not settings.DEEPSEEK_API_KEY:
             raise ValueError("DeepSeek API key not configured")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.providers["deepseek"]["api_url"],
-                headers={
-                    "Authorization": f"Bearer {settings.DEEPSEEK_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.providers["deepseek"]["model"],
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "max_tokens": self.providers["deepseek"]["max_tokens"],
-                    "temperature": 0.7
-                }
-            )
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-    
-    async def _call_poe(self, system_prompt: str, user_prompt: str) -> str:
-        """Call Poe API (mock implementation)"""
-        # Poe doesn't have a direct API, this is a placeholder
-        return f"Poe response for: {user_prompt[:100]}..."
+        return await self._call_chat_completions(
+            "deepseek", settings.DEEPSEEK_API_KEY, system_prompt, user_prompt, response_schema, on_delta
+        )
+
+    async def _call_local(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Call the in-process local provider emulator"""
+        return await self._call_chat_completions(
+            "local", None, system_prompt, user_prompt, response_schema, on_delta,
+            client=self.local_http_client
+        )
     
-    async def _fallback_provider_call(self, failed_provider: str, system_prompt: str, user_prompt: str) -> str:
-        """Fallback to next available provider"""
-        available_providers = [p for p in self.providers.keys() if p != failed_provider]
-        available_providers.sort(key=lambda p: self.providers[p]["priority"])
-        
-        for provider in available_providers:
-            try:
-                return await self._call_ai_provider(provider, system_prompt, user_prompt)
-            except Exception:
-                continue
+    async def _call_poe(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Call Poe AI API"""
+        if not settings.POE_API_KEY:
+            raise ValueError("Poe API key not configured")
         
-        # If all providers fail, return a fallback response
-        return "AI service temporarily unavailable. Please try again later."
+        return await self._call_chat_completions(
+            "poe", settings.POE_API_KEY, system_prompt, user_prompt, response_schema, on_delta
+        )
+
+    async def _call_structured(
+        self,
+        provider: str,
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Type[ModelT],
+        operation: str = "general",
+        priority: int = PRIORITY_INTERACTIVE,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> ModelT:
+        """
+        Call a provider in JSON mode and validate the reply against a schema.
+        Fields passed to `on_field` while streaming are provisional until this returns.
+        A reply that fails validation gets one short repair call instead of a regeneration.
+        """
+        system_prompt = f"{system_prompt}\n\n{schema_instructions(response_schema)}"
+        response = await self._call_ai_provider(
+            provider, system_prompt, user_prompt, operation, priority, response_schema, on_field
+        )
+
+        try:
+            return parse_structured(response, response_schema)
+        except (ValidationError, StructuredOutputError) as e:
+            logger.warning("Structured AI output invalid, requesting repair", operation=operation, error=str(e))
+            error = str(e)
+
+        repaired = await self._call_ai_provider(
+            provider,
+            f"{STRUCTURED_REPAIR_SYSTEM_PROMPT}\n\n{schema_instructions(response_schema)}",
+            STRUCTURED_REPAIR_PROMPT.render({"errors": error, "output": response}),
+            operation,
+            priority,
+            response_schema
+        )
+        try:
+            return parse_structured(repaired, response_schema)
+        except (ValidationError, StructuredOutputError) as e:
+            raise StructuredOutputError(f"AI output still invalid after repair: {e}") from e
 
     # New methods for API endpoints
-    async def enhance_domain_suggestions(self, suggestions: List[Any]) -> List[Any]:
-        """Enhance domain suggestions with AI scoring"""
+    async def enhance_domain_suggestions(
+        self,
+        suggestions: List[Any],
+        query: Optional[str] = None,
+        use_llm: bool = False
+    ) -> List[Any]:
+        """
+        Score domain suggestions and, given the search query, rank them by semantic
+        relevance locally. LLM scoring is opt-in since it costs a provider round-trip.
+        """
         try:
+            if use_llm:
+                # Each suggestion joins the shared scoring batch; concurrent searches
+                # are packed into the same provider call
+                scores = await asyncio.gather(
+                    *[
+                        self.scoring_batcher.submit({
+                            "domain": suggestion.full_domain,
+                            "heuristic_score": round(suggestion.score, 3)
+                        })
+                        for suggestion in suggestions
+                    ],
+                    return_exceptions=True
+                )
+            else:
+                scores = [suggestion.score for suggestion in suggestions]
+
+            relevance = None
+            if query and suggestions:
+                relevance = self.embedding_index.similarity(query, [suggestion.name for suggestion in suggestions])
+
             enhanced = []
-            for suggestion in suggestions:
-                # Mock enhancement - in production, use AI to score suggestions
-                suggestion.ai_score = suggestion.score * 0.9  # Slight adjustment
+            for position, (suggestion, score) in enumerate(zip(suggestions, scores)):
+                if isinstance(score, Exception):
+                    # Fall back to the heuristic score when AI scoring is unavailable
+                    score = suggestion.score * 0.9
+                if relevance is not None:
+                    # Scale rather than add so the blend works whatever range the base score uses
+                    score = score * (0.5 + 0.5 * max(float(relevance[position]), 0.0))
+                suggestion.ai_score = score
                 enhanced.append(suggestion)
+
+            if relevance is not None:
+                enhanced.sort(key=lambda suggestion: suggestion.ai_score, reverse=True)
             return enhanced
         except Exception as e:
             logger.error("Domain suggestion enhancement failed", error=str(e))
             return suggestions
 
+    async def _run_domain_approval_batch(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """Evaluate a batch of domain approval requests with one provider call"""
+        if len(requests) == 1:
+            # Nothing to pack; a lone request uses the regular single-item prompt
+            operation_config = self.operation_contexts["domain_approval"]
+            response = await self._call_ai_provider(
+                operation_config["provider"],
+                operation_config["system_prompt"],
+                self._prepare_context_prompt("domain_approval", requests[0]),
+                operation="domain_approval",
+                priority=PRIORITY_AUTONOMOUS
+            )
+            return [response]
+
+        batch_config = self.batch_contexts["domain_approval"]
+        lines = [f"Domain Registration Requests ({len(requests)}):"]
+        for index, request in enumerate(requests):
+            lines.append(f"[{index}] " + canonical_json({
+                "domain_name": request.get("domain_name", "N/A"),
+                "tld": request.get("tld", "N/A"),
+                "registrant": request.get("registrant_address", "N/A"),
+                "content_type": request.get("content_type", "N/A"),
+                "additional_info": request.get("additional_info", "N/A")
+            }))
+        lines.append("Please evaluate every request.")
+
+        response = await self._call_ai_provider(
+            batch_config["provider"],
+            batch_config["system_prompt"],
+            "\n".join(lines),
+            operation="domain_approval",
+            priority=PRIORITY_AUTONOMOUS
+        )
+
+        # Each caller gets its own decision in the same JSON shape as a single request
+        return [
+            result if isinstance(result, Exception) else json.dumps(result)
+            for result in self._parse_batch_response(response, len(requests))
+        ]
+
+    async def _run_suggestion_scoring_batch(self, candidates: List[Dict[str, Any]]) -> List[Any]:
+        """Score a batch of domain suggestions with one provider call"""
+        batch_config = self.batch_contexts["suggestion_scoring"]
+        lines = [f"Candidate Domains ({len(candidates)}):"]
+        for index, candidate in enumerate(candidates):
+            lines.append(
+                f"[{index}] {candidate['domain']} (heuristic score: {candidate['heuristic_score']})"
+            )
+
+        response = await self._call_ai_provider(
+            batch_config["provider"],
+            batch_config["system_prompt"],
+            "\n".join(lines),
+            operation="suggestion_scoring"
+        )
+
+        scores = []
+        for result in self._parse_batch_response(response, len(candidates)):
+            if isinstance(result, Exception):
+                scores.append(result)
+                continue
+            try:
+                scores.append(min(max(float(result["score"]), 0.0), 1.0))
+            except (KeyError, TypeError, ValueError):
+                scores.append(ValueError("AI batch result has no valid score"))
+        return scores
+
+    def _parse_batch_response(self, response: str, count: int) -> List[Any]:
+        """
+        Split a JSON array batch response into one result per item.
+        Items the model skipped or garbled come back as exceptions so only their callers fail.
+        """
+        try:
+            start = response.index("[")
+            end = response.rindex("]") + 1
+            parsed = json.loads(response[start:end])
+            if not isinstance(parsed, list):
+                raise ValueError("Batch response is not a JSON array")
+        except ValueError as e:
+            # One exception per item: each waiter raises its own, with its own traceback
+            return [ValueError(f"Unparseable AI batch response: {e}") for _ in range(count)]
+
+        results: List[Any] = [ValueError("AI batch response omitted this item") for _ in range(count)]
+        for position, entry in enumerate(parsed):
+            if not isinstance(entry, dict):
+                continue
+            index = entry.pop("index", position)
+            if isinstance(index, int) and 0 <= index < count:
+                results[index] = entry
+        return results
+
     async def process_chat_message(self, message: str, context: Optional[str] = None, user_address: Optional[str] = None) -> Any:
         """Process chat message and return AI response"""
         try:
-            system_prompt = """You are an AI assistant for the NXD Platform, a Web3 domain management system. 
-            Help users with domain registration, staking, governance, and platform navigation. 
-            Be helpful, informative, and guide users toward appropriate actions."""
-            
             user_prompt = f"User message: {message}"
             if context:
                 user_prompt += f"\nContext: {context}"
             if user_address:
                 user_prompt += f"\nUser address: {user_address}"
             
-            response_text = await self._call_ai_provider("grok", system_prompt, user_prompt)
+            response_text = await self._call_ai_provider("grok", CHAT_SYSTEM_PROMPT, user_prompt, operation="chat")
             
             # Mock response object
             class ChatResponse:
@@ -355,29 +956,42 @@ class AIGateway:
                     self.context = None
             return ChatResponse("I'm having trouble processing your request. Please try again.")
 
-    async def analyze_domain(self, domain: str, domain_data: Dict[str, Any], analysis_type: str = "comprehensive") -> Any:
+    async def analyze_domain(
+        self,
+        domain: str,
+        domain_data: Dict[str, Any],
+        analysis_type: str = "comprehensive",
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> Any:
         """Analyze domain with AI insights"""
         try:
-            system_prompt = """You are a domain valuation expert. Analyze the provided domain and give insights on:
-            - Market potential
-            - Brand value
-            - Investment opportunity
-            - Recommendations"""
-            
-            user_prompt = f"""Analyze domain: {domain}
-            Data: {json.dumps(domain_data, indent=2)}
-            Analysis type: {analysis_type}"""
+            user_prompt = DOMAIN_ANALYSIS_PROMPT.render({
+                "domain": domain,
+                "domain_data": domain_data,
+                "analysis_type": analysis_type
+            })
             
-            analysis_text = await self._call_ai_provider("grok", system_prompt, user_prompt)
+            output = await self._call_structured(
+                "grok",
+                DOMAIN_ANALYSIS_SYSTEM_PROMPT,
+                user_prompt,
+                DomainAnalysisOutput,
+                operation="domain_analysis",
+                on_field=on_field
+            )
+            score = domain_data.get("score")
+            overall_score = (
+                score.get("overall_score", 0.5) if isinstance(score, dict)
+                else getattr(score, "overall_score", 0.5)
+            )
             
-            # Mock analysis object
             class DomainAnalysis:
                 def __init__(self):
-                    self.analysis = analysis_text
-                    self.score = domain_data.get("score", {}).get("overall_score", 0.5)
-                    self.market_insights = ["Domain has strong brandability", "Tech keywords increase value"]
-                    self.recommendations = ["Consider registering", "Good for tech startups"]
-                    self.confidence = 0.85
+                    self.analysis = output.analysis
+                    self.score = overall_score
+                    self.market_insights = output.market_insights
+                    self.recommendations = output.recommendations
+                    self.confidence = output.confidence
             
             return DomainAnalysis()
             
@@ -392,25 +1006,39 @@ class AIGateway:
                     self.confidence = 0.0
             return DomainAnalysis()
 
-    async def make_autonomous_decision(self, decision_type: str, context: Dict[str, Any], requires_approval: bool = True) -> Any:
+    async def make_autonomous_decision(
+        self,
+        decision_type: str,
+        context: Dict[str, Any],
+        requires_approval: bool = True,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> Any:
         """Make autonomous AI decision"""
+        self.autonomous_in_progress += 1
         try:
-            system_prompt = f"""You are an autonomous AI system for the NXD Platform making a {decision_type} decision.
-            Consider the context carefully and make a reasoned decision with clear justification."""
-            
-            user_prompt = f"""Decision type: {decision_type}
-            Context: {json.dumps(context, indent=2)}
-            Requires approval: {requires_approval}"""
+            system_prompt = AUTONOMOUS_DECISION_SYSTEM_PROMPT.render({"decision_type": decision_type})
+            user_prompt = AUTONOMOUS_DECISION_PROMPT.render({
+                "decision_type": decision_type,
+                "context": context,
+                "requires_approval": str(requires_approval)
+            })
             
-            decision_text = await self._call_ai_provider("grok", system_prompt, user_prompt)
+            output = await self._call_structured(
+                "grok",
+                system_prompt,
+                user_prompt,
+                AutonomousDecisionOutput,
+                operation="autonomous_decision",
+                priority=PRIORITY_AUTONOMOUS,
+                on_field=on_field
+            )
             
-            # Mock decision object
             class Decision:
                 def __init__(self):
                     self.id = f"decision_{int(datetime.now().timestamp())}"
-                    self.action = decision_text[:200]  # Truncate for demo
-                    self.confidence = 0.8
-                    self.reasoning = decision_text
+                    self.action = output.action
+                    self.confidence = output.confidence
+                    self.reasoning = output.reasoning
                     self.auto_execute = not requires_approval and self.confidence > 0.7
                     self.requires_approval = requires_approval
             
@@ -427,6 +1055,40 @@ class AIGateway:
                     self.auto_execute = False
                     self.requires_approval = True
             return Decision()
+        finally:
+            self.autonomous_in_progress -= 1
+
+    async def run_decision_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Job queue handler for autonomous decisions.
+        Known operation types go through process_autonomous_request; anything else is a
+        free-form decision. Raises on failure so the queue can retry.
+        """
+        decision_type = payload["decision_type"]
+        context = payload.get("context", {})
+        requires_approval = payload.get("requires_approval", True)
+
+        if decision_type in self.operation_contexts:
+            result = await self.process_autonomous_request(decision_type, context)
+            if not result["success"]:
+                raise RuntimeError(result["error"])
+            return result
+
+        decision = await self.make_autonomous_decision(decision_type, context, requires_approval)
+        if decision.id == "error":
+            raise RuntimeError(decision.reasoning)
+
+        auto_executed = decision.auto_execute and not requires_approval
+        if auto_executed:
+            await self.execute_decision(decision)
+
+        return {
+            "decision": decision.action,
+            "confidence": decision.confidence,
+            "reasoning": decision.reasoning,
+            "auto_executed": auto_executed,
+            "requires_approval": decision.requires_approval
+        }
 
     async def execute_decision(self, decision: Any):
         """Execute an AI decision"""
@@ -440,44 +1102,58 @@ class AIGateway:
     async def generate_domain_suggestions(self, prompt: str, category: Optional[str] = None, count: int = 10) -> List[str]:
         """Generate domain name suggestions using AI"""
         try:
-            system_prompt = """You are a creative domain name generator. Generate catchy, brandable domain names 
-            that are memorable, easy to spell, and relevant to the prompt. Focus on Web3, tech, and modern naming conventions."""
-            
             user_prompt = f"Generate {count} domain name suggestions for: {prompt}"
             if category:
                 user_prompt += f" in the {category} category"
             
-            response = await self._call_ai_provider("grok", system_prompt, user_prompt)
+            output = await self._call_structured(
+                "grok",
+                DOMAIN_SUGGESTIONS_SYSTEM_PROMPT,
+                user_prompt,
+                DomainSuggestionsOutput,
+                operation="domain_suggestions"
+            )
             
-            # Extract domain names from response (mock implementation)
-            suggestions = [
-                f"{prompt.lower()}app",
-                f"{prompt.lower()}lab",
-                f"get{prompt.lower()}",
-                f"{prompt.lower()}pro",
-                f"my{prompt.lower()}",
-                f"{prompt.lower()}hub",
-                f"{prompt.lower()}net",
-                f"super{prompt.lower()}",
-                f"{prompt.lower()}dao",
-                f"meta{prompt.lower()}"
-            ][:count]
+            # Keep valid, unique labels; models sometimes append a TLD or stray punctuation
+            suggestions = []
+            for name in output.suggestions:
+                label = re.sub(r"[^a-z0-9-]", "", name.strip().lower().split(".")[0]).strip("-")
+                if label and label not in suggestions:
+                    suggestions.append(label)
+            if not suggestions:
+                raise StructuredOutputError("AI returned no usable domain names")
             
-            return suggestions
+            # Order by semantic closeness to what the user asked for
+            query = f"{prompt} {category}" if category else prompt
+            return [name for name, _ in self.embedding_index.rank(query, suggestions)][:count]
             
         except Exception as e:
             logger.error("Domain suggestion generation failed", error=str(e))
-            return [f"{prompt.lower()}{i}" for i in range(1, count + 1)]
+            return self._local_domain_suggestions(prompt, category, count)
+
+    def _local_domain_suggestions(self, prompt: str, category: Optional[str], count: int) -> List[str]:
+        """Compose and rank suggestions from the keyword index without a provider call"""
+        query = f"{prompt} {category}" if category else prompt
+        words = re.findall(r"[a-z0-9]+", prompt.lower())
+        base = max(words, key=len) if words else "nxd"
+
+        related = [word for word, _ in self.embedding_index.top_k([query], k=max(count, 8))[0] if word != base]
+        candidates = [base]
+        for word in related:
+            candidates.extend([f"{base}{word}", f"{word}{base}"])
+        candidates = [name for name in dict.fromkeys(candidates) if len(name) <= 24]
+
+        return [name for name, _ in self.embedding_index.rank(query, candidates)][:count]
 
     async def generate_predictions(self, metric: str, timeframe: str) -> Any:
         """Generate AI predictions for platform metrics"""
         try:
-            system_prompt = """You are a data analyst specializing in Web3 and domain market predictions. 
-            Analyze trends and provide realistic forecasts with confidence intervals."""
-            
             user_prompt = f"Generate predictions for {metric} over {timeframe} timeframe"
             
-            prediction_text = await self._call_ai_provider("grok", system_prompt, user_prompt)
+            prediction_text = await self._call_ai_provider(
+                "grok", PREDICTIONS_SYSTEM_PROMPT, user_prompt, operation="predictions"
+            )
+            self.last_prediction_time = datetime.now().isoformat()
             
             # Mock prediction object
             class Prediction:
@@ -529,31 +1205,47 @@ class AIGateway:
                     self.response = "I couldn't understand your voice command."
             return VoiceResult()
 
+    async def startup(self):
+        """Start background tasks that need the running event loop"""
+        self.decision_log.start()
+
+    async def shutdown(self):
+        """Write out pending decision log entries and close provider HTTP clients"""
+        await self.decision_log.stop()
+        await self.http_client.aclose()
+        await self.local_http_client.aclose()
+        for client in (self.openai_client, self.anthropic_client):
+            if client is not None:
+                await client.close()
+
     async def get_service_status(self) -> Any:
-        """Get AI service status"""
+        """Get AI service status from live traffic counters, without calling any provider"""
         try:
-            # Check provider availability
             provider_status = {}
-            for provider, config in self.providers.items():
-                try:
-                    if provider == "grok" and settings.XAI_API_KEY:
-                        provider_status[provider] = "available"
-                    elif provider == "openai" and self.openai_client:
-                        provider_status[provider] = "available"
-                    elif provider == "anthropic" and self.anthropic_client:
-                        provider_status[provider] = "available"
-                    else:
-                        provider_status[provider] = "unavailable"
-                except:
-                    provider_status[provider] = "error"
+            provider_metrics = {}
+            for provider in self.providers:
+                if not self._provider_configured(provider):
+                    provider_status[provider] = "unavailable"
+                    continue
+                summary = self.telemetry.provider_health(provider).summary()
+                provider_status[provider] = summary["status"]
+                provider_metrics[provider] = summary
+
+            pending = (
+                self.autonomous_in_progress +
+                self.approval_batcher.pending_count
+            )
+            uptime = self.telemetry.uptime_seconds
+            last_prediction = self.last_prediction_time
             
             class ServiceStatus:
                 def __init__(self):
                     self.provider_status = provider_status
+                    self.provider_metrics = provider_metrics
                     self.autonomous_enabled = True
-                    self.pending_decisions = 0
-                    self.last_prediction_time = datetime.now().isoformat()
-                    self.uptime_seconds = 3600  # 1 hour mock uptime
+                    self.pending_decisions = pending
+                    self.last_prediction_time = last_prediction
+                    self.uptime_seconds = uptime
             
             return ServiceStatus()
             
@@ -562,85 +1254,54 @@ class AIGateway:
             class ServiceStatus:
                 def __init__(self):
                     self.provider_status = {}
+                    self.provider_metrics = {}
                     self.autonomous_enabled = False
                     self.pending_decisions = 0
                     self.last_prediction_time = None
                     self.uptime_seconds = 0
             return ServiceStatus()
-        
-        response = await self.anthropic_client.messages.create(
-            model=self.providers["anthropic"]["model"],
-            max_tokens=self.providers["anthropic"]["max_tokens"],
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
-        return response.content[0].text
-    
-    async def _call_deepseek(self, system_prompt: str, user_prompt: str) -> str:
-        """Call DeepSeek API"""
-        if not settings.DEEPSEEK_API_KEY:
-            raise ValueError("DeepSeek API key not configured")
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.providers["deepseek"]["api_url"],
-                headers={
-                    "Authorization": f"Bearer {settings.DEEPSEEK_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.providers["deepseek"]["model"],
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "max_tokens": self.providers["deepseek"]["max_tokens"],
-                    "temperature": 0.7
-                }
-            )
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-    
-    async def _call_poe(self, system_prompt: str, user_prompt: str) -> str:
-        """Call Poe AI API"""
-        if not settings.POE_API_KEY:
-            raise ValueError("Poe API key not configured")
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.providers["poe"]["api_url"],
-                headers={
-                    "Authorization": f"Bearer {settings.POE_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.providers["poe"]["model"],
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "max_tokens": self.providers["poe"]["max_tokens"],
-                    "temperature": 0.7
-                }
-            )
-            response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
-    
-    async def _fallback_provider_call(self, failed_provider: str, system_prompt: str, user_prompt: str) -> str:
+
+    def _provider_configured(self, provider: str) -> bool:
+        """Whether a provider has the credentials it needs"""
+        if settings.AI_OFFLINE_MODE or provider == "local":
+            return True
+        if provider == "openai":
+            return self.openai_client is not None
+        if provider == "anthropic":
+            return self.anthropic_client is not None
+        return bool(self.providers[provider].get("api_key"))
+
+    async def _fallback_provider_call(
+        self,
+        failed_provider: str,
+        system_prompt: str,
+        user_prompt: str,
+        operation: str = "general",
+        priority: int = PRIORITY_INTERACTIVE,
+        response_schema: Optional[Type[BaseModel]] = None,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> str:
         """Fallback to next available provider"""
-        # Sort providers by priority
+        self.telemetry.record_fallback(failed_provider, operation)
+        # Sort providers by priority; the local emulator only answers in offline mode,
+        # never as a stand-in for real providers that are down or unconfigured
         sorted_providers = sorted(
-            [(name, config) for name, config in self.providers.items() if name != failed_provider],
+            [
+                (name, config) for name, config in self.providers.items()
+                if name != failed_provider and (name != "local" or settings.AI_OFFLINE_MODE)
+            ],
             key=lambda x: x[1]["priority"]
         )
         
         for provider_name, _ in sorted_providers:
             try:
-                return await self._call_ai_provider(provider_name, system_prompt, user_prompt)
+                # Call providers directly: going back through _call_ai_provider would
+                # recurse into fallback and join the caller's own in-flight entry
+                return await self._invoke_provider(
+                    provider_name, system_prompt, user_prompt, operation, priority, response_schema, on_field
+                )
+            except BudgetExceededError:
+                raise
             except Exception as e:
                 logger.warning("Fallback provider failed", provider=provider_name, error=str(e))
                 continue
@@ -648,116 +1309,73 @@ class AIGateway:
         raise Exception("All AI providers failed")
     
     def _prepare_context_prompt(self, operation_type: str, context_data: Dict[str, Any]) -> str:
-        """Prepare context-specific prompt"""
-        if operation_type == "domain_approval":
-            return f"""
-            Domain Registration Request:
-            - Domain Name: {context_data.get('domain_name', 'N/A')}
-            - TLD: {context_data.get('tld', 'N/A')}
-            - Registrant: {context_data.get('registrant_address', 'N/A')}
-            - Content Type: {context_data.get('content_type', 'N/A')}
-            - Additional Info: {context_data.get('additional_info', 'N/A')}
-            
-            Please evaluate this domain registration request.
-            """
-        
-        elif operation_type == "fee_adjustment":
-            return f"""
-            Current Platform Metrics:
-            - Daily Registrations: {context_data.get('daily_registrations', 0)}
-            - Current Fee: {context_data.get('current_fee', 0)} ETH
-            - Platform Utilization: {context_data.get('utilization_rate', 0)}%
-            - Competitor Average Fee: {context_data.get('competitor_avg_fee', 0)} ETH
-            - Revenue Trend: {context_data.get('revenue_trend', 'stable')}
-            
-            Recommend fee adjustments based on these metrics.
-            """
-        
-        elif operation_type == "governance_proposal":
-            return f"""
-            Platform Status:
-            - Active Domains: {context_data.get('active_domains', 0)}
-            - Staking Participation: {context_data.get('staking_participation', 0)}%
-            - User Feedback Summary: {context_data.get('user_feedback', 'N/A')}
-            - Technical Issues: {context_data.get('technical_issues', [])}
-            - Feature Requests: {context_data.get('feature_requests', [])}
-            
-            Generate a governance proposal to address platform needs.
-            """
-        
-        elif operation_type == "market_analysis":
-            return f"""
-            Market Data:
-            - Platform Growth Rate: {context_data.get('growth_rate', 0)}%
-            - Market Share: {context_data.get('market_share', 0)}%
-            - Competitor Activities: {context_data.get('competitor_activities', [])}
-            - Industry Trends: {context_data.get('industry_trends', [])}
-            - User Demographics: {context_data.get('user_demographics', {})}
-            
-            Provide comprehensive market analysis and recommendations.
-            """
-        
-        elif operation_type == "user_support":
-            return f"""
-            User Query: {context_data.get('user_query', '')}
-            User Level: {context_data.get('user_level', 'beginner')}
-            Previous Context: {context_data.get('previous_context', 'None')}
-            """
-        
-        elif operation_type == "anomaly_detection":
-            return f"""
-            Platform Activity Data:
-            - Recent Transactions: {context_data.get('recent_transactions', [])}
-            - User Behavior Patterns: {context_data.get('user_patterns', {})}
-            - System Metrics: {context_data.get('system_metrics', {})}
-            - Error Rates: {context_data.get('error_rates', {})}
-            
-            Analyze for potential anomalies or security threats.
-            """
+        """Prepare context-specific prompt from the operation's precompiled template"""
+        template = OPERATION_PROMPT_TEMPLATES.get(operation_type)
+        if template is not None:
+            return template.render(context_data)
         
-        return json.dumps(context_data)
+        return canonical_json(context_data)
     
     async def get_decision_logs(self, operation_type: Optional[str] = None, limit: int = 100) -> List[Dict]:
         """Get AI decision logs for transparency"""
-        logs = self.decision_log
-        
-        if operation_type:
-            logs = [log for log in logs if log["operation_type"] == operation_type]
-        
-        return logs[-limit:]
+        page = self.decision_log.page(operation_type=operation_type, limit=limit)
+        # Oldest first, matching the order entries were logged in
+        return page["entries"][::-1]
+
+    async def get_decision_log_page(
+        self,
+        operation_type: Optional[str] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """Get a newest-first page of AI decision logs; pass next_cursor for the next page"""
+        return self.decision_log.page(operation_type=operation_type, cursor=cursor, limit=limit)
     
     async def override_decision(self, log_id: str, admin_decision: Dict[str, Any], justification: str):
         """Allow admin override of AI decisions"""
-        # Find the decision log entry
-        for log in self.decision_log:
-            if log.get("id") == log_id:
-                log["admin_override"] = {
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "decision": admin_decision,
-                    "justification": justification
-                }
-                break
+        log = self.decision_log.get(log_id)
+        if log is None:
+            raise ValueError(f"Unknown decision log entry: {log_id}")
+
+        log["admin_override"] = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "decision": admin_decision,
+            "justification": justification
+        }
+        # Persist the overridden entry again so the audit trail records the change
+        self.decision_log.persist(log)
         
         logger.info("AI decision overridden", log_id=log_id, justification=justification)
+
+    async def _persist_decision_batch(self, entries: List[Dict[str, Any]]):
+        """Pin a batch of decision log entries to IPFS for audit"""
+        result = await self.ipfs_service.pin_audit_log({
+            "type": "ai_decision_batch",
+            "timestamp": datetime.utcnow().isoformat(),
+            "entries": entries
+        })
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "IPFS pin failed"))
     
     async def health_check(self) -> Dict[str, Any]:
-        """Check AI service health"""
-        provider_status = {}
-        
-        for provider_name, config in self.providers.items():
-            try:
-                # Simple test call
-                test_response = await self._call_ai_provider(
-                    provider_name,
-                    "You are a test system.",
-                    "Respond with 'OK' if you are working."
-                )
-                provider_status[provider_name] = "healthy" if "OK" in test_response else "degraded"
-            except Exception as e:
-                provider_status[provider_name] = f"error: {str(e)}"
+        """Check AI service health passively from recent provider traffic"""
+        provider_status = {
+            provider: (
+                self.telemetry.provider_health(provider).status()
+                if self._provider_configured(provider) else "unavailable"
+            )
+            for provider in self.providers
+        }
         
+        # A provider nobody has called recently is assumed usable; the local
+        # stand-in only counts when it is actually serving traffic
+        usable = ("healthy", "degraded", "idle")
+        serving = [
+            status for provider, status in provider_status.items()
+            if provider != "local" or settings.AI_OFFLINE_MODE
+        ]
         return {
-            "overall_status": "healthy" if any(status == "healthy" for status in provider_status.values()) else "error",
+            "overall_status": "healthy" if any(status in usable for status in serving) else "error",
             "providers": provider_status,
             "decision_log_count": len(self.decision_log)
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,174 @@
+"""
+AI Rate Limiter
+Per-provider token buckets with priority queuing, and per-operation daily cost budgets
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import structlog
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-count estimate
+    tiktoken = None
+
+logger = structlog.get_logger()
+
+# Lower values are served first when a provider is saturated
+PRIORITY_INTERACTIVE = 0
+PRIORITY_AUTONOMOUS = 10
+
+class BudgetExceededError(Exception):
+    """Raised when an operation has used up its daily AI cost budget"""
+
+class RateLimitTimeoutError(Exception):
+    """Raised when a provider's rate limit keeps a call queued for too long"""
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the local tokenizer once"""
+    return tiktoken.get_encoding("cl100k_base")
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a prompt or completion locally"""
+    if not text:
+        return 0
+    if tiktoken is not None:
+        try:
+            return len(_get_encoding().encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    # Roughly four characters per token for English prose and JSON
+    return len(text) // 4 + 1
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `capacity` per `period_seconds`.
+    The balance may go negative when actual usage is reconciled after a call.
+    """
+
+    def __init__(self, capacity: float, period_seconds: float = 60.0):
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / period_seconds
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill()
+        # Requests bigger than the whole bucket are allowed once it is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_rate
+
+    def consume(self, amount: float):
+        """Take tokens without checking availability"""
+        self._refill()
+        self.tokens -= amount
+
+class ProviderRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter for one AI provider.
+    Callers wait in a priority queue; the head of the queue is admitted as soon as
+    both buckets have room, so autonomous work never starves interactive calls.
+    """
+
+    def __init__(self, name: str, requests_per_minute: int, tokens_per_minute: int):
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._drain_timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, tokens: int, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None):
+        """Wait for a request slot and `tokens` of throughput"""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._sequence), tokens, future])
+        self._drain()
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._drain()
+            raise RateLimitTimeoutError(f"Rate limit queue timeout for provider {self.name}")
+        except asyncio.CancelledError:
+            # The abandoned entry is skipped on the next drain
+            self._drain()
+            raise
+
+    def reconcile(self, reserved_tokens: int, actual_tokens: int):
+        """Correct the token bucket once the real usage of a call is known"""
+        self.token_bucket.consume(actual_tokens - reserved_tokens)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for capacity"""
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def _drain(self):
+        """Admit waiters in priority order while capacity lasts"""
+        if self._drain_timer is not None:
+            self._drain_timer.cancel()
+            self._drain_timer = None
+
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            wait = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(tokens))
+            if wait > 0:
+                self._drain_timer = asyncio.get_running_loop().call_later(wait, self._drain)
+                return
+
+            heapq.heappop(self._waiters)
+            self.request_bucket.consume(1)
+            self.token_bucket.consume(tokens)
+            future.set_result(None)
+
+class CostBudgeter:
+    """
+    Tracks estimated provider spend per operation for the current UTC day
+    """
+
+    def __init__(self, budgets: Dict[str, float], default_budget: float):
+        self.budgets = budgets
+        self.default_budget = default_budget
+        self.day = datetime.utcnow().date()
+        self.spent: Dict[str, float] = {}
+
+    def _roll_day(self):
+        today = datetime.utcnow().date()
+        if today != self.day:
+            self.day = today
+            self.spent = {}
+
+    def remaining(self, operation: str) -> float:
+        """Budget left today for an operation, in USD"""
+        self._roll_day()
+        budget = self.budgets.get(operation, self.default_budget)
+        return budget - self.spent.get(operation, 0.0)
+
+    def check(self, operation: str, estimated_cost: float):
+        """Raise if the estimated cost does not fit in today's budget"""
+        if estimated_cost > self.remaining(operation):
+            raise BudgetExceededError(f"Daily AI budget exhausted for operation: {operation}")
+
+    def charge(self, operation: str, cost: float):
+        """Record spend against an operation"""
+        self._roll_day()
+        self.spent[operation] = self.spent.get(operation, 0.0) + cost
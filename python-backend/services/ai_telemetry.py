@@ -0,0 +1,168 @@
+"""
+AI Telemetry
+Prometheus instrumentation of AI provider calls and passive provider health derived from live traffic
+"""
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+# Module-level so every AIGateway instance reports into the same series
+AI_REQUESTS = Counter(
+    "nxd_ai_requests_total", "AI provider calls", ["provider", "operation", "outcome"]
+)
+AI_LATENCY = Histogram(
+    "nxd_ai_request_duration_seconds", "AI provider call latency", ["provider", "operation"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+)
+AI_TIME_TO_FIRST_TOKEN = Histogram(
+    "nxd_ai_time_to_first_token_seconds", "Time to the first streamed token", ["provider", "operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15)
+)
+AI_QUEUE_WAIT = Histogram(
+    "nxd_ai_rate_limit_wait_seconds", "Time spent queued behind provider rate limits", ["provider", "operation"],
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 5, 15, 30)
+)
+AI_INPUT_TOKENS = Histogram(
+    "nxd_ai_input_tokens", "Prompt tokens per AI provider call", ["provider", "operation"],
+    buckets=(50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+)
+AI_OUTPUT_TOKENS = Histogram(
+    "nxd_ai_output_tokens", "Completion tokens per AI provider call", ["provider", "operation"],
+    buckets=(10, 50, 100, 250, 500, 1000, 2000, 4000)
+)
+AI_COST = Histogram(
+    "nxd_ai_cost_usd", "Estimated cost per AI provider call in USD", ["provider", "operation"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+)
+AI_CACHE_HITS = Counter(
+    "nxd_ai_cache_hits_total", "AI calls answered from a cache", ["provider", "cache"]
+)
+AI_FALLBACKS = Counter(
+    "nxd_ai_fallbacks_total", "Calls retried on a fallback provider", ["failed_provider", "operation"]
+)
+
+class ProviderHealth:
+    """
+    Rolling window of call outcomes for one provider
+    """
+
+    def __init__(self, window_seconds: float = 300.0, max_samples: int = 1000):
+        self.window_seconds = window_seconds
+        self.samples: Deque[Tuple[float, bool, float]] = deque(maxlen=max_samples)
+        self.consecutive_failures = 0
+        self.total_requests = 0
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def record(self, success: bool, latency: float, error: Optional[str] = None):
+        self.samples.append((time.time(), success, latency))
+        self.total_requests += 1
+        if success:
+            self.consecutive_failures = 0
+            self.last_success = time.time()
+        else:
+            self.consecutive_failures += 1
+            self.last_error = error
+
+    def _prune(self):
+        cutoff = time.time() - self.window_seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+
+    def status(self) -> str:
+        """healthy, degraded, unhealthy, or idle when there was no recent traffic"""
+        self._prune()
+        if self.consecutive_failures >= 3:
+            return "unhealthy"
+        if not self.samples:
+            return "idle"
+        error_rate = self.error_rate()
+        if error_rate > 0.5:
+            return "unhealthy"
+        if error_rate > 0.1:
+            return "degraded"
+        return "healthy"
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, success, _ in self.samples if not success) / len(self.samples)
+
+    def summary(self) -> Dict[str, Any]:
+        self._prune()
+        latencies = sorted(latency for _, success, latency in self.samples if success)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 3)
+
+        return {
+            "status": self.status(),
+            "window_requests": len(self.samples),
+            "total_requests": self.total_requests,
+            "error_rate": round(self.error_rate(), 3),
+            "consecutive_failures": self.consecutive_failures,
+            "latency_p50_seconds": percentile(0.5),
+            "latency_p95_seconds": percentile(0.95),
+            "last_success": self.last_success,
+            "last_error": self.last_error
+        }
+
+class AITelemetry:
+    """
+    Records every provider call into Prometheus and the per-provider health windows
+    """
+
+    def __init__(self, window_seconds: float = 300.0):
+        self.started_at = time.monotonic()
+        self.window_seconds = window_seconds
+        self.health: Dict[str, ProviderHealth] = {}
+
+    @property
+    def uptime_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def provider_health(self, provider: str) -> ProviderHealth:
+        health = self.health.get(provider)
+        if health is None:
+            health = self.health[provider] = ProviderHealth(self.window_seconds)
+        return health
+
+    def record_call(
+        self,
+        provider: str,
+        operation: str,
+        latency: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cost: float = 0.0,
+        error: Optional[str] = None
+    ):
+        """Record a completed or failed provider call"""
+        success = error is None
+        AI_REQUESTS.labels(provider, operation, "success" if success else "error").inc()
+        AI_LATENCY.labels(provider, operation).observe(latency)
+        if success:
+            AI_INPUT_TOKENS.labels(provider, operation).observe(input_tokens)
+            AI_OUTPUT_TOKENS.labels(provider, operation).observe(output_tokens)
+            AI_COST.labels(provider, operation).observe(cost)
+        self.provider_health(provider).record(success, latency, error)
+
+    def record_rejected(self, provider: str, operation: str, reason: str):
+        """Record a call refused before reaching the provider (budget, rate-limit timeout)"""
+        AI_REQUESTS.labels(provider, operation, reason).inc()
+
+    def record_queue_wait(self, provider: str, operation: str, seconds: float):
+        AI_QUEUE_WAIT.labels(provider, operation).observe(seconds)
+
+    def record_first_token(self, provider: str, operation: str, seconds: float):
+        AI_TIME_TO_FIRST_TOKEN.labels(provider, operation).observe(seconds)
+
+    def record_cache_hit(self, provider: str, cache: str):
+        AI_CACHE_HITS.labels(provider, cache).inc()
+
+    def record_fallback(self, failed_provider: str, operation: str):
+        AI_FALLBACKS.labels(failed_provider, operation).inc()
@@ -0,0 +1,208 @@
+"""
+Block Cache
+Read-through cache of chain state keyed by block number, advanced by a new-heads poller
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+MODE_LATEST = "latest"
+MODE_LATEST_SAFE = "latest_safe"
+
+class BlockCache:
+    """
+    Chain reads for one network, each stored with the block it was read at.
+
+    In "latest" mode a value is served only if it was read at the current head;
+    otherwise it is fetched once (concurrent callers share the fetch) and stored.
+    In "latest_safe" mode any stored value is returned immediately, even from an
+    earlier block, and a stale one is refreshed in the background.
+
+    A poller task tracks the head with eth_blockNumber every `poll_interval`
+    seconds. Without it, or when it falls behind, the head is looked up on demand
+    at most once per `poll_interval`.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        fetch_block_number: Callable[[], Awaitable[int]],
+        poll_interval: float = 2.0,
+        max_entries: int = 10000
+    ):
+        self.network = network
+        self.fetch_block_number = fetch_block_number
+        self.poll_interval = poll_interval
+        self.max_entries = max_entries
+
+        self.head: Optional[int] = None
+        self.head_updated_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+        self._values: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[Hashable, int], asyncio.Future] = {}
+        self._head_lookup: Optional[asyncio.Future] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._refreshes: Set[asyncio.Task] = set()
+        self._batch_refreshing: Set[Tuple[Hashable, int]] = set()
+
+    def start(self):
+        """Start the new-heads poller"""
+        if self._poll_task is None or self._poll_task.done():
+            self._poll_task = asyncio.create_task(self._poll_heads())
+
+    async def stop(self):
+        tasks = [task for task in (self._poll_task, *self._refreshes) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._poll_task = None
+
+    def advance(self, block_number: int):
+        """Move to a new head; values read at earlier blocks stop counting as fresh"""
+        if self.head is None or block_number > self.head:
+            self.head = block_number
+        self.head_updated_at = time.monotonic()
+
+    async def block_number(self) -> int:
+        """Current head, from the poller or a shared on-demand lookup"""
+        if self.head is not None and time.monotonic() - self.head_updated_at < self.poll_interval:
+            return self.head
+
+        if self._head_lookup is None:
+            self._head_lookup = asyncio.ensure_future(self.fetch_block_number())
+            self._head_lookup.add_done_callback(self._on_head_lookup)
+        return await asyncio.shield(self._head_lookup)
+
+    def lookup(self, key: Hashable, block_number: int, mode: str = MODE_LATEST) -> Tuple[bool, Any]:
+        """(hit, value) for `key` at `block_number` without fetching"""
+        entry = self._values.get(key)
+        if entry is None:
+            return False, None
+        read_at, value = entry
+        if read_at >= block_number or mode == MODE_LATEST_SAFE:
+            self._values.move_to_end(key)
+            return True, value
+        return False, None
+
+    def is_stale(self, key: Hashable, block_number: int) -> bool:
+        """Whether `key` is stored but was read before `block_number`"""
+        entry = self._values.get(key)
+        return entry is not None and entry[0] < block_number
+
+    def store(self, key: Hashable, block_number: int, value: Any):
+        entry = self._values.get(key)
+        if entry is not None and entry[0] > block_number:
+            return
+        self._values[key] = (block_number, value)
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+
+    async def get(
+        self,
+        key: Hashable,
+        fetch: Callable[[int], Awaitable[Any]],
+        mode: str = MODE_LATEST
+    ) -> Any:
+        """Value of `key` at the head; `fetch(block_number)` reads it on a miss"""
+        block_number = await self.block_number()
+        hit, value = self.lookup(key, block_number, mode)
+        if hit:
+            self.hits += 1
+            if mode == MODE_LATEST_SAFE and self._values[key][0] < block_number:
+                self._refresh_in_background(key, fetch, block_number)
+            return value
+
+        self.misses += 1
+        return await self._fetch(key, fetch, block_number)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "head": self.head,
+            "entries": len(self._values),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[int], Awaitable[Any]], block_number: int) -> Any:
+        flight_key = (key, block_number)
+        future = self._inflight.get(flight_key)
+        if future is None:
+            future = asyncio.ensure_future(fetch(block_number))
+            self._inflight[flight_key] = future
+
+            def on_done(done: asyncio.Future):
+                self._inflight.pop(flight_key, None)
+                if not done.cancelled() and done.exception() is None:
+                    self.store(key, block_number, done.result())
+
+            future.add_done_callback(on_done)
+        return await asyncio.shield(future)
+
+    def _refresh_in_background(self, key: Hashable, fetch: Callable[[int], Awaitable[Any]], block_number: int):
+        if (key, block_number) in self._inflight:
+            return
+        task = asyncio.ensure_future(self._fetch(key, fetch, block_number))
+        self._refreshes.add(task)
+        task.add_done_callback(self._on_refresh_done)
+
+    def refresh_many_in_background(
+        self,
+        keys: List[Hashable],
+        fetch_many: Callable[[int], Awaitable[List[Any]]],
+        block_number: int
+    ):
+        """
+        Re-read stale `keys` at `block_number` with a single `fetch_many(block_number)`
+        returning values in key order; None (a failed read) is not stored
+        """
+        keys = [
+            key for key in keys
+            if (key, block_number) not in self._inflight and (key, block_number) not in self._batch_refreshing
+        ]
+        if not keys:
+            return
+        flight_keys = {(key, block_number) for key in keys}
+        self._batch_refreshing |= flight_keys
+
+        async def refresh():
+            try:
+                values = await fetch_many(block_number)
+                for key, value in zip(keys, values):
+                    if value is not None:
+                        self.store(key, block_number, value)
+            finally:
+                self._batch_refreshing -= flight_keys
+
+        task = asyncio.ensure_future(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._on_refresh_done)
+
+    def _on_refresh_done(self, task: asyncio.Task):
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background chain read refresh failed", network=self.network, error=str(task.exception()))
+
+    def _on_head_lookup(self, future: asyncio.Future):
+        self._head_lookup = None
+        if not future.cancelled() and future.exception() is None:
+            self.advance(future.result())
+
+    async def _poll_heads(self):
+        while True:
+            try:
+                self.advance(await self.fetch_block_number())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("New head poll failed", network=self.network, error=str(e))
+            await asyncio.sleep(self.poll_interval)
@@ -3,18 +3,38 @@ Blockchain Service
 Handles smart contract interactions and blockchain operations
 """
 import asyncio
-from typing import Dict, List, Optional, Any
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+import aiohttp
 import httpx
 import structlog
-from web3 import Web3
+from web3 import AsyncWeb3, Web3
 from eth_account import Account
 
 from core.config import settings
+from services.block_cache import MODE_LATEST, MODE_LATEST_SAFE, BlockCache
+from services.contract_artifacts import ArtifactStore, ContractCodec
+from services.gas_oracle import SPEEDS, GasOracle
+from services.multicall import BlockIdentifier, ContractCall, Multicall
+from services.rpc_batcher import JsonRpcBatcher
+from services.rpc_pool import RpcEndpoint, RpcEndpointPool
+from services.staking_engine import SECONDS_PER_DAY, StakePositions, StakingEngine
+from services.tx_pipeline import TransactionPipeline
 
 logger = structlog.get_logger()
 
+# Gas limit sent with registerDomain; also the basis of registration fee quotes
+REGISTRATION_GAS = 300000
+
+# registerDomainsBatch pays the transaction overhead once, then roughly this much per domain
+BATCH_REGISTRATION_BASE_GAS = 60000
+BATCH_REGISTRATION_GAS_PER_DOMAIN = 260000
+
+# Mirrors NXDomainRegistry.MAX_BATCH_REGISTRATIONS
+MAX_BATCH_REGISTRATIONS = 50
+
 @dataclass
 class RegistrationResult:
     """Result of domain registration transaction"""
@@ -23,6 +43,16 @@ class RegistrationResult:
     domain: str
     gas_used: Optional[int] = None
     block_number: Optional[int] = None
+    # Demo result from the placeholder ABI; tx_hash is not a real transaction
+    placeholder: bool = False
+
+@dataclass
+class BatchRegistrationResult:
+    """Outcome of a bulk registration; rejected domains were never submitted"""
+    registered: List[RegistrationResult]
+    failed: List[Dict[str, str]]
+    total_fee: int
+    tx_hashes: List[str]
 
 @dataclass
 class ContractInfo:
@@ -37,10 +67,89 @@ class BlockchainService:
     """
     
     def __init__(self):
-        # Initialize Web3 connections
-        self.ethereum_w3 = Web3(Web3.HTTPProvider(settings.ETHEREUM_RPC_URL))
-        self.polygon_w3 = Web3(Web3.HTTPProvider(settings.POLYGON_RPC_URL))
-        self.base_w3 = Web3(Web3.HTTPProvider(settings.BASE_RPC_URL))
+        self.rpc_urls = {
+            "ethereum": settings.ETHEREUM_RPC_URL,
+            "polygon": settings.POLYGON_RPC_URL,
+            "base": settings.BASE_RPC_URL
+        }
+
+        # Async Web3 connections; startup() gives each a pooled HTTP session
+        self.ethereum_w3 = self._create_async_client(settings.ETHEREUM_RPC_URL)
+        self.polygon_w3 = self._create_async_client(settings.POLYGON_RPC_URL)
+        self.base_w3 = self._create_async_client(settings.BASE_RPC_URL)
+        self.rpc_sessions: Dict[str, aiohttp.ClientSession] = {}
+
+        # Each network's primary URL plus its fallbacks; reads go to the fastest endpoint in sync with the head
+        fallback_urls = {
+            "ethereum": settings.ETHEREUM_RPC_FALLBACK_URLS,
+            "polygon": settings.POLYGON_RPC_FALLBACK_URLS,
+            "base": settings.BASE_RPC_FALLBACK_URLS
+        }
+        self.rpc_pools = {
+            network: RpcEndpointPool(
+                network,
+                [RpcEndpoint(primary_url, self._get_web3_client(network).provider, settings.RPC_ENDPOINT_RATE_LIMIT)]
+                + [
+                    RpcEndpoint(url.strip(), self._create_provider(url.strip()), settings.RPC_ENDPOINT_RATE_LIMIT)
+                    for url in fallback_urls[network].split(",")
+                    if url.strip() and url.strip() != primary_url
+                ],
+                max_head_lag=settings.RPC_MAX_HEAD_LAG,
+                probe_interval=settings.RPC_PROBE_SECONDS
+            )
+            for network, primary_url in self.rpc_urls.items()
+        }
+
+        # Concurrent reads on a network share one JSON-RPC batch request
+        self.rpc_batchers = {
+            network: JsonRpcBatcher(
+                self.rpc_pools[network],
+                network,
+                max_batch_size=settings.RPC_BATCH_MAX_SIZE,
+                max_wait_ms=settings.RPC_BATCH_MAX_WAIT_MS
+            )
+            for network in self.rpc_urls
+        }
+
+        # View calls are packed into Multicall3 aggregate3 eth_calls, which then share the RPC batch
+        self.multicalls = {
+            network: Multicall(
+                partial(self.rpc, network),
+                address=settings.MULTICALL3_ADDRESS,
+                max_calls=settings.MULTICALL_MAX_CALLS
+            )
+            for network in self.rpc_urls
+        }
+
+        # Per-block read cache; a new-heads poller per network moves it forward
+        self.block_caches = {
+            network: BlockCache(
+                network,
+                partial(self.rpc_quantity, network, "eth_blockNumber"),
+                poll_interval=settings.CHAIN_HEAD_POLL_SECONDS,
+                max_entries=settings.CHAIN_CACHE_MAX_ENTRIES
+            )
+            for network in self.rpc_urls
+        }
+
+        # Fee estimates from sampled eth_feeHistory, so sends and quotes never wait on the node
+        self.gas_oracles = {
+            network: GasOracle(
+                network,
+                partial(self.rpc, network),
+                poll_interval=settings.GAS_ORACLE_POLL_SECONDS,
+                sample_blocks=settings.GAS_ORACLE_SAMPLE_BLOCKS,
+                window_blocks=settings.GAS_ORACLE_WINDOW_BLOCKS
+            )
+            for network in self.rpc_urls
+        }
+
+        # Blocking clients for scripts, created on first use
+        self._sync_clients: Dict[str, Web3] = {}
+
+        # ABIs from the Hardhat build; codecs are built once per (network, address)
+        self.artifacts = ArtifactStore(settings.CONTRACT_ARTIFACTS_DIR, settings.CONTRACT_ABI_CACHE_DIR)
+        self._contract_codecs: Dict[Tuple[str, str], ContractCodec] = {}
         
         # Contract configurations
         self.contracts = {
@@ -88,26 +197,210 @@ class BlockchainService:
             logger.warning("No private key configured for blockchain operations")
             self.account = None
 
+        # One pipeline per network so every write from the account shares its nonce sequence
+        self.tx_pipelines: Dict[str, TransactionPipeline] = {}
+
     def _load_contract_abi(self, contract_name: str) -> List[Dict]:
-        """Load contract ABI from file"""
+        """Load contract ABI from the compiled Hardhat artifacts"""
         try:
-            # In production, load from compiled contract artifacts
-            # For now, return minimal ABI for basic operations
-            return [
-                {
-                    "type": "function",
-                    "name": "transfer",
-                    "inputs": [
-                        {"name": "to", "type": "address"},
-                        {"name": "amount", "type": "uint256"}
-                    ]
-                }
-            ]
+            return self.artifacts.abi(contract_name)
         except Exception as e:
             logger.warning(f"Could not load ABI for {contract_name}: {e}")
             return []
 
-    def _get_web3_client(self, network: str) -> Web3:
+    def contract_codec(self, contract_name: str) -> ContractCodec:
+        """Calldata encoder for one of the platform contracts, built on first use"""
+        contract_info = self.contracts[contract_name]
+        key = (contract_info.network, contract_info.address.lower())
+        codec = self._contract_codecs.get(key)
+        if codec is None:
+            codec = self._contract_codecs[key] = ContractCodec(contract_info.address, contract_info.abi)
+        return codec
+
+    def _create_provider(self, rpc_url: str) -> AsyncWeb3.AsyncHTTPProvider:
+        return AsyncWeb3.AsyncHTTPProvider(
+            rpc_url,
+            request_kwargs={"timeout": aiohttp.ClientTimeout(total=settings.RPC_TIMEOUT_SECONDS)}
+        )
+
+    def _create_async_client(self, rpc_url: str) -> AsyncWeb3:
+        return AsyncWeb3(self._create_provider(rpc_url))
+
+    async def startup(self):
+        """Open one pooled keep-alive session per network, shared by its endpoints"""
+        for network in self.rpc_urls:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=settings.RPC_POOL_SIZE, ttl_dns_cache=300)
+            )
+            for endpoint in self.rpc_pools[network].endpoints:
+                await endpoint.provider.cache_async_session(session)
+            self.rpc_sessions[network] = session
+            self.rpc_pools[network].start()
+            self.block_caches[network].start()
+            self.gas_oracles[network].start()
+
+    async def shutdown(self):
+        """Stop the head pollers, fee samplers and endpoint probes and close the RPC sessions"""
+        for network in self.rpc_urls:
+            await self.gas_oracles[network].stop()
+            await self.block_caches[network].stop()
+            await self.rpc_pools[network].stop()
+            for endpoint in self.rpc_pools[network].endpoints:
+                await endpoint.provider.disconnect()
+        self.rpc_sessions.clear()
+
+    def sync_web3(self, network: str = "ethereum") -> Web3:
+        """
+        Blocking Web3 client for scripts and shells; never call it from request handlers,
+        it stalls the event loop for the duration of every RPC
+        """
+        client = self._sync_clients.get(network)
+        if client is None:
+            rpc_url = self.rpc_urls.get(network, settings.ETHEREUM_RPC_URL)
+            client = self._sync_clients[network] = Web3(Web3.HTTPProvider(rpc_url))
+        return client
+
+    async def rpc(self, network: str, method: str, *params: Any) -> Any:
+        """Batched JSON-RPC read; returns the raw result"""
+        return await self.rpc_batchers[network].request(method, params)
+
+    async def rpc_quantity(self, network: str, method: str, *params: Any) -> int:
+        """Batched JSON-RPC read of a hex quantity"""
+        return int(await self.rpc(network, method, *params), 16)
+
+    def contract_call(
+        self,
+        contract_name: str,
+        function: str,
+        *args: Any,
+        allow_failure: bool = True
+    ) -> ContractCall:
+        """View call on one of the platform contracts, for use with call_many(); reuses its prebuilt codec"""
+        contract_codec = self.contract_codec(contract_name)
+        return ContractCall(
+            address=contract_codec.address,
+            abi=(),
+            function=function,
+            args=args,
+            allow_failure=allow_failure,
+            codec=contract_codec.function(function, len(args))
+        )
+
+    async def call_many(
+        self,
+        calls: List[ContractCall],
+        network: str = "ethereum",
+        block: BlockIdentifier = "latest",
+        cache_mode: Optional[str] = MODE_LATEST
+    ) -> List[Any]:
+        """
+        Run many view calls in one eth_call at a single block; results come back in
+        call order, None for calls that reverted with allow_failure set.
+
+        Reads at "latest" go through the block cache unless `cache_mode` is None;
+        only the calls missing from it are sent. In MODE_LATEST_SAFE, values read at
+        an earlier block are returned and re-read together in the background.
+        """
+        if block != "latest" or cache_mode is None:
+            return await self.multicalls[network].call_many(calls, block)
+
+        cache = self.block_caches[network]
+        head = await cache.block_number()
+        keys = [("call", call.address.lower(), call.function, repr(call.args)) for call in calls]
+
+        results: List[Any] = [None] * len(calls)
+        missing = []
+        stale = []
+        for position, key in enumerate(keys):
+            hit, value = cache.lookup(key, head, cache_mode)
+            if hit:
+                results[position] = value
+                if cache_mode == MODE_LATEST_SAFE and cache.is_stale(key, head):
+                    stale.append(position)
+            else:
+                missing.append(position)
+        cache.hits += len(calls) - len(missing)
+        cache.misses += len(missing)
+
+        if missing:
+            fetched = await self.multicalls[network].call_many([calls[i] for i in missing], head)
+            for position, value in zip(missing, fetched):
+                results[position] = value
+                if value is not None:
+                    cache.store(keys[position], head, value)
+        if stale:
+            cache.refresh_many_in_background(
+                [keys[i] for i in stale],
+                partial(self.multicalls[network].call_many, [calls[i] for i in stale]),
+                head
+            )
+        return results
+
+    async def cached_read(
+        self,
+        network: str,
+        key: Hashable,
+        fetch: Callable[[int], Awaitable[Any]],
+        mode: str = MODE_LATEST
+    ) -> Any:
+        """Per-block cached read; `fetch(block_number)` runs only on a miss"""
+        return await self.block_caches[network].get(key, fetch, mode)
+
+    async def get_gas_price(self, network: str = "ethereum", mode: str = MODE_LATEST) -> int:
+        """Gas price in wei, read at most once per block"""
+        return await self.cached_read(
+            network,
+            ("eth_gasPrice",),
+            lambda _: self.rpc_quantity(network, "eth_gasPrice"),
+            mode
+        )
+
+    async def estimate_fees(self, network: str = "ethereum", speed: str = "standard") -> Dict[str, int]:
+        """Fee fields for a transaction on `network`, answered from the sampled fee history"""
+        return await self.gas_oracles[network].fees(speed)
+
+    async def quote_gas(
+        self,
+        gas_units: List[int],
+        network: str = "ethereum",
+        speeds: Optional[List[str]] = None
+    ) -> List[Dict[str, Dict[str, Any]]]:
+        """Per-speed cost quotes for many transactions from one fee snapshot"""
+        oracle = self.gas_oracles[network]
+        if not oracle.ready:
+            await oracle.sample()
+        return oracle.quote_many(gas_units, tuple(speeds or SPEEDS))
+
+    def tx_pipeline(self, network: str = "ethereum") -> TransactionPipeline:
+        """Send pipeline for the configured account on `network`"""
+        if not self.account:
+            raise Exception("No account configured for transactions")
+        pipeline = self.tx_pipelines.get(network)
+        if pipeline is None:
+            pipeline = self.tx_pipelines[network] = TransactionPipeline(
+                self.account,
+                network,
+                partial(self.rpc, network),
+                lambda: self._fee_fields(network),
+                max_concurrency=settings.TX_MAX_CONCURRENCY
+            )
+        return pipeline
+
+    async def send_transaction(self, tx: Dict[str, Any], network: str = "ethereum") -> str:
+        """Sign and broadcast from the platform account; nonce and fees are filled in"""
+        return await self.tx_pipeline(network).send(tx)
+
+    async def _fee_fields(self, network: str) -> Dict[str, int]:
+        try:
+            return await self.estimate_fees(network)
+        except Exception as e:
+            logger.warning("Gas oracle unavailable, using node gas price", network=network, error=str(e))
+            return {"gasPrice": await self.get_gas_price(network)}
+
+    def _has_function(self, contract_name: str, function: str) -> bool:
+        return self.contract_codec(contract_name).has_function(function)
+
+    def _get_web3_client(self, network: str) -> AsyncWeb3:
         """Get Web3 client for specific network"""
         clients = {
             "ethereum": self.ethereum_w3,
@@ -128,53 +421,186 @@ class BlockchainService:
         Register a domain through smart contract
         """
         try:
-            w3 = self._get_web3_client("ethereum")
-            contract_info = self.contracts["domain_registry"]
-            
             if not self.account:
                 raise Exception("No account configured for transactions")
             
-            # Get contract instance
-            contract = w3.eth.contract(
-                address=contract_info.address,
-                abi=contract_info.abi
-            )
-            
             # Calculate registration fee
             registration_fee = await self._calculate_registration_fee(name, tld, duration)
-            
-            # Build transaction
             full_domain = f"{name}.{tld}"
-            tx_data = {
-                'from': self.account.address,
-                'value': registration_fee if payment_token == "ETH" else 0,
-                'gas': 300000,
-                'gasPrice': w3.eth.gas_price,
-                'nonce': w3.eth.get_transaction_count(self.account.address)
-            }
             
-            # For demonstration, create a mock transaction
-            # In production, this would call the actual contract method
-            mock_tx_hash = f"0x{''.join([f'{i:02x}' for i in range(32)])}"
+            if not self._has_function("domain_registry", "registerDomain"):
+                # Placeholder ABI until compiled contract artifacts are available
+                mock_tx_hash = f"0x{''.join([f'{i:02x}' for i in range(32)])}"
+                logger.info(
+                    "Domain registration initiated",
+                    domain=full_domain,
+                    tx_hash=mock_tx_hash,
+                    fee=registration_fee
+                )
+                return RegistrationResult(
+                    tx_hash=mock_tx_hash,
+                    owner=self.account.address,
+                    domain=full_domain,
+                    gas_used=250000,
+                    placeholder=True
+                )
+            
+            # Nonce, chain id and EIP-1559 fees are filled in by the send pipeline
+            tx_hash = await self._send_registration(
+                "registerDomain",
+                [name, tld, ipfs_content or "", 0, payment_token == "NXD", 0],
+                value=registration_fee if payment_token == "ETH" else 0,
+                gas=REGISTRATION_GAS
+            )
             
             logger.info(
                 "Domain registration initiated",
                 domain=full_domain,
-                tx_hash=mock_tx_hash,
+                tx_hash=tx_hash,
                 fee=registration_fee
             )
             
             return RegistrationResult(
-                tx_hash=mock_tx_hash,
+                tx_hash=tx_hash,
                 owner=self.account.address,
-                domain=full_domain,
-                gas_used=250000
+                domain=full_domain
             )
             
         except Exception as e:
             logger.error("Domain registration failed", error=str(e))
             raise
 
+    async def register_domains_batch(
+        self,
+        registrations: List[Dict[str, Any]],
+        payment_token: str = "ETH"
+    ) -> BatchRegistrationResult:
+        """
+        Register many domains from the platform account in one registerDomainsBatch
+        transaction. Each registration is a dict with name, tld, duration and optional
+        ipfs_content.
+
+        Duplicates, malformed names and names the registry reports as taken are
+        rejected up front and listed in `failed`; the rest share one transaction, so
+        they succeed or revert together. Contracts without the batch entry point get
+        one registerDomain transaction per domain, sent concurrently.
+        """
+        try:
+            if not self.account:
+                raise Exception("No account configured for transactions")
+
+            failed: List[Dict[str, str]] = []
+            accepted: List[Dict[str, Any]] = []
+            seen = set()
+            for registration in registrations:
+                name, tld = registration["name"].lower(), registration["tld"].lower()
+                full_domain = f"{name}.{tld}"
+                if full_domain in seen:
+                    failed.append({"domain": full_domain, "error": "Duplicate in batch"})
+                elif not 3 <= len(name) <= 63:
+                    failed.append({"domain": full_domain, "error": "Name must be 3-63 characters"})
+                else:
+                    seen.add(full_domain)
+                    accepted.append({**registration, "name": name, "tld": tld, "domain": full_domain})
+
+            if len(accepted) > MAX_BATCH_REGISTRATIONS:
+                for registration in accepted[MAX_BATCH_REGISTRATIONS:]:
+                    failed.append({"domain": registration["domain"], "error": "Batch size limit exceeded"})
+                accepted = accepted[:MAX_BATCH_REGISTRATIONS]
+
+            if accepted and self._has_function("domain_registry", "isDomainAvailable"):
+                # One multicall checks the whole batch against the registry
+                available = await self.call_many([
+                    self.contract_call("domain_registry", "isDomainAvailable", item["name"], item["tld"])
+                    for item in accepted
+                ])
+                for item, is_available in zip(list(accepted), available):
+                    if is_available is False:
+                        failed.append({"domain": item["domain"], "error": "Domain not available"})
+                        accepted.remove(item)
+
+            fees = [
+                await self._calculate_registration_fee(item["name"], item["tld"], item.get("duration", 1))
+                for item in accepted
+            ]
+            total_fee = sum(fees)
+            if not accepted:
+                return BatchRegistrationResult(registered=[], failed=failed, total_fee=0, tx_hashes=[])
+
+            if self._has_function("domain_registry", "registerDomainsBatch"):
+                tx_hash = await self._send_registration(
+                    "registerDomainsBatch",
+                    [
+                        [item["name"] for item in accepted],
+                        [item["tld"] for item in accepted],
+                        [item.get("ipfs_content") or "" for item in accepted],
+                        0,
+                        payment_token == "NXD",
+                        0
+                    ],
+                    value=total_fee if payment_token == "ETH" else 0,
+                    gas=BATCH_REGISTRATION_BASE_GAS + BATCH_REGISTRATION_GAS_PER_DOMAIN * len(accepted)
+                )
+                tx_hashes = [tx_hash]
+                registered = [
+                    RegistrationResult(tx_hash=tx_hash, owner=self.account.address, domain=item["domain"])
+                    for item in accepted
+                ]
+            elif self._has_function("domain_registry", "registerDomain"):
+                outcomes = await asyncio.gather(*[
+                    self._send_registration(
+                        "registerDomain",
+                        [item["name"], item["tld"], item.get("ipfs_content") or "", 0, payment_token == "NXD", 0],
+                        value=fee if payment_token == "ETH" else 0,
+                        gas=REGISTRATION_GAS
+                    )
+                    for item, fee in zip(accepted, fees)
+                ], return_exceptions=True)
+                tx_hashes, registered = [], []
+                for item, fee, outcome in zip(accepted, fees, outcomes):
+                    if isinstance(outcome, Exception):
+                        failed.append({"domain": item["domain"], "error": str(outcome)})
+                        total_fee -= fee
+                    else:
+                        tx_hashes.append(outcome)
+                        registered.append(RegistrationResult(tx_hash=outcome, owner=self.account.address, domain=item["domain"]))
+            else:
+                # Placeholder ABI until compiled contract artifacts are available
+                mock_tx_hash = f"0x{''.join([f'{i:02x}' for i in range(32)])}"
+                tx_hashes = [mock_tx_hash]
+                registered = [
+                    RegistrationResult(
+                        tx_hash=mock_tx_hash,
+                        owner=self.account.address,
+                        domain=item["domain"],
+                        gas_used=BATCH_REGISTRATION_GAS_PER_DOMAIN,
+                        placeholder=True
+                    )
+                    for item in accepted
+                ]
+
+            logger.info(
+                "Batch domain registration initiated",
+                registered=len(registered),
+                failed=len(failed),
+                tx_hashes=tx_hashes,
+                total_fee=total_fee
+            )
+            return BatchRegistrationResult(registered=registered, failed=failed, total_fee=total_fee, tx_hashes=tx_hashes)
+
+        except Exception as e:
+            logger.error("Batch domain registration failed", count=len(registrations), error=str(e))
+            raise
+
+    async def _send_registration(self, function: str, args: List[Any], value: int, gas: int) -> str:
+        registry = self.contract_codec("domain_registry")
+        return await self.send_transaction({
+            'to': registry.address,
+            'value': value,
+            'gas': gas,
+            'data': registry.encode(function, *args)
+        })
+
     async def _calculate_registration_fee(
         self,
         name: str,
@@ -308,64 +734,124 @@ class BlockchainService:
             logger.error("Voting failed", error=str(e))
             raise
 
+    async def get_staking_positions(self, addresses: List[str]) -> Tuple[StakePositions, int, int]:
+        """
+        Current stake of each address plus the token supply and pool totalStaked, read
+        in one multicall; supply and totalStaked drive the contract's dynamic base APY
+        """
+        if not all(
+            self._has_function("nxd_token", function) for function in ("userStakes", "totalSupply", "totalStaked")
+        ):
+            # Placeholder positions until compiled contract artifacts are available
+            now = int(datetime.now().timestamp())
+            rows = [
+                {"owner": address, "amount": 500 * 10**18, "tier": tier, "start_time": now - days * SECONDS_PER_DAY}
+                for address in addresses
+                for tier, days in ((0, 30), (1, 15))
+            ]
+            return StakePositions.from_rows(rows), 10**27, sum(row["amount"] for row in rows)
+
+        results = await self.call_many(
+            [
+                self.contract_call("nxd_token", "totalSupply", allow_failure=False),
+                self.contract_call("nxd_token", "totalStaked", allow_failure=False)
+            ]
+            + [self.contract_call("nxd_token", "userStakes", address) for address in addresses]
+        )
+        total_supply, total_staked, stakes = results[0], results[1], results[2:]
+        rows = []
+        for address, stake in zip(addresses, stakes):
+            if stake is None:
+                continue
+            amount, tier, start_time, last_claim, pending_rewards, locked = stake
+            # calculateRewards pays nothing on empty or unlocked stakes
+            if amount and locked:
+                rows.append({
+                    "owner": address,
+                    "amount": amount,
+                    "tier": tier,
+                    "start_time": start_time,
+                    "last_claim": last_claim,
+                    "pending_rewards": pending_rewards
+                })
+        return StakePositions.from_rows(rows), total_supply, total_staked
+
+    async def get_voting_balances(
+        self,
+        addresses: List[str],
+        network: str = "ethereum",
+        block: BlockIdentifier = "latest"
+    ) -> Dict[str, Tuple[int, int]]:
+        """(liquid balance, staked amount) of each address at `block`, read in one multicall"""
+        if not (self._has_function("nxd_token", "balanceOf") and self._has_function("nxd_token", "userStakes")):
+            # Placeholder balances until compiled contract artifacts are available
+            return {address.lower(): (5000 * 10**18, 3000 * 10**18) for address in addresses}
+
+        calls = []
+        for address in addresses:
+            calls.append(self.contract_call("nxd_token", "balanceOf", address))
+            calls.append(self.contract_call("nxd_token", "userStakes", address))
+        results = await self.call_many(calls, network=network, block=block)
+
+        balances = {}
+        for index, address in enumerate(addresses):
+            balance, stake = results[2 * index], results[2 * index + 1]
+            balances[address.lower()] = (balance or 0, stake[0] if stake else 0)
+        return balances
+
+    async def get_voting_supply(self, network: str = "ethereum", block: BlockIdentifier = "latest") -> Tuple[int, int]:
+        """(total supply, total staked) of NXD at `block`"""
+        if not (self._has_function("nxd_token", "totalSupply") and self._has_function("nxd_token", "totalStaked")):
+            return 10**27, 0
+
+        total_supply, total_staked = await self.call_many([
+            self.contract_call("nxd_token", "totalSupply", allow_failure=False),
+            self.contract_call("nxd_token", "totalStaked", allow_failure=False)
+        ], network=network, block=block)
+        return total_supply, total_staked
+
     async def get_staking_info(self, user_address: str) -> Dict[str, Any]:
-        """Get user's staking information"""
+        """Get user's staking positions with accrued and projected rewards"""
         try:
-            # Mock staking info
-            return {
-                "total_staked": "1000000000000000000000",  # 1000 NXD
-                "rewards_earned": "50000000000000000000",   # 50 NXD
-                "staking_positions": [
-                    {
-                        "id": 1,
-                        "amount": "500000000000000000000",  # 500 NXD
-                        "start_time": int(datetime.now().timestamp()) - (30 * 24 * 60 * 60),
-                        "duration": 90,  # 90 days
-                        "apy": "18.5"
-                    },
-                    {
-                        "id": 2,
-                        "amount": "500000000000000000000",  # 500 NXD
-                        "start_time": int(datetime.now().timestamp()) - (15 * 24 * 60 * 60),
-                        "duration": 180,  # 180 days
-                        "apy": "22.0"
-                    }
-                ]
-            }
+            positions, total_supply, total_staked = await self.get_staking_positions([user_address])
+            engine = StakingEngine(positions, total_supply, total_staked)
+            return engine.user_dashboard(user_address, int(datetime.now().timestamp()))
             
         except Exception as e:
             logger.error("Failed to get staking info", user=user_address, error=str(e))
             raise
 
+    async def get_staking_stats(self, stakers: List[str]) -> Dict[str, Any]:
+        """Pool-wide staking statistics over the given stakers, from one vectorized pass"""
+        try:
+            positions, total_supply, total_staked = await self.get_staking_positions(stakers)
+            return StakingEngine(positions, total_supply, total_staked).pool_stats(int(datetime.now().timestamp()))
+
+        except Exception as e:
+            logger.error("Failed to get staking stats", stakers=len(stakers), error=str(e))
+            raise
+
     async def get_network_status(self) -> Dict[str, Any]:
         """Get blockchain network status"""
+        networks = list(self.rpc_urls)
+        statuses = await asyncio.gather(*[self._get_network_status(network) for network in networks])
+        return dict(zip(networks, statuses))
+
+    async def _get_network_status(self, network: str) -> Dict[str, Any]:
+        """Latest block and gas price of one network; a successful read implies connectivity"""
         try:
-            ethereum_connected = self.ethereum_w3.is_connected()
-            polygon_connected = self.polygon_w3.is_connected()
-            base_connected = self.base_w3.is_connected()
-            
+            latest_block = await self.block_caches[network].block_number()
+            # Status may trail by a block; serving the cached price keeps this endpoint in memory
+            gas_price = await self.get_gas_price(network, MODE_LATEST_SAFE)
             return {
-                "ethereum": {
-                    "connected": ethereum_connected,
-                    "latest_block": self.ethereum_w3.eth.block_number if ethereum_connected else None,
-                    "gas_price": str(self.ethereum_w3.eth.gas_price) if ethereum_connected else None
-                },
-                "polygon": {
-                    "connected": polygon_connected,
-                    "latest_block": self.polygon_w3.eth.block_number if polygon_connected else None,
-                    "gas_price": str(self.polygon_w3.eth.gas_price) if polygon_connected else None
-                },
-                "base": {
-                    "connected": base_connected,
-                    "latest_block": self.base_w3.eth.block_number if base_connected else None,
-                    "gas_price": str(self.base_w3.eth.gas_price) if base_connected else None
-                }
+                "connected": True,
+                "latest_block": latest_block,
+                "gas_price": str(gas_price),
+                "fees": self.gas_oracles[network].summary(),
+                "endpoints": self.rpc_pools[network].stats(),
+                "cache": self.block_caches[network].stats()
             }
             
         except Exception as e:
-            logger.error("Failed to get network status", error=str(e))
-            return {
-                "ethereum": {"connected": False},
-                "polygon": {"connected": False},
-                "base": {"connected": False}
-            }
\ No newline at end of file
+            logger.error("Failed to get network status", network=network, error=str(e))
+            return {"connected": False}
@@ -0,0 +1,123 @@
+"""
+Contract Artifacts
+ABIs loaded from compiled Hardhat artifacts, cached on disk by content hash, with prebuilt codecs
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from eth_utils import is_address, to_checksum_address
+
+from services.multicall import FunctionCodec
+
+logger = structlog.get_logger()
+
+class ArtifactStore:
+    """
+    Reads contract ABIs from Hardhat's `artifacts/` tree.
+
+    Artifacts also carry bytecode and source maps, so the ABI alone is written to
+    `cache_dir` keyed by the sha256 of the artifact. While the artifact is unchanged
+    the small cached copy is used; a recompile changes the hash and rebuilds it. When
+    no artifact exists (e.g. a deployment that ships only the cache) the cached ABI is
+    used as is.
+    """
+
+    def __init__(self, artifacts_dir: str, cache_dir: str):
+        self.artifacts_dir = Path(artifacts_dir)
+        self.cache_dir = Path(cache_dir)
+        self._abis: Dict[str, List[Dict[str, Any]]] = {}
+
+    def abi(self, contract_name: str) -> List[Dict[str, Any]]:
+        """ABI of `contract_name`; empty when neither artifact nor cache exists"""
+        abi = self._abis.get(contract_name)
+        if abi is None:
+            abi = self._abis[contract_name] = self._load(contract_name)
+        return abi
+
+    def _load(self, contract_name: str) -> List[Dict[str, Any]]:
+        cache_path = self.cache_dir / f"{contract_name}.json"
+        cached = self._read_cache(cache_path)
+
+        artifact_path = self._find_artifact(contract_name)
+        if artifact_path is None:
+            if cached is not None:
+                return cached[1]
+            logger.warning("No compiled artifact for contract", contract=contract_name, artifacts_dir=str(self.artifacts_dir))
+            return []
+
+        raw = artifact_path.read_bytes()
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if cached is not None and cached[0] == content_hash:
+            return cached[1]
+
+        abi = json.loads(raw)["abi"]
+        self._write_cache(cache_path, content_hash, abi)
+        logger.info("Contract ABI loaded from artifact", contract=contract_name, hash=content_hash[:12])
+        return abi
+
+    def _find_artifact(self, contract_name: str) -> Optional[Path]:
+        direct = self.artifacts_dir / "contracts" / f"{contract_name}.sol" / f"{contract_name}.json"
+        if direct.is_file():
+            return direct
+        # Contracts declared in a file of another name, or in subdirectories
+        if self.artifacts_dir.is_dir():
+            for path in self.artifacts_dir.glob(f"contracts/**/{contract_name}.json"):
+                return path
+        return None
+
+    def _read_cache(self, path: Path) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        try:
+            entry = json.loads(path.read_text())
+            return entry["source_hash"], entry["abi"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable ABI cache entry", path=str(path), error=str(e))
+            return None
+
+    def _write_cache(self, path: Path, content_hash: str, abi: List[Dict[str, Any]]):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent workers never read a half-written entry
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({"source_hash": content_hash, "abi": abi}, separators=(",", ":")))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write ABI cache", path=str(path), error=str(e))
+
+class ContractCodec:
+    """
+    A contract bound to a checksummed address, with a FunctionCodec per function built
+    once from its ABI, so encoding calldata never parses the ABI again.
+    """
+
+    def __init__(self, address: str, abi: List[Dict[str, Any]]):
+        self.address = to_checksum_address(address) if is_address(address) else address
+        self.abi = abi
+        self._functions: Dict[Tuple[str, int], FunctionCodec] = {}
+        for fragment in abi:
+            if fragment.get("type") == "function":
+                key = (fragment["name"], len(fragment.get("inputs", [])))
+                # Overloads of equal arity would need full signatures; keep the first
+                self._functions.setdefault(key, FunctionCodec(fragment))
+        self._names = {name for name, _ in self._functions}
+
+    def has_function(self, name: str) -> bool:
+        return name in self._names
+
+    def function(self, name: str, arity: int) -> FunctionCodec:
+        codec = self._functions.get((name, arity))
+        if codec is None:
+            raise ValueError(f"Function {name}/{arity} not in ABI for {self.address}")
+        return codec
+
+    def encode(self, name: str, *args: Any) -> str:
+        """Hex calldata for `name(*args)`"""
+        return "0x" + self.function(name, len(args)).encode_call(args).hex()
+
+    def decode(self, name: str, arity: int, data: bytes) -> Any:
+        return self.function(name, arity).decode_result(data)
@@ -0,0 +1,219 @@
+"""
+Decision Log Store
+Bounded, indexed in-memory log of AI decisions with batched background persistence
+"""
+import asyncio
+import uuid
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+class _SequenceIndex:
+    """
+    Append-only list of ascending sequence numbers with O(1) amortized removal from the front
+    """
+
+    def __init__(self):
+        self.sequences: List[int] = []
+        self.head = 0
+
+    def __len__(self) -> int:
+        return len(self.sequences) - self.head
+
+    def append(self, sequence: int):
+        self.sequences.append(sequence)
+
+    def popleft(self):
+        self.head += 1
+        # Compact once the dead prefix dominates so memory stays bounded
+        if self.head > 64 and self.head * 2 > len(self.sequences):
+            self.sequences = self.sequences[self.head:]
+            self.head = 0
+
+    def before(self, cursor: Optional[int], limit: int) -> List[int]:
+        """Up to `limit` sequence numbers lower than `cursor`, newest first"""
+        end = len(self.sequences) if cursor is None else bisect_left(self.sequences, cursor, lo=self.head)
+        start = max(self.head, end - limit)
+        return self.sequences[start:end][::-1]
+
+class DecisionLogStore:
+    """
+    Ring buffer of decision log entries with per-id and per-operation-type indexes.
+
+    Appends, evictions and id lookups are O(1); pages are O(limit) using the entry's
+    sequence number as an opaque cursor. Entries are queued for persistence and written
+    in batches by a background task so logging never waits on storage.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        sink: Optional[Callable[[List[Dict[str, Any]]], Awaitable[Any]]] = None,
+        persist_batch_size: int = 100,
+        persist_interval_seconds: float = 10.0,
+        max_pending: int = 10000
+    ):
+        self.capacity = capacity
+        self.sink = sink
+        self.persist_batch_size = persist_batch_size
+        self.persist_interval_seconds = persist_interval_seconds
+        self.max_pending = max_pending
+
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._ids: Dict[str, int] = {}
+        self._by_operation: Dict[str, _SequenceIndex] = {}
+        self._oldest_sequence = 0
+        self._next_sequence = 0
+
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Add an entry, assigning it an id and evicting the oldest entry when full"""
+        sequence = self._next_sequence
+        self._next_sequence += 1
+
+        entry.setdefault("id", f"decision_{uuid.uuid4().hex}")
+        entry["sequence"] = sequence
+
+        self._entries[sequence] = entry
+        self._ids[entry["id"]] = sequence
+        operation_type = entry.get("operation_type", "unknown")
+        self._by_operation.setdefault(operation_type, _SequenceIndex()).append(sequence)
+
+        while len(self._entries) > self.capacity:
+            self._evict_oldest()
+
+        self.persist(entry)
+
+        return entry
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Look up an entry by id"""
+        sequence = self._ids.get(entry_id)
+        return self._entries.get(sequence) if sequence is not None else None
+
+    def page(
+        self,
+        operation_type: Optional[str] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Newest-first page of entries older than `cursor`.
+        Pass the returned `next_cursor` to fetch the following page.
+        """
+        limit = max(0, limit)
+
+        if operation_type is not None:
+            index = self._by_operation.get(operation_type)
+            sequences = index.before(cursor, limit) if index else []
+            oldest = index.sequences[index.head] if index else None
+        else:
+            start = self._next_sequence if cursor is None else min(cursor, self._next_sequence)
+            stop = max(self._oldest_sequence, start - limit)
+            sequences = list(range(start - 1, stop - 1, -1))
+            oldest = self._oldest_sequence
+
+        entries = [self._entries[sequence] for sequence in sequences]
+        has_more = bool(sequences) and len(sequences) == limit and sequences[-1] != oldest
+        next_cursor = sequences[-1] if has_more else None
+
+        return {"entries": entries, "next_cursor": next_cursor}
+
+    def _evict_oldest(self):
+        """Drop the oldest entry from the buffer and its indexes"""
+        entry = self._entries.pop(self._oldest_sequence)
+        self._oldest_sequence += 1
+        self._ids.pop(entry["id"], None)
+
+        operation_type = entry.get("operation_type", "unknown")
+        index = self._by_operation[operation_type]
+        # The globally oldest entry is always the oldest of its operation type
+        index.popleft()
+        if not len(index):
+            del self._by_operation[operation_type]
+
+    def persist(self, entry: Dict[str, Any]):
+        """Queue an entry (or an updated copy of one) for the background writer"""
+        if self.sink is None:
+            return
+
+        self._pending.append(dict(entry))
+        if len(self._pending) > self.max_pending:
+            dropped = len(self._pending) - self.max_pending
+            self._pending = self._pending[dropped:]
+            logger.warning("Decision log persistence backlog full, dropping entries", dropped=dropped)
+
+        self._ensure_flusher()
+        if len(self._pending) >= self.persist_batch_size and self._flush_requested is not None:
+            self._flush_requested.set()
+
+    def _ensure_flusher(self):
+        """Start the background writer on first use inside a running event loop"""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.start()
+
+    def start(self):
+        """Start the background persistence task"""
+        if self.sink is None or (self._flush_task is not None and not self._flush_task.done()):
+            return
+        self._flush_requested = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the background task and write out anything still pending"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        while self._pending:
+            if not await self._flush_batch():
+                break
+
+    async def _flush_loop(self):
+        """Write pending entries every interval, or sooner when a full batch is waiting"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.persist_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+
+            while self._pending:
+                if not await self._flush_batch():
+                    break
+                if len(self._pending) < self.persist_batch_size:
+                    break
+
+    async def _flush_batch(self) -> bool:
+        """Persist one batch, re-queueing it on failure"""
+        batch = self._pending[:self.persist_batch_size]
+        self._pending = self._pending[len(batch):]
+
+        try:
+            await self.sink(batch)
+            return True
+        except asyncio.CancelledError:
+            self._pending = batch + self._pending
+            raise
+        except Exception as e:
+            logger.error("Decision log persistence failed", batch_size=len(batch), error=str(e))
+            self._pending = batch + self._pending
+            return False
@@ -0,0 +1,166 @@
+"""
+Domain Embeddings
+Local character n-gram embeddings of domain names and keywords with batched cosine top-k search
+"""
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Words that commonly appear in Web3 and tech domain names; used to split glued names
+# ("metavault" -> "meta", "vault") and as the seed candidates for local suggestions
+DOMAIN_VOCABULARY = (
+    "ai", "app", "art", "bank", "base", "bit", "block", "blockchain", "bridge", "burn",
+    "capital", "cash", "chain", "cloud", "club", "code", "coin", "crypto", "cyber", "dao",
+    "data", "defi", "dev", "digital", "drop", "earn", "finance", "flow", "fund", "game",
+    "gate", "get", "go", "hub", "id", "io", "lab", "labs", "land", "ledger", "link",
+    "market", "meta", "mint", "my", "name", "net", "network", "nft", "node", "one",
+    "pay", "play", "pool", "pro", "protocol", "quest", "safe", "smart", "stake", "studio",
+    "swap", "tech", "token", "trade", "verse", "vault", "virtual", "wallet", "web", "web3",
+    "world", "x", "yield", "zone"
+)
+
+# Related words share a concept feature, so "exchange" lands near "swap" and "trade"
+CONCEPTS: Dict[str, str] = {
+    **dict.fromkeys(("defi", "finance", "financial", "fund", "capital", "bank", "lend", "loan", "credit"), "finance"),
+    **dict.fromkeys(("swap", "trade", "exchange", "dex", "market", "marketplace"), "trade"),
+    **dict.fromkeys(("coin", "token", "cash", "money", "pay", "payment", "payments"), "money"),
+    **dict.fromkeys(("vault", "safe", "secure", "security", "wallet", "custody", "save"), "custody"),
+    **dict.fromkeys(("yield", "earn", "stake", "staking", "reward", "rewards", "farm"), "yield"),
+    **dict.fromkeys(("nft", "art", "collectible", "collectibles", "artist", "mint", "gallery"), "collectible"),
+    **dict.fromkeys(("dao", "governance", "vote", "voting", "community", "collective"), "governance"),
+    **dict.fromkeys(("ai", "artificial", "intelligence", "smart", "agent", "bot"), "intelligence"),
+    **dict.fromkeys(("game", "gaming", "play", "quest", "arena"), "gaming"),
+    **dict.fromkeys(("chain", "blockchain", "block", "ledger", "node", "protocol", "network"), "chain"),
+    **dict.fromkeys(("meta", "verse", "metaverse", "virtual", "world", "land"), "metaverse"),
+    **dict.fromkeys(("bridge", "link", "gate", "gateway", "cross"), "bridge"),
+    **dict.fromkeys(("data", "cloud", "storage", "compute", "code", "dev"), "infrastructure")
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+def _segment(token: str, vocabulary: frozenset, max_word: int) -> List[str]:
+    """Greedy longest-match split of a glued name into known words"""
+    words = []
+    position = 0
+    while position < len(token):
+        for end in range(min(len(token), position + max_word), position, -1):
+            if token[position:end] in vocabulary:
+                words.append(token[position:end])
+                position = end
+                break
+        else:
+            position += 1
+    return words
+
+class CharNGramEmbedder:
+    """
+    Hashing-trick embedder: character n-grams of each word plus whole-word and concept
+    features, hashed with a sign into `dim` buckets and L2-normalized
+    """
+
+    def __init__(
+        self,
+        dim: int = 1024,
+        ngram_sizes: Sequence[int] = (2, 3, 4),
+        vocabulary: Iterable[str] = DOMAIN_VOCABULARY,
+        word_weight: float = 2.0,
+        concept_weight: float = 3.0
+    ):
+        self.dim = dim
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.vocabulary = frozenset(vocabulary) | frozenset(CONCEPTS)
+        self.max_word = max(len(word) for word in self.vocabulary)
+        self.word_weight = word_weight
+        self.concept_weight = concept_weight
+        self._vector = lru_cache(maxsize=20000)(self._compute_vector)
+
+    def features(self, text: str) -> List[Tuple[str, float]]:
+        """Weighted string features of a name or free-text prompt"""
+        features: List[Tuple[str, float]] = []
+        for token in _WORD.findall(text.lower()):
+            padded = f"^{token}$"
+            for size in self.ngram_sizes:
+                for start in range(len(padded) - size + 1):
+                    features.append((padded[start:start + size], 1.0))
+
+            words = [token] if token in self.vocabulary else _segment(token, self.vocabulary, self.max_word)
+            for word in words:
+                features.append((f"w:{word}", self.word_weight))
+                concept = CONCEPTS.get(word)
+                if concept is not None:
+                    features.append((f"c:{concept}", self.concept_weight))
+        return features
+
+    def _compute_vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self.features(text):
+            hashed = zlib.crc32(feature.encode("utf-8"))
+            vector[hashed % self.dim] += weight if hashed & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        vector.setflags(write=False)
+        return vector
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Stack unit vectors for `texts` into an (n, dim) float32 matrix"""
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self._vector(text) for text in texts])
+
+class DomainEmbeddingIndex:
+    """
+    Names and their embeddings in one NumPy matrix; cosine similarity is a single
+    matrix multiply because every row is unit length
+    """
+
+    def __init__(self, embedder: Optional[CharNGramEmbedder] = None, names: Iterable[str] = ()):
+        self.embedder = embedder or CharNGramEmbedder()
+        self.names: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self.matrix = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self.add(names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, names: Iterable[str]):
+        """Index new names; names already present are skipped"""
+        new_names = []
+        for name in names:
+            if name not in self._positions:
+                self._positions[name] = len(self.names) + len(new_names)
+                new_names.append(name)
+        if new_names:
+            self.names.extend(new_names)
+            self.matrix = np.vstack([self.matrix, self.embedder.embed(new_names)])
+
+    def top_k(self, queries: Sequence[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """Best `k` indexed names for each query, from one (queries x names) product"""
+        if not queries or not self.names or k <= 0:
+            return [[] for _ in queries]
+
+        scores = self.embedder.embed(queries) @ self.matrix.T
+        k = min(k, len(self.names))
+        # argpartition finds the top k in linear time; only those k get sorted
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, indices in enumerate(top):
+            ordered = indices[np.argsort(-scores[row, indices])]
+            results.append([(self.names[i], float(scores[row, i])) for i in ordered])
+        return results
+
+    def similarity(self, query: str, candidates: Sequence[str]) -> np.ndarray:
+        """Cosine similarity of each candidate to the query"""
+        if not candidates:
+            return np.zeros(0, dtype=np.float32)
+        return self.embedder.embed(candidates) @ self.embedder.embed([query])[0]
+
+    def rank(self, query: str, candidates: Sequence[str]) -> List[Tuple[str, float]]:
+        """Candidates ordered by similarity to the query, most similar first"""
+        scores = self.similarity(query, candidates)
+        order = np.argsort(-scores, kind="stable")
+        return [(candidates[i], float(scores[i])) for i in order]
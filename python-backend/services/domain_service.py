@@ -108,6 +108,13 @@ class DomainService:
         
         # Domain availability cache
         self.availability_cache = {}
+        # Character quality sets used by the brandability and word-likeness scores
+        self.char_quality = {
+            "vowels": "aeiou",
+            "easy_consonants": "bcdfghjklmnpqrstvwxyz",
+            "hard_consonants": "qxz",
+            "numbers": "0123456789"
+        }
         self.cache_expiry = 300  # 5 minutes
 
     async def search_domains(
@@ -123,7 +130,7 @@ class DomainService:
             suggestions = []
             
             # Generate base variations
-            base_variations = await self._generate_name_variations(query)
+            base_variations = self._generate_name_variations(query)
             
             for tld in tlds:
                 if tld not in self.tlds:
@@ -239,13 +246,13 @@ class DomainService:
             logger.error("Domain record creation failed", error=str(e))
             raise
 
-    async def update_domain_status(self, domain_id: int, transaction_hash: str):
+    async def update_domain_status(self, domain_id: int, transaction_hash: str, status: str = "confirmed"):
         """
-        Update domain status after blockchain confirmation
+        Update domain status once its registration transaction is final
         """
         try:
             # Mock status update
-            logger.info("Domain status updated", domain_id=domain_id, tx=transaction_hash)
+            logger.info("Domain status updated", domain_id=domain_id, tx=transaction_hash, status=status)
             
         except Exception as e:
             logger.error("Domain status update failed", domain_id=domain_id, error=str(e))
@@ -481,12 +488,6 @@ class DomainService:
             return "standard" 
         else:
             return "creative"
-        self.char_quality = {
-            "vowels": "aeiou",
-            "easy_consonants": "bcdfghjklmnpqrstvwxyz",
-            "hard_consonants": "qxz",
-            "numbers": "0123456789"
-        }
     
     async def check_domain_availability(self, domain_name: str, tld: str) -> Dict[str, Any]:
         """
@@ -0,0 +1,472 @@
+"""
+Event Indexer
+Follows eth_getLogs for the platform contracts into queryable tables, with checkpoints and reorg handling
+"""
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import structlog
+from eth_abi import decode
+from eth_utils import event_abi_to_log_topic, is_address
+from eth_utils.abi import collapse_if_tuple
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.chain_index import ChainEvent, IndexedBlock, IndexedDomain, IndexerCheckpoint
+from services.rpc_batcher import JsonRpcError
+
+logger = structlog.get_logger()
+
+# Registry events that change who owns a domain token: event -> (new owner arg, token id arg)
+_OWNERSHIP_EVENTS = {
+    "DomainRegistered": ("owner", "tokenId"),
+    "DomainSold": ("to", "tokenId"),
+    "Transfer": ("to", "tokenId")
+}
+
+# Node error messages meaning the eth_getLogs range should be narrowed
+_RANGE_TOO_LARGE = ("more than", "too many", "limit exceeded", "range", "response size", "timeout")
+
+def _normalize(value: Any) -> Any:
+    """JSON-safe form of a decoded ABI value; uint256 does not fit JSON numbers"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if isinstance(value, str) and value.startswith("0x") and len(value) == 42:
+        return value.lower()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+def _is_dynamic(abi_type: str) -> bool:
+    """Indexed dynamic values are only present as their keccak hash"""
+    return abi_type in ("string", "bytes") or abi_type.endswith("]") or abi_type.startswith("(")
+
+class EventCodec:
+    """Topic and decoder for one event of one contract"""
+
+    def __init__(self, contract: str, address: str, fragment: Dict[str, Any]):
+        self.contract = contract
+        self.address = address.lower()
+        self.name = fragment["name"]
+        self.topic = "0x" + event_abi_to_log_topic(fragment).hex()
+        inputs = fragment.get("inputs", [])
+        self.indexed = [(item.get("name", ""), collapse_if_tuple(item)) for item in inputs if item.get("indexed")]
+        self.data = [(item.get("name", ""), collapse_if_tuple(item)) for item in inputs if not item.get("indexed")]
+        self.order = [item.get("name", "") for item in inputs]
+
+    def decode(self, log: Dict[str, Any]) -> Dict[str, Any]:
+        args: Dict[str, Any] = {}
+        for (name, abi_type), topic in zip(self.indexed, log["topics"][1:]):
+            raw = bytes.fromhex(topic[2:])
+            args[name] = "0x" + raw.hex() if _is_dynamic(abi_type) else decode([abi_type], raw)[0]
+
+        data = bytes.fromhex(log.get("data", "0x")[2:])
+        if self.data:
+            values = decode([abi_type for _, abi_type in self.data], data)
+            for (name, _), value in zip(self.data, values):
+                args[name] = value
+        return {name: _normalize(args[name]) for name in self.order if name in args}
+
+    def account_of(self, args: Dict[str, Any]) -> Optional[str]:
+        """First indexed address argument, else the first address argument"""
+        for name, abi_type in self.indexed + self.data:
+            if abi_type == "address":
+                return args.get(name)
+        return None
+
+    def subject_of(self, args: Dict[str, Any]) -> Optional[str]:
+        """The id the event is about (tokenId, proposalId, ...), if it has one"""
+        for name, abi_type in self.indexed + self.data:
+            if abi_type.startswith("uint") and name.lower().endswith("id"):
+                return args.get(name)
+        return None
+
+class EventIndexer:
+    """
+    Indexes logs of the contracts in `BlockchainService.contracts` on one network.
+
+    Each pass reads `batch_blocks` blocks at a time up to the head minus
+    `confirmations`, writes events, block hashes and the checkpoint in one
+    transaction, and narrows the range when the node rejects it as too large.
+    Before each pass the checkpoint's block hash is compared with the chain; on a
+    mismatch the stored hashes are walked back to the fork point and everything
+    above it is deleted and re-indexed.
+
+    Projections registered with `add_projection` maintain derived tables in the same
+    transactions: `apply(session, events, to_block)` folds each new batch in, and
+    `rollback(session, fork_block)` runs after a reorg has deleted the events above
+    the fork.
+    """
+
+    def __init__(
+        self,
+        blockchain_service: Any,
+        session_factory: async_sessionmaker,
+        network: str = "ethereum",
+        batch_blocks: int = 2000,
+        confirmations: int = 2,
+        reorg_depth: int = 128,
+        poll_interval: float = 4.0,
+        start_block: Optional[int] = None
+    ):
+        self.blockchain = blockchain_service
+        self.session_factory = session_factory
+        self.network = network
+        self.max_batch_blocks = max(1, batch_blocks)
+        self.batch_blocks = self.max_batch_blocks
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.poll_interval = poll_interval
+        self.start_block = start_block
+
+        self.codecs: Dict[Tuple[str, str], EventCodec] = {}
+        self._build_codecs()
+        self.projections: List[Any] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.codecs)
+
+    def indexes(self, contract: str) -> bool:
+        return any(codec.contract == contract for codec in self.codecs.values())
+
+    def add_projection(self, projection: Any):
+        self.projections.append(projection)
+
+    def _build_codecs(self):
+        for name, contract_info in self.blockchain.contracts.items():
+            if contract_info.network != self.network or not is_address(contract_info.address):
+                continue
+            for fragment in contract_info.abi:
+                if fragment.get("type") == "event" and not fragment.get("anonymous"):
+                    codec = EventCodec(name, contract_info.address, fragment)
+                    self.codecs[(codec.address, codec.topic)] = codec
+
+    def start(self):
+        if not self.enabled:
+            logger.warning("Event indexer has no contract events to follow", network=self.network)
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # Keep going without sleeping while catching up
+                if await self.run_once() > 0:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Event indexing pass failed", network=self.network, error=str(e))
+            await asyncio.sleep(self.poll_interval)
+
+    async def run_once(self) -> int:
+        """Index the next batch of blocks; returns how many blocks were covered"""
+        head = await self.blockchain.block_caches[self.network].block_number()
+        target = head - self.confirmations
+
+        async with self.session_factory() as session:
+            checkpoint = await session.get(IndexerCheckpoint, self.network)
+            if checkpoint is None:
+                # Without a configured deployment block, follow from the current head
+                from_block = self.start_block if self.start_block is not None else target
+            else:
+                fork_block = await self._find_fork(session, checkpoint)
+                if fork_block is not None:
+                    await self._rollback(session, checkpoint, fork_block)
+                from_block = checkpoint.block_number + 1
+                await session.commit()
+
+        if from_block > target:
+            return 0
+
+        to_block = min(target, from_block + self.batch_blocks - 1)
+        header, logs = await self._fetch_range(from_block, to_block)
+        if header is None:
+            return 0
+        to_block = int(header["number"], 16)
+
+        # Logs from a block that has since been replaced make the batch unusable
+        if any(log["blockNumber"] == header["number"] and log["blockHash"] != header["hash"] for log in logs):
+            logger.warning("Reorg during log fetch, retrying", network=self.network, block=to_block)
+            return 0
+
+        async with self.session_factory() as session:
+            await self._store(session, from_block, to_block, header["hash"], logs)
+            await session.commit()
+
+        logger.debug(
+            "Blocks indexed",
+            network=self.network,
+            from_block=from_block,
+            to_block=to_block,
+            events=len(logs)
+        )
+        return to_block - from_block + 1
+
+    async def _fetch_range(self, from_block: int, to_block: int) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Logs for the range plus the header of its last block, narrowing the range on node limits"""
+        addresses = sorted({codec.address for codec in self.codecs.values()})
+        topics = sorted({codec.topic for codec in self.codecs.values()})
+
+        while True:
+            try:
+                header, logs = await asyncio.gather(
+                    self.blockchain.rpc(self.network, "eth_getBlockByNumber", hex(to_block), False),
+                    self.blockchain.rpc(self.network, "eth_getLogs", {
+                        "fromBlock": hex(from_block),
+                        "toBlock": hex(to_block),
+                        "address": addresses,
+                        "topics": [topics]
+                    })
+                )
+            except JsonRpcError as e:
+                message = str(e).lower()
+                if to_block > from_block and any(marker in message for marker in _RANGE_TOO_LARGE):
+                    self.batch_blocks = max(1, (to_block - from_block + 1) // 2)
+                    to_block = from_block + self.batch_blocks - 1
+                    continue
+                raise
+
+            # Creep back towards the configured size; doubling would hit the node limit again at once
+            if self.batch_blocks < self.max_batch_blocks:
+                self.batch_blocks = min(self.max_batch_blocks, self.batch_blocks + max(1, self.batch_blocks // 4))
+            return header, [log for log in logs if not log.get("removed")]
+
+    async def _store(
+        self,
+        session: AsyncSession,
+        from_block: int,
+        to_block: int,
+        to_block_hash: str,
+        logs: List[Dict[str, Any]]
+    ):
+        logs.sort(key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16)))
+
+        events = []
+        block_hashes = {to_block: to_block_hash}
+        for log in logs:
+            codec = self.codecs.get((log["address"].lower(), log["topics"][0] if log["topics"] else None))
+            if codec is None:
+                continue
+            try:
+                args = codec.decode(log)
+            except Exception as e:
+                logger.warning("Undecodable log skipped", event=codec.name, tx_hash=log["transactionHash"], error=str(e))
+                continue
+
+            block_number = int(log["blockNumber"], 16)
+            block_hashes[block_number] = log["blockHash"]
+            events.append(ChainEvent(
+                network=self.network,
+                contract=codec.contract,
+                address=codec.address,
+                event=codec.name,
+                block_number=block_number,
+                block_hash=log["blockHash"],
+                tx_hash=log["transactionHash"],
+                log_index=int(log["logIndex"], 16),
+                account=codec.account_of(args),
+                subject=codec.subject_of(args),
+                args=args
+            ))
+
+        session.add_all(events)
+        session.add_all(
+            IndexedBlock(network=self.network, block_number=number, block_hash=block_hash)
+            for number, block_hash in block_hashes.items()
+        )
+        await self._apply_ownership(session, events)
+        for projection in self.projections:
+            await projection.apply(session, events, to_block)
+
+        checkpoint = await session.get(IndexerCheckpoint, self.network)
+        if checkpoint is None:
+            session.add(IndexerCheckpoint(network=self.network, block_number=to_block, block_hash=to_block_hash))
+        else:
+            checkpoint.block_number = to_block
+            checkpoint.block_hash = to_block_hash
+
+        await session.execute(delete(IndexedBlock).where(
+            IndexedBlock.network == self.network,
+            IndexedBlock.block_number < to_block - self.reorg_depth
+        ))
+
+    async def _apply_ownership(self, session: AsyncSession, events: Iterable[ChainEvent]):
+        """Fold registry ownership events, in chain order, into IndexedDomain rows"""
+        domains: Dict[str, IndexedDomain] = {}
+        for event in events:
+            if event.contract != "domain_registry" or event.event not in _OWNERSHIP_EVENTS:
+                continue
+            owner_arg, token_arg = _OWNERSHIP_EVENTS[event.event]
+            token_id = event.args.get(token_arg)
+            owner = event.args.get(owner_arg)
+            if token_id is None or owner is None:
+                continue
+
+            row = domains.get(token_id)
+            if row is None:
+                row = await session.get(IndexedDomain, (self.network, token_id))
+            if row is None:
+                row = IndexedDomain(network=self.network, token_id=token_id, owner=owner, updated_block=event.block_number)
+                session.add(row)
+            domains[token_id] = row
+
+            row.owner = owner
+            row.updated_block = event.block_number
+            if event.event == "DomainRegistered":
+                row.domain = event.args.get("domain")
+                row.tld = event.args.get("tld")
+                row.registered_block = event.block_number
+
+    async def _find_fork(self, session: AsyncSession, checkpoint: IndexerCheckpoint) -> Optional[int]:
+        """Highest stored block still on the canonical chain, or None if the checkpoint is canonical"""
+        current = await self.blockchain.rpc(self.network, "eth_getBlockByNumber", hex(checkpoint.block_number), False)
+        if current is not None and current["hash"] == checkpoint.block_hash:
+            return None
+
+        stored = (await session.execute(
+            select(IndexedBlock)
+            .where(IndexedBlock.network == self.network, IndexedBlock.block_number < checkpoint.block_number)
+            .order_by(IndexedBlock.block_number.desc())
+        )).scalars().all()
+
+        # Headers for every stored block go out in one JSON-RPC batch
+        headers = await asyncio.gather(*[
+            self.blockchain.rpc(self.network, "eth_getBlockByNumber", hex(block.block_number), False)
+            for block in stored
+        ])
+        for block, header in zip(stored, headers):
+            if header is not None and header["hash"] == block.block_hash:
+                return block.block_number
+
+        # Deeper than the kept hashes; re-index from below the oldest one
+        logger.error("Reorg deeper than the kept block hashes", network=self.network, depth=self.reorg_depth)
+        oldest = stored[-1].block_number if stored else checkpoint.block_number - self.reorg_depth
+        return max(oldest - 1, 0)
+
+    async def _rollback(self, session: AsyncSession, checkpoint: IndexerCheckpoint, fork_block: int):
+        """Delete everything above `fork_block` and rebuild the ownership rows it touched"""
+        touched = set((await session.execute(
+            select(ChainEvent.subject).where(
+                ChainEvent.network == self.network,
+                ChainEvent.contract == "domain_registry",
+                ChainEvent.block_number > fork_block,
+                ChainEvent.subject.is_not(None)
+            )
+        )).scalars().all())
+
+        await session.execute(delete(ChainEvent).where(
+            ChainEvent.network == self.network, ChainEvent.block_number > fork_block
+        ))
+        await session.execute(delete(IndexedBlock).where(
+            IndexedBlock.network == self.network, IndexedBlock.block_number > fork_block
+        ))
+        await self._rebuild_domains(session, touched)
+        for projection in self.projections:
+            await projection.rollback(session, fork_block)
+
+        fork = await session.get(IndexedBlock, (self.network, fork_block))
+        if fork is not None:
+            fork_hash = fork.block_hash
+        else:
+            header = await self.blockchain.rpc(self.network, "eth_getBlockByNumber", hex(fork_block), False)
+            fork_hash = header["hash"]
+        checkpoint.block_number = fork_block
+        checkpoint.block_hash = fork_hash
+        logger.warning("Chain reorg rolled back", network=self.network, fork_block=fork_block, domains=len(touched))
+
+    async def _rebuild_domains(self, session: AsyncSession, token_ids: Set[str]):
+        if not token_ids:
+            return
+        await session.execute(delete(IndexedDomain).where(
+            IndexedDomain.network == self.network, IndexedDomain.token_id.in_(token_ids)
+        ))
+        await session.flush()
+        remaining = (await session.execute(
+            select(ChainEvent)
+            .where(
+                ChainEvent.network == self.network,
+                ChainEvent.contract == "domain_registry",
+                ChainEvent.subject.in_(token_ids)
+            )
+            .order_by(ChainEvent.block_number, ChainEvent.log_index)
+        )).scalars().all()
+        await self._apply_ownership(session, remaining)
+
+    async def get_domains_by_owner(self, owner: str) -> List[IndexedDomain]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(IndexedDomain)
+                .where(IndexedDomain.network == self.network, IndexedDomain.owner == owner.lower())
+                .order_by(IndexedDomain.registered_block)
+            )
+            return list(result.scalars().all())
+
+    async def get_account_events(
+        self,
+        account: str,
+        contract: Optional[str] = None,
+        events: Optional[List[str]] = None,
+        limit: int = 100
+    ) -> List[ChainEvent]:
+        """Most recent events whose account is `account`"""
+        query = select(ChainEvent).where(ChainEvent.network == self.network, ChainEvent.account == account.lower())
+        if contract is not None:
+            query = query.where(ChainEvent.contract == contract)
+        if events:
+            query = query.where(ChainEvent.event.in_(events))
+        query = query.order_by(ChainEvent.block_number.desc(), ChainEvent.log_index.desc()).limit(limit)
+
+        async with self.session_factory() as session:
+            return list((await session.execute(query)).scalars().all())
+
+    async def sum_account_event_values(self, account: str, contract: str, event: str, field: str) -> int:
+        """
+        Exact sum of the uint256 argument `field` over every `event` of `account`; rows are
+        streamed, as the decimal strings can exceed what a database numeric sum keeps exact
+        """
+        query = select(ChainEvent.args[field].as_string()).where(
+            ChainEvent.network == self.network,
+            ChainEvent.account == account.lower(),
+            ChainEvent.contract == contract,
+            ChainEvent.event == event
+        ).execution_options(yield_per=1000)
+
+        total = 0
+        async with self.session_factory() as session:
+            async for value in await session.stream_scalars(query):
+                if value is not None:
+                    total += int(value)
+        return total
+
+    async def get_event_accounts(self, contract: str, event: str) -> List[str]:
+        """Every distinct account that emitted `event`, e.g. all addresses that ever staked"""
+        query = select(ChainEvent.account).distinct().where(
+            ChainEvent.network == self.network,
+            ChainEvent.contract == contract,
+            ChainEvent.event == event,
+            ChainEvent.account.is_not(None)
+        )
+        async with self.session_factory() as session:
+            return list((await session.execute(query)).scalars().all())
+
+    async def get_checkpoint(self) -> Optional[int]:
+        async with self.session_factory() as session:
+            checkpoint = await session.get(IndexerCheckpoint, self.network)
+            return checkpoint.block_number if checkpoint is not None else None
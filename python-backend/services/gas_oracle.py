@@ -0,0 +1,184 @@
+"""
+Gas Oracle
+EIP-1559 fee estimates from rolling eth_feeHistory samples, answered from memory
+"""
+import asyncio
+import statistics
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Reward percentiles requested from eth_feeHistory, one per speed
+REWARD_PERCENTILES = (10, 50, 90)
+
+# speed -> (reward percentile index, blocks of worst-case base fee growth the max fee must survive)
+SPEEDS: Dict[str, Tuple[int, int]] = {
+    "slow": (0, 2),
+    "standard": (1, 4),
+    "fast": (2, 6)
+}
+
+# Protocol limit on base fee growth from one block to the next
+_MAX_BASE_FEE_CHANGE = 1.125
+
+class GasOracleUnavailable(Exception):
+    """No fee data has been sampled yet"""
+
+class GasOracle:
+    """
+    Samples eth_feeHistory for one network every `poll_interval` seconds and keeps the
+    last `window_blocks` blocks of base fees and priority-fee percentiles.
+
+    `estimate_fees(speed)` answers from memory: the tip is the median of the speed's
+    reward percentile over the window (empty blocks ignored), and the max fee is the
+    next block's base fee grown by the worst case for the speed's headroom, plus the
+    tip. Networks without EIP-1559 fall back to eth_gasPrice and legacy `gasPrice`.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        rpc: Callable[..., Awaitable[Any]],
+        poll_interval: float = 6.0,
+        sample_blocks: int = 20,
+        window_blocks: int = 200
+    ):
+        self.network = network
+        self.rpc = rpc
+        self.poll_interval = poll_interval
+        self.sample_blocks = sample_blocks
+
+        # (block number, base fee, rewards per percentile, gas used ratio)
+        self.blocks: Deque[Tuple[int, int, Tuple[int, ...], float]] = deque(maxlen=window_blocks)
+        self.next_base_fee: Optional[int] = None
+        self.legacy_gas_price: Optional[int] = None
+        self.legacy = False
+
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        return self.legacy_gas_price is not None if self.legacy else self.next_base_fee is not None
+
+    async def sample(self):
+        """Fetch the latest fee history and fold it into the window"""
+        if self.legacy:
+            self.legacy_gas_price = int(await self.rpc("eth_gasPrice"), 16)
+            return
+
+        newest = self.blocks[-1][0] if self.blocks else None
+        try:
+            history = await self.rpc("eth_feeHistory", hex(self.sample_blocks), "latest", list(REWARD_PERCENTILES))
+        except Exception as e:
+            if "not supported" in str(e).lower() or "method not found" in str(e).lower():
+                logger.info("eth_feeHistory unavailable, using legacy gas price", network=self.network)
+                self.legacy = True
+                await self.sample()
+                return
+            raise
+
+        base_fees = [int(fee, 16) for fee in history["baseFeePerGas"]]
+        if not any(base_fees):
+            self.legacy = True
+            await self.sample()
+            return
+
+        oldest = int(history["oldestBlock"], 16)
+        rewards = history.get("reward") or [[]] * len(history["gasUsedRatio"])
+        for offset, (gas_used_ratio, block_rewards) in enumerate(zip(history["gasUsedRatio"], rewards)):
+            number = oldest + offset
+            if newest is not None and number <= newest:
+                continue
+            self.blocks.append((
+                number,
+                base_fees[offset],
+                tuple(int(reward, 16) for reward in block_rewards) or (0,) * len(REWARD_PERCENTILES),
+                float(gas_used_ratio)
+            ))
+
+        # The node reports one extra base fee: the one the next block will charge
+        self.next_base_fee = base_fees[-1]
+
+    async def fees(self, speed: str = "standard") -> Dict[str, int]:
+        """Transaction fee fields, sampling once first if nothing is cached yet"""
+        if not self.ready:
+            await self.sample()
+        return self.estimate_fees(speed)
+
+    def estimate_fees(self, speed: str = "standard") -> Dict[str, int]:
+        """Fee fields for `speed` ("slow", "standard", "fast") from the sampled window"""
+        if speed not in SPEEDS:
+            raise ValueError(f"Unknown speed {speed!r}; expected one of {', '.join(SPEEDS)}")
+        if not self.ready:
+            raise GasOracleUnavailable(f"No fee data sampled yet for {self.network}")
+
+        percentile_index, headroom = SPEEDS[speed]
+        if self.legacy:
+            # Without a base fee, scale the node's suggestion a little per speed
+            return {"gasPrice": int(self.legacy_gas_price * (1 + 0.1 * percentile_index))}
+
+        tip = self.priority_fee(percentile_index)
+        max_fee = int(self.next_base_fee * _MAX_BASE_FEE_CHANGE ** headroom) + tip
+        return {"maxFeePerGas": max_fee, "maxPriorityFeePerGas": tip}
+
+    def priority_fee(self, percentile_index: int) -> int:
+        tips = [rewards[percentile_index] for _, _, rewards, ratio in self.blocks if ratio > 0]
+        return int(statistics.median(tips)) if tips else 0
+
+    def quote(self, gas_units: int, speed: str = "standard") -> Dict[str, Any]:
+        """Expected and maximum cost in wei of `gas_units` at `speed`"""
+        return self._quote(gas_units, speed, self.estimate_fees(speed))
+
+    def _quote(self, gas_units: int, speed: str, fees: Dict[str, int]) -> Dict[str, Any]:
+        if "gasPrice" in fees:
+            expected = maximum = fees["gasPrice"] * gas_units
+        else:
+            expected = (self.next_base_fee + fees["maxPriorityFeePerGas"]) * gas_units
+            maximum = fees["maxFeePerGas"] * gas_units
+        return {"speed": speed, "gas_units": gas_units, "expected_wei": expected, "max_wei": maximum, **fees}
+
+    def quote_many(self, gas_units: List[int], speeds: Tuple[str, ...] = tuple(SPEEDS)) -> List[Dict[str, Dict[str, Any]]]:
+        """Quotes for many transactions from one fee snapshot"""
+        per_speed = {speed: self.estimate_fees(speed) for speed in speeds}
+        quotes = []
+        for units in gas_units:
+            quotes.append({speed: self._quote(units, speed, fees) for speed, fees in per_speed.items()})
+        return quotes
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.ready:
+            return {"ready": False}
+        return {
+            "ready": True,
+            "legacy": self.legacy,
+            "next_base_fee": self.next_base_fee,
+            "window_blocks": len(self.blocks),
+            "latest_block": self.blocks[-1][0] if self.blocks else None,
+            "fees": {speed: self.estimate_fees(speed) for speed in SPEEDS}
+        }
+
+    async def _poll(self):
+        while True:
+            try:
+                await self.sample()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Fee history sampling failed", network=self.network, error=str(e))
+            await asyncio.sleep(self.poll_interval)
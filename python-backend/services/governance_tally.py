@@ -0,0 +1,394 @@
+"""
+Governance Tally
+Running DAO vote totals weighted by voting power at each proposal's snapshot block
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.chain_index import ChainEvent, GovernanceProposal, GovernanceVote, IndexerCheckpoint
+
+logger = structlog.get_logger()
+
+# Staked NXD counts 1.5x: power = balance + stake * 3 / 2
+STAKE_POWER_NUMERATOR = 3
+STAKE_POWER_DENOMINATOR = 2
+
+# NXDDAO: GovernorVotesQuorumFraction(10)
+QUORUM_NUMERATOR = 10
+QUORUM_DENOMINATOR = 100
+
+# GovernorCountingSimple support values
+AGAINST, FOR, ABSTAIN = 0, 1, 2
+_CHOICES = {AGAINST: "against", FOR: "for", ABSTAIN: "abstain"}
+
+STATE_PENDING = "pending"
+STATE_ACTIVE = "active"
+STATE_PASSED = "passed"
+STATE_FAILED = "failed"
+STATE_QUEUED = "queued"
+STATE_EXECUTED = "executed"
+STATE_CANCELED = "canceled"
+
+_VOTE_EVENTS = ("VoteCast", "VoteCastWithParams")
+# Proposal lifecycle events -> column recording the block they happened in
+_LIFECYCLE_EVENTS = {
+    "ProposalQueued": "queued_block",
+    "ProposalExecuted": "executed_block",
+    "ProposalCanceled": "canceled_block"
+}
+
+def voting_power(balance: int, staked: int) -> int:
+    """Voting power of one holder, in exact integer wei"""
+    return balance + staked * STAKE_POWER_NUMERATOR // STAKE_POWER_DENOMINATOR
+
+def total_voting_power(total_supply: int, total_staked: int) -> int:
+    """
+    Power of every token at once: staked tokens sit in the token contract and are
+    part of the supply, so only the extra half of each stake is added
+    """
+    return total_supply + total_staked * (STAKE_POWER_NUMERATOR - STAKE_POWER_DENOMINATOR) // STAKE_POWER_DENOMINATOR
+
+def quorum_for(total_power: int) -> int:
+    return total_power * QUORUM_NUMERATOR // QUORUM_DENOMINATOR
+
+def proposal_state(proposal: GovernanceProposal, block_number: int) -> str:
+    """Governor.state() from the stored tally, as of `block_number`"""
+    if proposal.canceled_block is not None:
+        return STATE_CANCELED
+    if proposal.executed_block is not None:
+        return STATE_EXECUTED
+    if proposal.snapshot_block >= block_number:
+        return STATE_PENDING
+    if proposal.end_block >= block_number:
+        return STATE_ACTIVE
+    if not (quorum_reached(proposal) and int(proposal.for_votes) > int(proposal.against_votes)):
+        return STATE_FAILED
+    return STATE_QUEUED if proposal.queued_block is not None else STATE_PASSED
+
+def quorum_reached(proposal: GovernanceProposal) -> bool:
+    # GovernorCountingSimple counts for and abstain votes towards quorum
+    if proposal.quorum is None:
+        return False
+    return int(proposal.for_votes) + int(proposal.abstain_votes) >= int(proposal.quorum)
+
+def _title(description: str) -> str:
+    # Proposal descriptions conventionally open with a "# Title" line
+    first_line = description.strip().split("\n", 1)[0]
+    return first_line.lstrip("#").strip()[:200]
+
+def _arg(event: ChainEvent, *names: str) -> Any:
+    for name in names:
+        if name in event.args:
+            return event.args[name]
+    return None
+
+class GovernanceTally:
+    """
+    Event indexer projection keeping one GovernanceProposal row per DAO proposal.
+
+    Each VoteCast adds the voter's power at the proposal's snapshot (start) block to
+    the matching total as it is indexed, so a proposal's result and quorum check read
+    one row. Power is balance plus 1.5x stake, summed as exact integers and stored as
+    decimal strings. The total power and quorum are fixed once the indexer passes the
+    snapshot block. After a reorg the affected totals are re-summed from the kept
+    GovernanceVote rows.
+
+    Snapshot balances come from `power_store` when it holds the full token history
+    (it must be registered with the indexer first, so a batch's checkpoints exist
+    before its votes are counted), otherwise from archive reads at the snapshot block.
+    """
+
+    def __init__(self, event_indexer, power_store=None):
+        self.indexer = event_indexer
+        self.blockchain = event_indexer.blockchain
+        self.session_factory = event_indexer.session_factory
+        self.network = event_indexer.network
+        self.power_store = power_store
+
+    @property
+    def enabled(self) -> bool:
+        return self.indexer.enabled and self.indexer.indexes("dao")
+
+    async def apply(self, session: AsyncSession, events: Iterable[ChainEvent], to_block: int):
+        events = [event for event in events if event.contract == "dao"]
+        proposals: Dict[str, GovernanceProposal] = {}
+
+        for event in events:
+            proposal_id = _arg(event, "proposalId")
+            if event.event == "ProposalCreated":
+                description = event.args.get("description") or ""
+                proposals[proposal_id] = GovernanceProposal(
+                    network=self.network,
+                    proposal_id=proposal_id,
+                    proposer=event.args.get("proposer"),
+                    description=description,
+                    created_block=event.block_number,
+                    # OpenZeppelin 4.9 names; older Governors emit startBlock/endBlock
+                    snapshot_block=int(_arg(event, "voteStart", "startBlock")),
+                    end_block=int(_arg(event, "voteEnd", "endBlock")),
+                    for_votes="0",
+                    against_votes="0",
+                    abstain_votes="0",
+                    voters=0
+                )
+                session.add(proposals[proposal_id])
+            elif event.event in _LIFECYCLE_EVENTS:
+                proposal = await self._proposal(session, proposals, proposal_id)
+                if proposal is not None:
+                    setattr(proposal, _LIFECYCLE_EVENTS[event.event], event.block_number)
+
+        # Votes only open after the snapshot, so totals exist before the first vote is counted
+        await self._take_snapshots(session, to_block)
+
+        votes = [event for event in events if event.event in _VOTE_EVENTS]
+        if votes:
+            await self._count_votes(session, proposals, votes)
+
+    async def _proposal(
+        self,
+        session: AsyncSession,
+        proposals: Dict[str, GovernanceProposal],
+        proposal_id: str
+    ) -> Optional[GovernanceProposal]:
+        proposal = proposals.get(proposal_id)
+        if proposal is None:
+            proposal = await session.get(GovernanceProposal, (self.network, proposal_id))
+            if proposal is None:
+                # Created before the indexer's start block
+                logger.debug("Event for unknown proposal skipped", proposal_id=proposal_id)
+                return None
+            proposals[proposal_id] = proposal
+        return proposal
+
+    async def _take_snapshots(self, session: AsyncSession, to_block: int):
+        pending = (await session.execute(
+            select(GovernanceProposal).where(
+                GovernanceProposal.network == self.network,
+                GovernanceProposal.total_power.is_(None),
+                GovernanceProposal.snapshot_block <= to_block
+            )
+        )).scalars().all()
+
+        supplies: Dict[int, int] = {}
+        for proposal in pending:
+            if proposal.snapshot_block not in supplies:
+                total_supply, total_staked = await self._supply_at(session, proposal.snapshot_block)
+                supplies[proposal.snapshot_block] = total_voting_power(total_supply, total_staked)
+            total_power = supplies[proposal.snapshot_block]
+            proposal.total_power = str(total_power)
+            proposal.quorum = str(quorum_for(total_power))
+
+    async def _count_votes(
+        self,
+        session: AsyncSession,
+        proposals: Dict[str, GovernanceProposal],
+        votes: List[ChainEvent]
+    ):
+        # Voters sharing a snapshot block are priced in one multicall
+        voters_by_snapshot: Dict[int, set] = {}
+        counted = []
+        for event in votes:
+            proposal = await self._proposal(session, proposals, _arg(event, "proposalId"))
+            if proposal is None:
+                continue
+            voters_by_snapshot.setdefault(proposal.snapshot_block, set()).add(event.account)
+            counted.append((event, proposal))
+
+        powers: Dict[int, Dict[str, int]] = {}
+        for snapshot_block, voters in voters_by_snapshot.items():
+            balances = await self._balances_at(session, sorted(voters), snapshot_block)
+            powers[snapshot_block] = {
+                voter: voting_power(balance, staked) for voter, (balance, staked) in balances.items()
+            }
+
+        for event, proposal in counted:
+            support = int(event.args.get("support", AGAINST))
+            power = powers[proposal.snapshot_block].get(event.account, 0)
+            session.add(GovernanceVote(
+                network=self.network,
+                proposal_id=proposal.proposal_id,
+                voter=event.account,
+                support=support,
+                power=str(power),
+                block_number=event.block_number,
+                tx_hash=event.tx_hash,
+                reason=event.args.get("reason")
+            ))
+            self._add_votes(proposal, support, power)
+            proposal.voters += 1
+
+    async def _balances_at(self, session: AsyncSession, accounts: List[str], block_number: int) -> Dict[str, Tuple[int, int]]:
+        if self.power_store is not None and self.power_store.complete:
+            return await self.power_store.balances_at(accounts, block_number, session)
+        return await self.blockchain.get_voting_balances(accounts, network=self.network, block=block_number)
+
+    async def _supply_at(self, session: AsyncSession, block_number: int) -> Tuple[int, int]:
+        if self.power_store is not None and self.power_store.complete:
+            return await self.power_store.supply_at(block_number, session)
+        return await self.blockchain.get_voting_supply(network=self.network, block=block_number)
+
+    @staticmethod
+    def _add_votes(proposal: GovernanceProposal, support: int, power: int):
+        if support == FOR:
+            proposal.for_votes = str(int(proposal.for_votes) + power)
+        elif support == ABSTAIN:
+            proposal.abstain_votes = str(int(proposal.abstain_votes) + power)
+        else:
+            proposal.against_votes = str(int(proposal.against_votes) + power)
+
+    async def rollback(self, session: AsyncSession, fork_block: int):
+        """Undo everything above `fork_block`; runs after the indexer deleted those events"""
+        revoted = set((await session.execute(
+            select(GovernanceVote.proposal_id).where(
+                GovernanceVote.network == self.network, GovernanceVote.block_number > fork_block
+            )
+        )).scalars().all())
+
+        await session.execute(delete(GovernanceVote).where(
+            GovernanceVote.network == self.network, GovernanceVote.block_number > fork_block
+        ))
+        await session.execute(delete(GovernanceProposal).where(
+            GovernanceProposal.network == self.network, GovernanceProposal.created_block > fork_block
+        ))
+        for column in _LIFECYCLE_EVENTS.values():
+            await session.execute(
+                update(GovernanceProposal)
+                .where(GovernanceProposal.network == self.network, getattr(GovernanceProposal, column) > fork_block)
+                .values({column: None})
+            )
+        # The snapshot block itself may have been replaced
+        await session.execute(
+            update(GovernanceProposal)
+            .where(GovernanceProposal.network == self.network, GovernanceProposal.snapshot_block > fork_block)
+            .values(total_power=None, quorum=None)
+        )
+        await session.flush()
+
+        for proposal_id in revoted:
+            proposal = await session.get(GovernanceProposal, (self.network, proposal_id))
+            if proposal is None:
+                continue
+            kept = (await session.execute(
+                select(GovernanceVote).where(
+                    GovernanceVote.network == self.network, GovernanceVote.proposal_id == proposal_id
+                )
+            )).scalars().all()
+            proposal.for_votes = proposal.against_votes = proposal.abstain_votes = "0"
+            for vote in kept:
+                self._add_votes(proposal, vote.support, int(vote.power))
+            proposal.voters = len(kept)
+
+    def _summary(self, proposal: GovernanceProposal, block_number: int) -> Dict[str, Any]:
+        return {
+            "id": int(proposal.proposal_id),
+            "title": _title(proposal.description),
+            "description": proposal.description,
+            "proposer": proposal.proposer,
+            "status": proposal_state(proposal, block_number),
+            "votes_for": proposal.for_votes,
+            "votes_against": proposal.against_votes,
+            "votes_abstain": proposal.abstain_votes,
+            "voters": proposal.voters,
+            "quorum": proposal.quorum,
+            "quorum_reached": quorum_reached(proposal),
+            "total_voting_power": proposal.total_power,
+            "created_block": proposal.created_block,
+            "snapshot_block": proposal.snapshot_block,
+            "voting_ends_block": proposal.end_block
+        }
+
+    async def _indexed_block(self, session: AsyncSession) -> int:
+        checkpoint = await session.get(IndexerCheckpoint, self.network)
+        return checkpoint.block_number if checkpoint is not None else 0
+
+    async def get_proposal(self, proposal_id: int, votes_limit: int = 100) -> Optional[Dict[str, Any]]:
+        """One proposal's tally, state, actions and most recent votes"""
+        async with self.session_factory() as session:
+            proposal = await session.get(GovernanceProposal, (self.network, str(proposal_id)))
+            if proposal is None:
+                return None
+            summary = self._summary(proposal, await self._indexed_block(session))
+
+            created = (await session.execute(
+                select(ChainEvent).where(
+                    ChainEvent.network == self.network,
+                    ChainEvent.contract == "dao",
+                    ChainEvent.subject == proposal.proposal_id,
+                    ChainEvent.event == "ProposalCreated"
+                )
+            )).scalars().first()
+            votes = (await session.execute(
+                select(GovernanceVote)
+                .where(GovernanceVote.network == self.network, GovernanceVote.proposal_id == proposal.proposal_id)
+                .order_by(GovernanceVote.block_number.desc())
+                .limit(votes_limit)
+            )).scalars().all()
+
+        args = created.args if created is not None else {}
+        summary["actions"] = [
+            {"target": target, "value": value, "calldata": calldata}
+            for target, value, calldata in zip(args.get("targets", []), args.get("values", []), args.get("calldatas", []))
+        ]
+        summary["voting_history"] = [
+            {
+                "voter": vote.voter,
+                "support": vote.support == FOR,
+                "choice": _CHOICES.get(vote.support, "against"),
+                "voting_power": vote.power,
+                "reason": vote.reason,
+                "block_number": vote.block_number,
+                "tx_hash": vote.tx_hash
+            }
+            for vote in votes
+        ]
+        return summary
+
+    async def list_proposals(self, status: Optional[str] = None, limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """Newest proposals first, optionally only those in `status`"""
+        async with self.session_factory() as session:
+            block_number = await self._indexed_block(session)
+            proposals = (await session.execute(
+                select(GovernanceProposal)
+                .where(GovernanceProposal.network == self.network)
+                .order_by(GovernanceProposal.created_block.desc())
+            )).scalars().all()
+
+        summaries = [self._summary(proposal, block_number) for proposal in proposals]
+        if status:
+            summaries = [summary for summary in summaries if summary["status"] == status]
+        return summaries[:limit] if limit else summaries
+
+    async def stats(self) -> Dict[str, Any]:
+        async with self.session_factory() as session:
+            block_number = await self._indexed_block(session)
+            proposals = (await session.execute(
+                select(GovernanceProposal)
+                .where(GovernanceProposal.network == self.network)
+                .order_by(GovernanceProposal.created_block.desc())
+            )).scalars().all()
+            total_voters = (await session.execute(
+                select(func.count(func.distinct(GovernanceVote.voter))).where(GovernanceVote.network == self.network)
+            )).scalar_one()
+
+        states = [proposal_state(proposal, block_number) for proposal in proposals]
+        turnouts = [
+            (int(proposal.for_votes) + int(proposal.against_votes) + int(proposal.abstain_votes)) / int(proposal.total_power)
+            for proposal in proposals
+            if proposal.total_power and int(proposal.total_power)
+        ]
+
+        total_supply, total_staked = await self.blockchain.get_voting_supply(network=self.network)
+        total_power = total_voting_power(total_supply, total_staked)
+        return {
+            "total_proposals": len(proposals),
+            "active_proposals": states.count(STATE_ACTIVE),
+            "passed_proposals": sum(states.count(state) for state in (STATE_PASSED, STATE_QUEUED, STATE_EXECUTED)),
+            "failed_proposals": states.count(STATE_FAILED),
+            "total_voters": total_voters,
+            "average_turnout": sum(turnouts) / len(turnouts) if turnouts else 0.0,
+            "total_voting_power": str(total_power),
+            "quorum_requirement": str(quorum_for(total_power))
+        }
@@ -0,0 +1,516 @@
+"""
+Job Queue
+Durable priority job queue on Redis, with an in-memory stand-in, for background AI work
+"""
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+from core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Optional: only the in-memory backend is available without redis
+    aioredis = None
+
+logger = structlog.get_logger()
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Queue score = priority * weight + enqueue time (ms), so priority always dominates age
+_PRIORITY_WEIGHT = 10 ** 13
+
+@dataclass
+class Job:
+    """Unit of background work and its outcome"""
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    priority: int = 10
+    dedup_key: Optional[str] = None
+    max_attempts: int = 3
+    attempts: int = 0
+    status: str = JOB_QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def to_record(self) -> Dict[str, str]:
+        """Flat string fields for storage"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "payload": json.dumps(self.payload, default=str),
+            "priority": str(self.priority),
+            "dedup_key": self.dedup_key or "",
+            "max_attempts": str(self.max_attempts),
+            "attempts": str(self.attempts),
+            "status": self.status,
+            "result": json.dumps(self.result, default=str),
+            "error": self.error or "",
+            "created_at": str(self.created_at),
+            "updated_at": str(self.updated_at)
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, str]) -> "Job":
+        return cls(
+            id=record["id"],
+            kind=record["kind"],
+            payload=json.loads(record["payload"]),
+            priority=int(record["priority"]),
+            dedup_key=record.get("dedup_key") or None,
+            max_attempts=int(record["max_attempts"]),
+            attempts=int(record["attempts"]),
+            status=record["status"],
+            result=json.loads(record.get("result") or "null"),
+            error=record.get("error") or None,
+            created_at=float(record["created_at"]),
+            updated_at=float(record["updated_at"])
+        )
+
+def _queue_score(priority: int, now: float) -> float:
+    return priority * _PRIORITY_WEIGHT + int(now * 1000)
+
+class InMemoryJobBackend:
+    """
+    Single-process stand-in for the Redis backend, for tests and local development
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self.queue: Dict[str, float] = {}
+        self.delayed: Dict[str, float] = {}
+        self.leases: Dict[str, float] = {}
+        self.dedup: Dict[str, tuple] = {}
+        self.expiry: Dict[str, float] = {}
+
+    def _expire(self, now: float):
+        for job_id in [job_id for job_id, at in self.expiry.items() if at <= now]:
+            self.expiry.pop(job_id)
+            self.jobs.pop(job_id, None)
+        for key in [key for key, (_, at) in self.dedup.items() if at <= now]:
+            self.dedup.pop(key)
+
+    async def enqueue(self, job: Job, dedup_ttl: float) -> Job:
+        now = time.time()
+        self._expire(now)
+        if job.dedup_key:
+            existing = self.dedup.get(job.dedup_key)
+            if existing is not None and existing[0] in self.jobs:
+                return self.jobs[existing[0]]
+            self.dedup[job.dedup_key] = (job.id, now + dedup_ttl)
+        self.jobs[job.id] = job
+        self.queue[job.id] = _queue_score(job.priority, now)
+        return job
+
+    async def claim(self, lease_seconds: float) -> Optional[Job]:
+        if not self.queue:
+            return None
+        job_id = min(self.queue, key=self.queue.get)
+        del self.queue[job_id]
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        job.status = JOB_RUNNING
+        job.attempts += 1
+        job.updated_at = time.time()
+        self.leases[job_id] = job.updated_at + lease_seconds
+        return job
+
+    async def extend_lease(self, job_id: str, lease_seconds: float):
+        if job_id in self.leases:
+            self.leases[job_id] = time.time() + lease_seconds
+
+    async def complete(self, job: Job, result: Any, result_ttl: float):
+        self._finish(job, JOB_SUCCEEDED, result=result, result_ttl=result_ttl)
+
+    async def fail(self, job: Job, error: str, retry_delay: Optional[float], result_ttl: float):
+        if retry_delay is None:
+            self._finish(job, JOB_FAILED, error=error, result_ttl=result_ttl)
+            return
+        stored = self.jobs.get(job.id, job)
+        stored.status = JOB_QUEUED
+        stored.error = error
+        stored.updated_at = time.time()
+        self.leases.pop(job.id, None)
+        self.delayed[job.id] = stored.updated_at + retry_delay
+
+    async def release(self, job: Job):
+        stored = self.jobs.get(job.id, job)
+        stored.status = JOB_QUEUED
+        stored.attempts = max(0, stored.attempts - 1)
+        stored.updated_at = time.time()
+        self.leases.pop(job.id, None)
+        self.queue[job.id] = _queue_score(stored.priority, stored.updated_at)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None, result_ttl: float = 0):
+        stored = self.jobs.get(job.id, job)
+        stored.status = status
+        stored.result = result
+        stored.error = error
+        stored.updated_at = time.time()
+        self.leases.pop(job.id, None)
+        self.queue.pop(job.id, None)
+        self.expiry[job.id] = stored.updated_at + result_ttl
+        if status == JOB_FAILED and stored.dedup_key:
+            # Let clients resubmit the same work after a permanent failure
+            if self.dedup.get(stored.dedup_key, (None,))[0] == job.id:
+                self.dedup.pop(stored.dedup_key)
+
+    async def recover(self, result_ttl: float) -> int:
+        now = time.time()
+        self._expire(now)
+        moved = 0
+        for job_id in [job_id for job_id, at in self.delayed.items() if at <= now]:
+            del self.delayed[job_id]
+            job = self.jobs.get(job_id)
+            if job is not None:
+                self.queue[job_id] = _queue_score(job.priority, now)
+                moved += 1
+        for job_id in [job_id for job_id, at in self.leases.items() if at <= now]:
+            del self.leases[job_id]
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            moved += 1
+            if job.attempts >= job.max_attempts:
+                self._finish(job, JOB_FAILED, error="Worker lease expired", result_ttl=result_ttl)
+            else:
+                job.status = JOB_QUEUED
+                self.queue[job_id] = _queue_score(job.priority, now)
+        return moved
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        self._expire(time.time())
+        return self.jobs.get(job_id)
+
+    async def queue_depth(self) -> int:
+        return len(self.queue) + len(self.delayed)
+
+    async def close(self):
+        pass
+
+# Pop the best-scored job and take a lease on it in one step, so two workers never claim the same job
+_CLAIM_SCRIPT = """
+local ids = redis.call('ZRANGE', KEYS[1], 0, 0)
+if #ids == 0 then return false end
+local id = ids[1]
+redis.call('ZREM', KEYS[1], id)
+local key = ARGV[3] .. id
+if redis.call('EXISTS', key) == 0 then return false end
+redis.call('HSET', key, 'status', 'running', 'updated_at', ARGV[1])
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('ZADD', KEYS[2], ARGV[2], id)
+return id
+"""
+
+# Move due entries of a schedule (retry delays, or expired worker leases) back onto the queue
+_PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, id in ipairs(due) do
+  redis.call('ZREM', KEYS[1], id)
+  local key = ARGV[2] .. id
+  local job = redis.call('HMGET', key, 'priority', 'attempts', 'max_attempts')
+  if job[1] then
+    if ARGV[3] == '1' and tonumber(job[2]) >= tonumber(job[3]) then
+      redis.call('HSET', key, 'status', 'failed', 'error', 'Worker lease expired', 'updated_at', ARGV[4])
+      redis.call('EXPIRE', key, ARGV[5])
+    else
+      redis.call('HSET', key, 'status', 'queued', 'updated_at', ARGV[4])
+      redis.call('ZADD', KEYS[2], tonumber(job[1]) * 10000000000000 + tonumber(ARGV[1]), id)
+    end
+  end
+end
+return #due
+"""
+
+class RedisJobBackend:
+    """
+    Job storage on Redis: one hash per job, a priority sorted set for ready jobs,
+    and sorted sets of retry times and worker lease deadlines for recovery
+    """
+
+    def __init__(self, redis_url: str, prefix: str = "nxd:jobs"):
+        if aioredis is None:
+            raise RuntimeError("redis package is required for the Redis job queue backend")
+        self.redis = aioredis.from_url(redis_url, decode_responses=True)
+        self.prefix = prefix
+        self.job_prefix = f"{prefix}:job:"
+        self.queue_key = f"{prefix}:queue"
+        self.delayed_key = f"{prefix}:delayed"
+        self.leases_key = f"{prefix}:leases"
+        self._claim = self.redis.register_script(_CLAIM_SCRIPT)
+        self._promote = self.redis.register_script(_PROMOTE_SCRIPT)
+
+    def _dedup_key(self, key: str) -> str:
+        return f"{self.prefix}:dedup:{key}"
+
+    async def enqueue(self, job: Job, dedup_ttl: float) -> Job:
+        if job.dedup_key:
+            # Milliseconds, at least one: Redis rejects a zero expiry that ex=int() makes of sub-second TTLs
+            dedup_ms = max(1, int(dedup_ttl * 1000))
+            claimed = await self.redis.set(self._dedup_key(job.dedup_key), job.id, nx=True, px=dedup_ms)
+            if not claimed:
+                existing_id = await self.redis.get(self._dedup_key(job.dedup_key))
+                existing = await self.get(existing_id) if existing_id else None
+                if existing is not None:
+                    return existing
+                await self.redis.set(self._dedup_key(job.dedup_key), job.id, px=dedup_ms)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.job_prefix + job.id, mapping=job.to_record())
+            pipe.zadd(self.queue_key, {job.id: _queue_score(job.priority, time.time())})
+            await pipe.execute()
+        return job
+
+    async def claim(self, lease_seconds: float) -> Optional[Job]:
+        now = time.time()
+        job_id = await self._claim(
+            keys=[self.queue_key, self.leases_key],
+            args=[str(now), int((now + lease_seconds) * 1000), self.job_prefix]
+        )
+        if not job_id:
+            return None
+        return await self.get(job_id)
+
+    async def extend_lease(self, job_id: str, lease_seconds: float):
+        await self.redis.zadd(self.leases_key, {job_id: int((time.time() + lease_seconds) * 1000)}, xx=True)
+
+    async def complete(self, job: Job, result: Any, result_ttl: float):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.job_prefix + job.id, mapping={
+                "status": JOB_SUCCEEDED,
+                "result": json.dumps(result, default=str),
+                "error": "",
+                "updated_at": str(time.time())
+            })
+            pipe.zrem(self.leases_key, job.id)
+            pipe.zrem(self.queue_key, job.id)
+            pipe.expire(self.job_prefix + job.id, int(result_ttl))
+            await pipe.execute()
+
+    async def fail(self, job: Job, error: str, retry_delay: Optional[float], result_ttl: float):
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.leases_key, job.id)
+            if retry_delay is None:
+                pipe.hset(self.job_prefix + job.id, mapping={
+                    "status": JOB_FAILED, "error": error, "updated_at": str(now)
+                })
+                pipe.expire(self.job_prefix + job.id, int(result_ttl))
+            else:
+                pipe.hset(self.job_prefix + job.id, mapping={
+                    "status": JOB_QUEUED, "error": error, "updated_at": str(now)
+                })
+                pipe.zadd(self.delayed_key, {job.id: int((now + retry_delay) * 1000)})
+            await pipe.execute()
+
+        if retry_delay is None and job.dedup_key:
+            # Let clients resubmit the same work after a permanent failure
+            dedup_key = self._dedup_key(job.dedup_key)
+            if await self.redis.get(dedup_key) == job.id:
+                await self.redis.delete(dedup_key)
+
+    async def release(self, job: Job):
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.leases_key, job.id)
+            pipe.hset(self.job_prefix + job.id, mapping={"status": JOB_QUEUED, "updated_at": str(now)})
+            pipe.hincrby(self.job_prefix + job.id, "attempts", -1)
+            pipe.zadd(self.queue_key, {job.id: _queue_score(job.priority, now)})
+            await pipe.execute()
+
+    async def recover(self, result_ttl: float) -> int:
+        now = time.time()
+        args = [int(now * 1000), self.job_prefix]
+        retried = await self._promote(
+            keys=[self.delayed_key, self.queue_key], args=args + ["0", str(now), int(result_ttl)]
+        )
+        reaped = await self._promote(
+            keys=[self.leases_key, self.queue_key], args=args + ["1", str(now), int(result_ttl)]
+        )
+        return retried + reaped
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        record = await self.redis.hgetall(self.job_prefix + job_id)
+        return Job.from_record(record) if record else None
+
+    async def queue_depth(self) -> int:
+        return await self.redis.zcard(self.queue_key) + await self.redis.zcard(self.delayed_key)
+
+    async def close(self):
+        await self.redis.close()
+
+class JobQueue:
+    """
+    Priority job queue with deduplication keys, retries and result polling
+    """
+
+    def __init__(
+        self,
+        backend,
+        default_max_attempts: int = 3,
+        dedup_ttl_seconds: float = 600,
+        result_ttl_seconds: float = 86400
+    ):
+        self.backend = backend
+        self.default_max_attempts = default_max_attempts
+        self.dedup_ttl_seconds = dedup_ttl_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        priority: int = 10,
+        dedup_key: Optional[str] = None,
+        max_attempts: Optional[int] = None
+    ) -> Job:
+        """Queue a job; a live job with the same dedup key is returned instead of a new one"""
+        job = Job(
+            id=f"{kind}_{uuid.uuid4().hex}",
+            kind=kind,
+            payload=payload,
+            priority=priority,
+            dedup_key=dedup_key,
+            max_attempts=max_attempts or self.default_max_attempts
+        )
+        return await self.backend.enqueue(job, self.dedup_ttl_seconds)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Poll a job's status and result"""
+        return await self.backend.get(job_id)
+
+    async def queue_depth(self) -> int:
+        return await self.backend.queue_depth()
+
+    async def close(self):
+        await self.backend.close()
+
+class JobWorker:
+    """
+    Consumes jobs with a fixed number of concurrent slots. Any number of workers can
+    share one Redis queue; leases are renewed while a job runs, and jobs whose worker
+    died are re-queued once the lease lapses.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]],
+        concurrency: int = 4,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 0.5,
+        retry_base_seconds: float = 2.0
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retry_base_seconds = retry_base_seconds
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the worker slots as background tasks"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run_slot()) for _ in range(self.concurrency)]
+
+    async def run(self):
+        """Run until cancelled"""
+        self.start()
+        await asyncio.gather(*self._tasks)
+
+    async def stop(self):
+        """Cancel the slots; running jobs go back on the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run_slot(self):
+        backend = self.queue.backend
+        while True:
+            try:
+                await backend.recover(self.queue.result_ttl_seconds)
+                job = await backend.claim(self.lease_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Job queue unavailable", error=str(e))
+                await asyncio.sleep(self.poll_interval * 4)
+                continue
+
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            await self._process(job)
+
+    async def _process(self, job: Job):
+        backend = self.queue.backend
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            await backend.fail(job, f"No handler for job kind: {job.kind}", None, self.queue.result_ttl_seconds)
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            result = await handler(job.payload)
+        except asyncio.CancelledError:
+            await asyncio.shield(backend.release(job))
+            raise
+        except Exception as e:
+            retry_delay = None
+            if job.attempts < job.max_attempts:
+                retry_delay = self.retry_base_seconds * 2 ** (job.attempts - 1)
+            logger.warning(
+                "Job failed", job_id=job.id, kind=job.kind, attempt=job.attempts,
+                retrying=retry_delay is not None, error=str(e)
+            )
+            await backend.fail(job, str(e), retry_delay, self.queue.result_ttl_seconds)
+        else:
+            await backend.complete(job, result, self.queue.result_ttl_seconds)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str):
+        """Keep the lease alive while the handler runs"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.queue.backend.extend_lease(job_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning("Job lease renewal failed", job_id=job_id, error=str(e))
+
+_job_queue: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue configured from settings"""
+    global _job_queue
+    if _job_queue is None:
+        if settings.AI_JOB_QUEUE_BACKEND == "memory":
+            backend = InMemoryJobBackend()
+        else:
+            backend = RedisJobBackend(settings.REDIS_URL)
+        _job_queue = JobQueue(
+            backend,
+            default_max_attempts=settings.AI_JOB_MAX_ATTEMPTS,
+            dedup_ttl_seconds=settings.AI_JOB_DEDUP_TTL_SECONDS,
+            result_ttl_seconds=settings.AI_JOB_RESULT_TTL_SECONDS
+        )
+    return _job_queue
@@ -0,0 +1,226 @@
+"""
+Local AI Provider
+Offline stand-in for OpenAI-compatible chat completion APIs, for load testing and benchmarking the AI gateway
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+import structlog
+
+from services.ai_rate_limiter import estimate_tokens
+from services.structured_output import SCHEMA_MARKER
+
+logger = structlog.get_logger()
+
+_BATCH_ITEM = re.compile(r"^\[(\d+)\]", re.MULTILINE)
+
+def _example_from_schema(schema: Dict[str, Any], definitions: Dict[str, Any]) -> Any:
+    """Build a minimal instance of a JSON schema"""
+    if "$ref" in schema:
+        return _example_from_schema(definitions[schema["$ref"].split("/")[-1]], definitions)
+
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {
+            name: _example_from_schema(prop, definitions)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return [_example_from_schema(schema.get("items", {}), definitions)]
+    if schema_type in ("number", "integer"):
+        low = schema.get("minimum", 0)
+        high = schema.get("maximum", low + 1)
+        value = (low + high) / 2
+        return int(value) if schema_type == "integer" else value
+    if schema_type == "boolean":
+        return True
+    return "OK (local provider)"
+
+def default_responder(system_prompt: str, user_prompt: str) -> str:
+    """
+    Canned completion shaped like the gateway's prompts: structured calls get an instance
+    of the requested schema, numbered batch prompts a JSON array with one entry per item,
+    everything else a single JSON object
+    """
+    if SCHEMA_MARKER in system_prompt:
+        try:
+            schema = json.loads(system_prompt.split(SCHEMA_MARKER, 1)[1])
+            return json.dumps(_example_from_schema(schema, schema.get("$defs", {})))
+        except (ValueError, KeyError):
+            pass
+
+    indexes = [int(index) for index in _BATCH_ITEM.findall(user_prompt)]
+    if indexes and "JSON array" in system_prompt:
+        return json.dumps([
+            {"index": index, "approved": True, "reason": "OK (local provider)", "score": 0.5}
+            for index in indexes
+        ])
+    return json.dumps({"approved": True, "reason": "OK (local provider)", "score": 50})
+
+class LocalProviderTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport answering `/chat/completions` requests in-process.
+
+    Latency is drawn from a log-normal distribution around `latency_median_ms`, plus
+    `1 / tokens_per_second` per generated token. A fraction `error_rate` of requests
+    fail with 429 or 500. Requests with `"stream": true` receive server-sent events
+    chunk by chunk. A fixed `seed` makes the latency and error sequence reproducible.
+
+    Pass it to any httpx client, including the one behind `AsyncOpenAI(http_client=...)`.
+    """
+
+    def __init__(
+        self,
+        latency_median_ms: float = 300.0,
+        latency_sigma: float = 0.5,
+        tokens_per_second: float = 200.0,
+        error_rate: float = 0.0,
+        output_tokens: int = 0,
+        seed: Optional[int] = None,
+        responder: Callable[[str, str], str] = default_responder
+    ):
+        self.latency_median_ms = latency_median_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.output_tokens = output_tokens
+        self.responder = responder
+        self.random = random.Random(seed)
+
+        self.request_count = 0
+        self.error_count = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.request_count += 1
+
+        if not request.url.path.endswith("/chat/completions"):
+            return self._error(404, "not_found", "Only chat completions are emulated")
+
+        try:
+            payload = json.loads(await request.aread())
+            messages = payload["messages"]
+        except (ValueError, KeyError, TypeError):
+            return self._error(400, "invalid_request_error", "Malformed chat completion request")
+
+        # Draw every random value up front so the sequence does not depend on task scheduling
+        first_token_delay = self._sample_latency()
+        failed = self.random.random() < self.error_rate
+        status = self.random.choice((429, 500))
+
+        if failed:
+            await asyncio.sleep(first_token_delay)
+            self.error_count += 1
+            if status == 429:
+                return self._error(429, "rate_limit_exceeded", "Emulated rate limit", {"Retry-After": "1"})
+            return self._error(500, "server_error", "Emulated provider failure")
+
+        system_prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        user_prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") == "user")
+        content = self._pad(self.responder(system_prompt, user_prompt))
+
+        usage = {
+            "prompt_tokens": sum(estimate_tokens(m.get("content", "")) for m in messages),
+            "completion_tokens": estimate_tokens(content)
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        model = payload.get("model", "local")
+
+        if payload.get("stream"):
+            return httpx.Response(
+                200,
+                headers={"Content-Type": "text/event-stream"},
+                stream=_EventStream(self._stream_events(model, content, usage, first_token_delay))
+            )
+
+        await asyncio.sleep(first_token_delay + usage["completion_tokens"] / self.tokens_per_second)
+        return httpx.Response(200, json={
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+    def _sample_latency(self) -> float:
+        """Time to first token in seconds"""
+        return self.latency_median_ms * math.exp(self.random.gauss(0.0, self.latency_sigma)) / 1000
+
+    def _pad(self, content: str) -> str:
+        """Grow the completion to roughly `output_tokens` tokens"""
+        missing = self.output_tokens - estimate_tokens(content)
+        if missing <= 0:
+            return content
+        return content + "\n" + " ".join(["token"] * missing)
+
+    async def _stream_events(
+        self,
+        model: str,
+        content: str,
+        usage: Dict[str, int],
+        first_token_delay: float
+    ) -> AsyncIterator[bytes]:
+        """Yield SSE chunks the way OpenAI-compatible APIs stream completions"""
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra) -> bytes:
+            body = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra
+            }
+            return f"data: {json.dumps(body)}\n\n".encode()
+
+        await asyncio.sleep(first_token_delay)
+        yield chunk({"role": "assistant", "content": ""})
+
+        # Split on whitespace boundaries, roughly one piece per token
+        pieces: List[str] = re.findall(r"\S+\s*|\s+", content)
+        token_delay = 1 / self.tokens_per_second
+        for piece in pieces:
+            await asyncio.sleep(token_delay)
+            yield chunk({"content": piece})
+
+        yield chunk({}, "stop", usage=usage)
+        yield b"data: [DONE]\n\n"
+
+    def _error(
+        self,
+        status_code: int,
+        error_type: str,
+        message: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> httpx.Response:
+        return httpx.Response(
+            status_code,
+            headers=headers,
+            json={"error": {"message": message, "type": error_type, "code": error_type}}
+        )
+
+class _EventStream(httpx.AsyncByteStream):
+    """Adapt an async generator of bytes to an httpx response stream"""
+
+    def __init__(self, events: AsyncIterator[bytes]):
+        self.events = events
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for event in self.events:
+            yield event
+
+    async def aclose(self):
+        await self.events.aclose()
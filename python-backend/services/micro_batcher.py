@@ -0,0 +1,102 @@
+"""
+Micro Batcher
+Collects individual async requests into small batches handled by one call
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+class MicroBatchError(Exception):
+    """The batch handler failed as a whole; raised to each caller of the batch, chained to the cause"""
+
+class MicroBatcher:
+    """
+    Buffers submitted items until `max_batch_size` items are waiting or `max_wait_ms`
+    has passed since the first one, then resolves them all with one `batch_handler` call.
+
+    The handler receives the list of items and must return one result per item, in order.
+    A result that is an Exception instance fails only that item's caller, and must not
+    be shared with another item. When the handler itself fails, every caller gets its
+    own MicroBatchError, so concurrent awaiters never re-raise one shared instance.
+    """
+
+    def __init__(
+        self,
+        batch_handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 20,
+        max_wait_ms: float = 50.0,
+        name: str = "batch"
+    ):
+        self.batch_handler = batch_handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result from the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    @property
+    def pending_count(self) -> int:
+        """Number of items waiting for the next batch"""
+        return len(self._pending)
+
+    def _flush(self):
+        """Hand the buffered items to the batch handler"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Run one batch and fan results back out to the waiting callers"""
+        items = [item for item, _ in batch]
+
+        try:
+            results = await self.batch_handler(items)
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch handler returned {len(results)} results for {len(batch)} items"
+                )
+        except Exception as e:
+            logger.error("Micro-batch failed", batcher=self.name, size=len(batch), error=str(e))
+            for _, future in batch:
+                if not future.done():
+                    error = MicroBatchError(f"{self.name} batch failed: {e}")
+                    error.__cause__ = e
+                    future.set_exception(error)
+            return
+
+        logger.debug("Micro-batch completed", batcher=self.name, size=len(batch))
+
+        for (_, future), result in zip(batch, results):
+            # Callers that gave up have already had their future cancelled
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
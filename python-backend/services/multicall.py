@@ -0,0 +1,154 @@
+"""
+Multicall
+Packs contract view calls, across any number of contracts, into Multicall3 aggregate3 eth_calls
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import structlog
+from eth_abi import decode, encode
+from eth_utils import to_checksum_address
+from eth_utils.abi import function_abi_to_4byte_selector, get_abi_input_types, get_abi_output_types
+
+logger = structlog.get_logger()
+
+# Same address on every chain Multicall3 is deployed to
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# aggregate3((address target, bool allowFailure, bytes callData)[]) returns (bool success, bytes returnData)[]
+_AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+_AGGREGATE3_INPUT = "(address,bool,bytes)[]"
+_AGGREGATE3_OUTPUT = "(bool,bytes)[]"
+
+BlockIdentifier = Union[str, int]
+
+@dataclass(frozen=True)
+class ContractCall:
+    """
+    One view function call; `abi` is the contract ABI the function is looked up in,
+    unless a prebuilt `codec` for it is given
+    """
+    address: str
+    abi: Tuple[Dict[str, Any], ...]
+    function: str
+    args: Tuple[Any, ...] = ()
+    allow_failure: bool = True
+    codec: Optional["FunctionCodec"] = field(default=None, compare=False)
+
+class MulticallError(Exception):
+    """Raised when the aggregate call itself fails or a required call reverts or returns garbage"""
+
+class FunctionCodec:
+    """Selector plus input and output types of one ABI function"""
+
+    def __init__(self, fragment: Dict[str, Any]):
+        self.name = fragment["name"]
+        self.selector = function_abi_to_4byte_selector(fragment)
+        self.input_types = get_abi_input_types(fragment)
+        self.output_types = get_abi_output_types(fragment)
+
+    def encode_call(self, args: Sequence[Any]) -> bytes:
+        return self.selector + encode(self.input_types, list(args))
+
+    def decode_result(self, data: bytes) -> Any:
+        """Decoded return value; single outputs are unwrapped, no outputs give None"""
+        if not self.output_types:
+            return None
+        values = decode(self.output_types, data)
+        return values[0] if len(values) == 1 else values
+
+class Multicall:
+    """
+    Multicall3 aggregator over a raw JSON-RPC callable `rpc(method, *params)`.
+
+    Codecs are built once per (address, function, arity) and reused. Lists longer than
+    `max_calls` are split into several eth_calls pinned to the same block.
+    """
+
+    def __init__(
+        self,
+        rpc: Callable[..., Awaitable[Any]],
+        address: str = MULTICALL3_ADDRESS,
+        max_calls: int = 500
+    ):
+        self.rpc = rpc
+        self.address = to_checksum_address(address)
+        self.max_calls = max(1, max_calls)
+        self._codecs: Dict[Tuple[str, str, int], FunctionCodec] = {}
+
+    def codec(self, call: ContractCall) -> FunctionCodec:
+        if call.codec is not None:
+            return call.codec
+        key = (call.address.lower(), call.function, len(call.args))
+        codec = self._codecs.get(key)
+        if codec is None:
+            fragment = next(
+                (
+                    item for item in call.abi
+                    if item.get("type") == "function"
+                    and item.get("name") == call.function
+                    and len(item.get("inputs", [])) == len(call.args)
+                ),
+                None
+            )
+            if fragment is None:
+                raise ValueError(f"Function {call.function}/{len(call.args)} not in ABI for {call.address}")
+            codec = self._codecs[key] = FunctionCodec(fragment)
+        return codec
+
+    async def call_many(
+        self,
+        calls: Sequence[ContractCall],
+        block: BlockIdentifier = "latest"
+    ) -> List[Optional[Any]]:
+        """
+        Results in call order. A failed or undecodable call with `allow_failure` yields
+        None; without it, a failure makes Multicall3 revert the whole chunk and either
+        one raises MulticallError.
+        """
+        if not calls:
+            return []
+
+        codecs = [self.codec(call) for call in calls]
+        encoded = [
+            (to_checksum_address(call.address), call.allow_failure, codec.encode_call(call.args))
+            for call, codec in zip(calls, codecs)
+        ]
+
+        chunks = [encoded[i:i + self.max_calls] for i in range(0, len(encoded), self.max_calls)]
+        if len(chunks) > 1 and block in ("latest", "pending", "safe", "finalized"):
+            # Pin every chunk to one block so the results are a consistent snapshot
+            block = int(await self.rpc("eth_blockNumber"), 16)
+        block_param = hex(block) if isinstance(block, int) else block
+
+        raw_chunks = await asyncio.gather(*[self._aggregate3(chunk, block_param) for chunk in chunks])
+
+        results: List[Optional[Any]] = []
+        outcomes = [outcome for chunk in raw_chunks for outcome in chunk]
+        for call, codec, (success, data) in zip(calls, codecs, outcomes):
+            if not success:
+                results.append(None)
+                continue
+            try:
+                results.append(codec.decode_result(data))
+            except Exception as e:
+                if not call.allow_failure:
+                    raise MulticallError(
+                        f"Result of required call {call.function} on {call.address} could not be decoded: {e}"
+                    ) from e
+                logger.warning("Multicall result decoding failed", address=call.address, function=call.function, error=str(e))
+                results.append(None)
+        return results
+
+    async def _aggregate3(
+        self,
+        chunk: List[Tuple[str, bool, bytes]],
+        block: str
+    ) -> List[Tuple[bool, bytes]]:
+        data = _AGGREGATE3_SELECTOR + encode([_AGGREGATE3_INPUT], [chunk])
+        try:
+            raw = await self.rpc("eth_call", {"to": self.address, "data": "0x" + data.hex()}, block)
+        except Exception as e:
+            raise MulticallError(f"aggregate3 call failed: {e}") from e
+        return decode([_AGGREGATE3_OUTPUT], bytes.fromhex(raw[2:]))[0]
@@ -0,0 +1,218 @@
+"""
+Prompt Templates
+Precompiled AI prompt templates with stable, canonical serialization of context data
+"""
+import inspect
+import json
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+def _json_default(value: Any) -> Any:
+    """Serialize values the json module does not handle natively"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+def canonical_json(value: Any) -> str:
+    """
+    Compact JSON with sorted keys, so identical context always yields identical prompt text.
+    Stable text lets provider prompt caches and the request coalescer match repeated calls.
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_json_default)
+
+def compact_prompt(text: str) -> str:
+    """Strip the source-code indentation carried by triple-quoted prompts"""
+    return inspect.cleandoc(text)
+
+class PromptTemplate:
+    """
+    Prompt template parsed once into literal and field segments.
+    Rendering only looks up and serializes the fields: strings and numbers are inserted
+    as-is, lists and dicts as canonical JSON.
+    """
+
+    def __init__(self, template: str, defaults: Optional[Dict[str, Any]] = None):
+        self.template = compact_prompt(template)
+        self.defaults = defaults or {}
+
+        self._segments: List[Tuple[str, Optional[str]]] = []
+        for literal, field_name, _, _ in Formatter().parse(self.template):
+            self._segments.append((literal, field_name or None))
+
+        self.fields = [field_name for _, field_name in self._segments if field_name]
+
+    def render(self, context: Dict[str, Any]) -> str:
+        """Fill the template from a context dict, using defaults for missing fields"""
+        parts = []
+        for literal, field_name in self._segments:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(self._serialize(context.get(field_name, self.defaults.get(field_name, "N/A"))))
+        return "".join(parts)
+
+    @staticmethod
+    def _serialize(value: Any) -> str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, bool) or value is None:
+            return json.dumps(value)
+        if isinstance(value, (int, float)):
+            return str(value)
+        return canonical_json(value)
+
+# User prompts for autonomous operations, keyed by operation type
+OPERATION_PROMPT_TEMPLATES = {
+    "domain_approval": PromptTemplate(
+        """Domain Registration Request:
+        - Domain Name: {domain_name}
+        - TLD: {tld}
+        - Registrant: {registrant_address}
+        - Content Type: {content_type}
+        - Additional Info: {additional_info}
+
+        Please evaluate this domain registration request.""",
+        defaults={
+            "domain_name": "N/A",
+            "tld": "N/A",
+            "registrant_address": "N/A",
+            "content_type": "N/A",
+            "additional_info": "N/A"
+        }
+    ),
+    "fee_adjustment": PromptTemplate(
+        """Current Platform Metrics:
+        - Daily Registrations: {daily_registrations}
+        - Current Fee: {current_fee} ETH
+        - Platform Utilization: {utilization_rate}%
+        - Competitor Average Fee: {competitor_avg_fee} ETH
+        - Revenue Trend: {revenue_trend}
+
+        Recommend fee adjustments based on these metrics.""",
+        defaults={
+            "daily_registrations": 0,
+            "current_fee": 0,
+            "utilization_rate": 0,
+            "competitor_avg_fee": 0,
+            "revenue_trend": "stable"
+        }
+    ),
+    "governance_proposal": PromptTemplate(
+        """Platform Status:
+        - Active Domains: {active_domains}
+        - Staking Participation: {staking_participation}%
+        - User Feedback Summary: {user_feedback}
+        - Technical Issues: {technical_issues}
+        - Feature Requests: {feature_requests}
+
+        Generate a governance proposal to address platform needs.""",
+        defaults={
+            "active_domains": 0,
+            "staking_participation": 0,
+            "user_feedback": "N/A",
+            "technical_issues": [],
+            "feature_requests": []
+        }
+    ),
+    "market_analysis": PromptTemplate(
+        """Market Data:
+        - Platform Growth Rate: {growth_rate}%
+        - Market Share: {market_share}%
+        - Competitor Activities: {competitor_activities}
+        - Industry Trends: {industry_trends}
+        - User Demographics: {user_demographics}
+
+        Provide comprehensive market analysis and recommendations.""",
+        defaults={
+            "growth_rate": 0,
+            "market_share": 0,
+            "competitor_activities": [],
+            "industry_trends": [],
+            "user_demographics": {}
+        }
+    ),
+    "user_support": PromptTemplate(
+        """User Query: {user_query}
+        User Level: {user_level}
+        Previous Context: {previous_context}""",
+        defaults={
+            "user_query": "",
+            "user_level": "beginner",
+            "previous_context": "None"
+        }
+    ),
+    "anomaly_detection": PromptTemplate(
+        """Platform Activity Data:
+        - Recent Transactions: {recent_transactions}
+        - User Behavior Patterns: {user_patterns}
+        - System Metrics: {system_metrics}
+        - Error Rates: {error_rates}
+
+        Analyze for potential anomalies or security threats.""",
+        defaults={
+            "recent_transactions": [],
+            "user_patterns": {},
+            "system_metrics": {},
+            "error_rates": {}
+        }
+    )
+}
+
+CHAT_SYSTEM_PROMPT = compact_prompt(
+    """You are an AI assistant for the NXD Platform, a Web3 domain management system.
+    Help users with domain registration, staking, governance, and platform navigation.
+    Be helpful, informative, and guide users toward appropriate actions."""
+)
+
+DOMAIN_ANALYSIS_SYSTEM_PROMPT = compact_prompt(
+    """You are a domain valuation expert. Analyze the provided domain and give insights on:
+    - Market potential
+    - Brand value
+    - Investment opportunity
+    - Recommendations"""
+)
+
+DOMAIN_ANALYSIS_PROMPT = PromptTemplate(
+    """Analyze domain: {domain}
+    Data: {domain_data}
+    Analysis type: {analysis_type}"""
+)
+
+AUTONOMOUS_DECISION_SYSTEM_PROMPT = PromptTemplate(
+    """You are an autonomous AI system for the NXD Platform making a {decision_type} decision.
+    Consider the context carefully and make a reasoned decision with clear justification."""
+)
+
+AUTONOMOUS_DECISION_PROMPT = PromptTemplate(
+    """Decision type: {decision_type}
+    Context: {context}
+    Requires approval: {requires_approval}"""
+)
+
+DOMAIN_SUGGESTIONS_SYSTEM_PROMPT = compact_prompt(
+    """You are a creative domain name generator. Generate catchy, brandable domain names
+    that are memorable, easy to spell, and relevant to the prompt. Focus on Web3, tech, and modern naming conventions."""
+)
+
+PREDICTIONS_SYSTEM_PROMPT = compact_prompt(
+    """You are a data analyst specializing in Web3 and domain market predictions.
+    Analyze trends and provide realistic forecasts with confidence intervals."""
+)
+
+STRUCTURED_REPAIR_SYSTEM_PROMPT = compact_prompt(
+    """You fix malformed JSON produced by another model. Keep the original content and meaning,
+    change only what is needed to satisfy the schema, and do not add commentary."""
+)
+
+STRUCTURED_REPAIR_PROMPT = PromptTemplate(
+    """Validation errors:
+    {errors}
+
+    Output to fix:
+    {output}"""
+)
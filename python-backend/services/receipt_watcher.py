@@ -0,0 +1,250 @@
+"""
+Receipt Watcher
+Tracks pending transactions in one loop, polling receipts in batches once per new block
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import structlog
+
+logger = structlog.get_logger()
+
+STATUS_PENDING = "pending"
+STATUS_MINED = "mined"
+STATUS_CONFIRMED = "confirmed"
+STATUS_FAILED = "failed"
+STATUS_DROPPED = "dropped"
+
+FINAL_STATUSES = (STATUS_CONFIRMED, STATUS_FAILED, STATUS_DROPPED)
+
+Callback = Callable[["WatchedTransaction"], Awaitable[Any]]
+
+@dataclass
+class WatchedTransaction:
+    """A submitted transaction and how far it has progressed"""
+    tx_hash: str
+    network: str
+    confirmations_required: int
+    submitted_at: float = field(default_factory=time.monotonic)
+    status: str = STATUS_PENDING
+    block_number: Optional[int] = None
+    block_hash: Optional[str] = None
+    confirmations: int = 0
+    gas_used: Optional[int] = None
+    reverted: bool = False
+    callbacks: List[Callback] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tx_hash": self.tx_hash,
+            "network": self.network,
+            "status": self.status,
+            "block_number": self.block_number,
+            "confirmations": self.confirmations,
+            "confirmations_required": self.confirmations_required,
+            "gas_used": self.gas_used,
+            "reverted": self.reverted
+        }
+
+class ReceiptWatcher:
+    """
+    Follows every pending transaction from one background loop.
+
+    Receipts can only appear with a new block, so each network is polled only when
+    its head advances: all unmined hashes are requested at once and the RPC batcher
+    packs them into a few JSON-RPC batches. A mined transaction is confirmed once it
+    is `confirmations` blocks deep and its receipt is re-read from the same block
+    hash, so a reorged-out transaction goes back to pending. Transactions with no
+    receipt after `drop_after` seconds are reported as dropped.
+
+    On confirmation, failure or drop the registered callbacks run, and every status
+    change is pushed to the queues returned by `subscribe()`.
+    """
+
+    def __init__(
+        self,
+        blockchain_service,
+        confirmations: int = 2,
+        poll_interval: float = 2.0,
+        drop_after: float = 1800.0,
+        retain_finished: int = 10000
+    ):
+        self.blockchain = blockchain_service
+        self.confirmations = confirmations
+        self.poll_interval = poll_interval
+        self.drop_after = drop_after
+        self.retain_finished = retain_finished
+
+        self.pending: Dict[str, WatchedTransaction] = {}
+        self.finished: "OrderedDict[str, WatchedTransaction]" = OrderedDict()
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._last_heads: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def watch(
+        self,
+        tx_hash: str,
+        network: str = "ethereum",
+        confirmations: Optional[int] = None,
+        on_final: Optional[Callback] = None
+    ) -> WatchedTransaction:
+        """Start tracking `tx_hash`; `on_final` runs once it is confirmed, failed or dropped"""
+        tx_hash = tx_hash.lower()
+        watched = self.pending.get(tx_hash) or self.finished.get(tx_hash)
+        if watched is None:
+            watched = self.pending[tx_hash] = WatchedTransaction(
+                tx_hash=tx_hash,
+                network=network,
+                confirmations_required=self.confirmations if confirmations is None else confirmations
+            )
+            # Force a receipt poll on the next tick even without a new head
+            self._last_heads.pop(network, None)
+        if on_final is not None:
+            if watched.status in FINAL_STATUSES:
+                asyncio.ensure_future(self._run_callback(on_final, watched))
+            else:
+                watched.callbacks.append(on_final)
+        return watched
+
+    def get(self, tx_hash: str) -> Optional[WatchedTransaction]:
+        tx_hash = tx_hash.lower()
+        return self.pending.get(tx_hash) or self.finished.get(tx_hash)
+
+    def subscribe(self, tx_hash: str) -> asyncio.Queue:
+        """Queue receiving a status dict on every change of `tx_hash`"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(tx_hash.lower(), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, tx_hash: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(tx_hash.lower())
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[tx_hash.lower()]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": len(self.pending), "finished": len(self.finished)}
+
+    async def poll(self):
+        """One pass over every network with pending transactions"""
+        networks = {watched.network for watched in self.pending.values()}
+        await asyncio.gather(*[self._poll_network(network) for network in networks])
+
+    async def _poll_network(self, network: str):
+        try:
+            head = await self.blockchain.block_caches[network].block_number()
+        except Exception as e:
+            logger.warning("Receipt watcher head lookup failed", network=network, error=str(e))
+            return
+        if self._last_heads.get(network) == head:
+            return
+        self._last_heads[network] = head
+
+        watched = [tx for tx in self.pending.values() if tx.network == network]
+        unmined = [tx for tx in watched if tx.status == STATUS_PENDING]
+        # Deep enough to confirm, pending a re-read that proves the block is still canonical
+        due = [
+            tx for tx in watched
+            if tx.status == STATUS_MINED and head - tx.block_number + 1 >= tx.confirmations_required
+        ]
+
+        receipts = await asyncio.gather(
+            *[self.blockchain.rpc(network, "eth_getTransactionReceipt", tx.tx_hash) for tx in unmined + due],
+            return_exceptions=True
+        )
+        now = time.monotonic()
+
+        for tx, receipt in zip(unmined, receipts[:len(unmined)]):
+            if isinstance(receipt, Exception):
+                logger.warning("Receipt lookup failed", tx_hash=tx.tx_hash, error=str(receipt))
+            elif receipt is None:
+                if now - tx.submitted_at > self.drop_after:
+                    await self._finish(tx, STATUS_DROPPED)
+            else:
+                tx.status = STATUS_MINED
+                tx.block_number = int(receipt["blockNumber"], 16)
+                tx.block_hash = receipt["blockHash"]
+                tx.gas_used = int(receipt["gasUsed"], 16)
+                tx.reverted = receipt.get("status") == "0x0"
+                self._mark_mined_in_pipeline(tx)
+                # Just read, so still canonical; shallow requirements confirm immediately
+                if head - tx.block_number + 1 >= tx.confirmations_required:
+                    due.append(tx)
+                    receipts.append(receipt)
+
+        for tx, receipt in zip(due, receipts[len(unmined):]):
+            if isinstance(receipt, Exception):
+                logger.warning("Receipt lookup failed", tx_hash=tx.tx_hash, error=str(receipt))
+            elif receipt is None or receipt["blockHash"] != tx.block_hash:
+                logger.warning("Transaction reorged out, waiting for it again", tx_hash=tx.tx_hash)
+                tx.status, tx.block_number, tx.block_hash, tx.confirmations = STATUS_PENDING, None, None, 0
+                # The drop timeout restarts, or an old transaction would be dropped on the next tick
+                tx.submitted_at = time.monotonic()
+                self._publish(tx)
+            else:
+                tx.confirmations = head - tx.block_number + 1
+                await self._finish(tx, STATUS_FAILED if tx.reverted else STATUS_CONFIRMED)
+
+        for tx in watched:
+            if tx.status == STATUS_MINED and tx.confirmations != head - tx.block_number + 1:
+                tx.confirmations = head - tx.block_number + 1
+                self._publish(tx)
+
+    async def _finish(self, tx: WatchedTransaction, status: str):
+        tx.status = status
+        self.pending.pop(tx.tx_hash, None)
+        self.finished[tx.tx_hash] = tx
+        while len(self.finished) > self.retain_finished:
+            self.finished.popitem(last=False)
+        self._publish(tx)
+        logger.info("Transaction final", tx_hash=tx.tx_hash, network=tx.network, status=status)
+
+        callbacks, tx.callbacks = tx.callbacks, []
+        for callback in callbacks:
+            await self._run_callback(callback, tx)
+
+    async def _run_callback(self, callback: Callback, tx: WatchedTransaction):
+        try:
+            await callback(tx)
+        except Exception as e:
+            logger.error("Transaction callback failed", tx_hash=tx.tx_hash, error=str(e))
+
+    def _publish(self, tx: WatchedTransaction):
+        for queue in self._subscribers.get(tx.tx_hash, ()):
+            queue.put_nowait(tx.to_dict())
+
+    def _mark_mined_in_pipeline(self, tx: WatchedTransaction):
+        pipeline = self.blockchain.tx_pipelines.get(tx.network)
+        if pipeline is None:
+            return
+        for nonce, sent in list(pipeline.sent.items()):
+            if sent.tx_hash.lower() == tx.tx_hash:
+                pipeline.mark_mined(nonce)
+                break
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Receipt watcher pass failed", error=str(e))
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,85 @@
+"""
+Request Coalescer
+Single-flight deduplication so identical concurrent calls share one in-flight result
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+class RequestCoalescer:
+    """
+    Runs at most one call per key at a time; concurrent callers with the same key
+    await the shared result. Successful results stay shareable for `window_seconds`
+    after completion so near-simultaneous arrivals also reuse them.
+    """
+
+    def __init__(self, window_seconds: float = 0.0, max_entries: int = 1024):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}
+        self.coalesced_count = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `call` for `key`, or join the identical call already in flight"""
+        cached = self._recent.get(key)
+        if cached is not None:
+            completed_at, result = cached
+            if time.monotonic() - completed_at <= self.window_seconds:
+                self.coalesced_count += 1
+                return result
+            del self._recent[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            # The shared call runs as its own task so one caller disconnecting
+            # does not cancel the work the other callers are waiting on
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._on_done(key, done))
+        else:
+            self.coalesced_count += 1
+
+        return await asyncio.shield(task)
+
+    def is_shared(self, key: Hashable) -> bool:
+        """Whether a call for `key` would join an in-flight call or reuse a recent result"""
+        if key in self._in_flight:
+            return True
+        cached = self._recent.get(key)
+        return cached is not None and time.monotonic() - cached[0] <= self.window_seconds
+
+    @property
+    def in_flight_count(self) -> int:
+        """Number of distinct calls currently in flight"""
+        return len(self._in_flight)
+
+    def _on_done(self, key: Hashable, task: asyncio.Future):
+        """Release the in-flight slot and remember successful results for the window"""
+        self._in_flight.pop(key, None)
+
+        # Retrieving the exception keeps asyncio from warning when every waiter is gone
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        if self.window_seconds <= 0:
+            return
+
+        if len(self._recent) >= self.max_entries:
+            self._evict_expired()
+        if len(self._recent) >= self.max_entries:
+            # Dicts keep insertion order, so the first key is the oldest result
+            self._recent.pop(next(iter(self._recent)))
+
+        self._recent[key] = (time.monotonic(), task.result())
+
+    def _evict_expired(self):
+        """Drop remembered results older than the window"""
+        cutoff = time.monotonic() - self.window_seconds
+        expired = [key for key, (completed_at, _) in self._recent.items() if completed_at < cutoff]
+        for key in expired:
+            del self._recent[key]
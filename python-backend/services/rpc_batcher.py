@@ -0,0 +1,91 @@
+"""
+RPC Batcher
+Coalesces concurrent JSON-RPC reads into one batch HTTP request per network
+"""
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple, Union
+
+import structlog
+from web3.providers.rpc import AsyncHTTPProvider
+
+from services.micro_batcher import MicroBatcher
+
+if TYPE_CHECKING:
+    from services.rpc_pool import RpcEndpointPool
+
+logger = structlog.get_logger()
+
+class JsonRpcError(Exception):
+    """Error object returned by the node for one request in a batch"""
+
+    def __init__(self, method: str, error: Dict[str, Any]):
+        self.method = method
+        self.code = error.get("code")
+        self.data = error.get("data")
+        super().__init__(f"{method} failed: {error.get('message', 'unknown error')} (code {self.code})")
+
+class JsonRpcBatcher:
+    """
+    Buffers `request()` calls for up to `max_wait_ms` and sends them as a single JSON-RPC
+    batch through `provider`, a web3 HTTP provider or an RpcEndpointPool. Identical calls in the same window share
+    one batch entry. Results are raw JSON-RPC values, hex quantities are not decoded.
+    """
+
+    def __init__(
+        self,
+        provider: Union[AsyncHTTPProvider, "RpcEndpointPool"],
+        network: str,
+        max_batch_size: int = 100,
+        max_wait_ms: float = 5.0
+    ):
+        self.provider = provider
+        self.network = network
+        self.batch_count = 0
+        self.request_count = 0
+        self._batcher = MicroBatcher(
+            self._run_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name=f"rpc_{network}"
+        )
+
+    async def request(self, method: str, params: Sequence[Any] = ()) -> Any:
+        """Send `method` in the next batch and return its raw result"""
+        return await self._batcher.submit((method, list(params)))
+
+    async def _run_batch(self, calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        unique: Dict[str, int] = {}
+        requests: List[Tuple[str, List[Any]]] = []
+        slots = []
+        for method, params in calls:
+            key = f"{method}:{json.dumps(params, sort_keys=True, default=str)}"
+            if key not in unique:
+                unique[key] = len(requests)
+                requests.append((method, params))
+            slots.append(unique[key])
+
+        self.batch_count += 1
+        self.request_count += len(requests)
+
+        responses = await self.provider.make_batch_request(requests)
+        if not isinstance(responses, list):
+            # Nodes answer a rejected batch with a single error object
+            raise JsonRpcError("batch", responses.get("error") or {"message": "malformed batch response"})
+        if len(responses) != len(requests):
+            raise ValueError(f"Node returned {len(responses)} responses for {len(requests)} requests")
+
+        logger.debug(
+            "RPC batch sent",
+            network=self.network,
+            calls=len(calls),
+            requests=len(requests)
+        )
+        results = []
+        for slot in slots:
+            (method, _), response = requests[slot], responses[slot]
+            if response.get("error") is not None:
+                # Deduplicated callers each get their own error instance
+                results.append(JsonRpcError(method, response["error"]))
+            else:
+                results.append(response.get("result"))
+        return results
@@ -0,0 +1,224 @@
+"""
+RPC Endpoint Pool
+Latency-aware load balancing and failover across several JSON-RPC providers of one network
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+import structlog
+from web3.providers.rpc import AsyncHTTPProvider
+
+logger = structlog.get_logger()
+
+# Weight of the newest sample in the latency moving average
+_LATENCY_ALPHA = 0.2
+
+class EndpointUnavailable(Exception):
+    """Every endpoint of the network failed or is cooling down"""
+
+class RpcEndpoint:
+    """One provider URL with its latency, health, head and request budget"""
+
+    def __init__(self, url: str, provider: AsyncHTTPProvider, rate_limit: float = 0.0):
+        self.url = url
+        self.provider = provider
+        self.rate_limit = rate_limit  # JSON-RPC requests per second, 0 for unlimited
+
+        self.latency = 0.1
+        self.head: Optional[int] = None
+        self.in_flight = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+        self._tokens = rate_limit
+        self._refilled_at = time.monotonic()
+
+    @property
+    def name(self) -> str:
+        # Provider URLs often embed API keys; log only the host
+        return self.url.split("/")[2] if "://" in self.url else self.url
+
+    def score(self) -> float:
+        """Expected wait for a new request; lower is better"""
+        return self.latency * (1 + self.in_flight)
+
+    def ready_in(self, cost: int) -> float:
+        """Seconds until the rate limit admits `cost` more requests"""
+        if not self.rate_limit:
+            return 0.0
+        self._refill()
+        missing = min(cost, self.rate_limit) - self._tokens
+        return max(0.0, missing / self.rate_limit)
+
+    def consume(self, cost: int):
+        if self.rate_limit:
+            self._refill()
+            self._tokens -= cost
+
+    def record_success(self, elapsed: float):
+        self.latency += _LATENCY_ALPHA * (elapsed - self.latency)
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    def record_failure(self, rate_limited: bool = False):
+        self.failures += 1
+        # Exponential backoff, capped at a minute; a 429 always waits at least a few seconds
+        backoff = min(60.0, 0.5 * 2 ** (self.failures - 1))
+        if rate_limited:
+            backoff = max(backoff, 5.0)
+        self.cooldown_until = time.monotonic() + backoff
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+
+class RpcEndpointPool:
+    """
+    Sends JSON-RPC batches for one network to the best of several endpoints.
+
+    The endpoint with the lowest latency-weighted load is chosen among those that are
+    healthy, within their rate limit and no more than `max_head_lag` blocks behind the
+    highest head seen. A transport failure, HTTP error or rejected batch puts the
+    endpoint in a backoff and the batch is retried on the next one; errors for single
+    requests inside a successful batch are returned, not retried.
+
+    A probe task polls eth_blockNumber on every endpoint each `probe_interval` seconds
+    to track heads and bring cooled-down endpoints back. Exposes `make_batch_request`
+    like a provider, so JsonRpcBatcher can send through it.
+    """
+
+    def __init__(
+        self,
+        network: str,
+        endpoints: List[RpcEndpoint],
+        max_head_lag: int = 3,
+        probe_interval: float = 10.0
+    ):
+        if not endpoints:
+            raise ValueError(f"No RPC endpoints configured for {network}")
+        self.network = network
+        self.endpoints = endpoints
+        self.max_head_lag = max_head_lag
+        self.probe_interval = probe_interval
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    @property
+    def best_head(self) -> Optional[int]:
+        heads = [endpoint.head for endpoint in self.endpoints if endpoint.head is not None]
+        return max(heads) if heads else None
+
+    def candidates(self) -> List[RpcEndpoint]:
+        """Endpoints eligible for reads, best first"""
+        now = time.monotonic()
+        best_head = self.best_head
+        eligible = [
+            endpoint for endpoint in self.endpoints
+            if endpoint.cooldown_until <= now
+            and (best_head is None or endpoint.head is None or best_head - endpoint.head <= self.max_head_lag)
+        ]
+        return sorted(eligible, key=RpcEndpoint.score)
+
+    async def make_batch_request(self, requests: List[Tuple[str, Any]]) -> Any:
+        cost = len(requests)
+        tried = set()
+        last_error: Optional[Exception] = None
+
+        while True:
+            remaining = [endpoint for endpoint in self.candidates() if endpoint.url not in tried]
+            if not remaining and not tried:
+                # Everything is cooling down or lagging; the soonest to recover beats failing outright
+                remaining = [min(self.endpoints, key=lambda candidate: candidate.cooldown_until)]
+            if not remaining:
+                break
+            # Prefer an endpoint with budget now; otherwise wait for the soonest one
+            endpoint = min(remaining, key=lambda candidate: (candidate.ready_in(cost) > 0, candidate.ready_in(cost)))
+            delay = endpoint.ready_in(cost)
+            if delay:
+                await asyncio.sleep(delay)
+            tried.add(endpoint.url)
+
+            endpoint.consume(cost)
+            endpoint.in_flight += 1
+            started = time.monotonic()
+            try:
+                response = await endpoint.provider.make_batch_request(requests)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                rate_limited = isinstance(e, aiohttp.ClientResponseError) and e.status == 429
+                endpoint.record_failure(rate_limited)
+                last_error = e
+                logger.warning(
+                    "RPC endpoint failed, trying next",
+                    network=self.network,
+                    endpoint=endpoint.name,
+                    rate_limited=rate_limited,
+                    error=str(e)
+                )
+                continue
+            finally:
+                endpoint.in_flight -= 1
+
+            if not isinstance(response, list) and len(self.endpoints) > len(tried):
+                # The whole batch was refused (often a provider limit); another node may accept it
+                endpoint.record_failure()
+                last_error = Exception(str(response.get("error")))
+                continue
+
+            endpoint.record_success(time.monotonic() - started)
+            return response
+
+        raise EndpointUnavailable(
+            f"No healthy RPC endpoint for {self.network}"
+            + (f": {last_error}" if last_error else "")
+        )
+
+    async def probe(self):
+        """Refresh every endpoint's head and latency"""
+        await asyncio.gather(*[self._probe_endpoint(endpoint) for endpoint in self.endpoints])
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "endpoint": endpoint.name,
+                "head": endpoint.head,
+                "latency_ms": round(endpoint.latency * 1000, 1),
+                "healthy": endpoint.cooldown_until <= now,
+                "in_flight": endpoint.in_flight
+            }
+            for endpoint in self.endpoints
+        ]
+
+    async def _probe_endpoint(self, endpoint: RpcEndpoint):
+        started = time.monotonic()
+        try:
+            response = await endpoint.provider.make_request("eth_blockNumber", [])
+            endpoint.head = int(response["result"], 16)
+            endpoint.record_success(time.monotonic() - started)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            endpoint.record_failure(isinstance(e, aiohttp.ClientResponseError) and e.status == 429)
+            logger.warning("RPC endpoint probe failed", network=self.network, endpoint=endpoint.name, error=str(e))
+
+    async def _probe_loop(self):
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.probe_interval)
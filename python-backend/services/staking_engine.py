@@ -0,0 +1,170 @@
+"""
+Staking Engine
+Vectorized NXD staking reward math, mirroring NXDToken.calculateRewards
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+SECONDS_PER_DAY = 24 * 60 * 60
+SECONDS_PER_YEAR = 365 * SECONDS_PER_DAY
+BASIS_POINTS = 10000
+
+# NXDToken._initializeStakingTiers: (minimum stake in wei, lock period in seconds, reward multiplier in bps)
+STAKING_TIERS = (
+    (10_000 * 10**18, 30 * SECONDS_PER_DAY, 10000),
+    (100_000 * 10**18, 90 * SECONDS_PER_DAY, 15000),
+    (1_000_000 * 10**18, 365 * SECONDS_PER_DAY, 20000),
+)
+
+DEFAULT_HORIZONS_DAYS = (30, 90, 365)
+
+_LOCK_PERIODS = np.array([tier[1] for tier in STAKING_TIERS], dtype=np.int64)
+_MULTIPLIERS = np.array([tier[2] for tier in STAKING_TIERS], dtype=np.int64)
+
+def base_apy_bps(total_staked: int, total_supply: int) -> int:
+    """Pool-wide base APY: 20% below 20% staked, 10% below 50%, 5% above"""
+    if total_staked <= 0 or total_supply <= 0:
+        return 1000
+    staked_percentage = total_staked * 100 // total_supply
+    return 2000 if staked_percentage < 20 else 1000 if staked_percentage < 50 else 500
+
+def _wei_array(values: Sequence[Any]) -> np.ndarray:
+    # uint256 amounts overflow int64, so wei columns hold Python ints and stay exact
+    array = np.empty(len(values), dtype=object)
+    array[:] = [int(value) for value in values]
+    return array
+
+@dataclass
+class StakePositions:
+    """Column arrays of staking positions; wei columns are exact integer object arrays"""
+    owners: np.ndarray          # str
+    amounts: np.ndarray         # wei, object
+    tiers: np.ndarray           # int64
+    start_times: np.ndarray     # unix seconds, int64
+    last_claims: np.ndarray     # unix seconds, int64
+    pending_rewards: np.ndarray # wei carried over from earlier stakes, object
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "StakePositions":
+        """Rows with owner, amount, tier, start_time and optional last_claim and pending_rewards"""
+        return cls(
+            owners=np.array([row["owner"].lower() for row in rows], dtype=object),
+            amounts=_wei_array([row["amount"] for row in rows]),
+            tiers=np.array([row["tier"] for row in rows], dtype=np.int64),
+            start_times=np.array([row["start_time"] for row in rows], dtype=np.int64),
+            last_claims=np.array([row.get("last_claim", row["start_time"]) for row in rows], dtype=np.int64),
+            pending_rewards=_wei_array([row.get("pending_rewards", 0) for row in rows])
+        )
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+class StakingEngine:
+    """
+    Computes rewards for every position in one pass over column arrays.
+
+    Wei quantities use the contract's integer formula with floor division, so accrued
+    rewards match calculateRewards to the wei; ratios shown to users (APY, pool
+    utilization) are float64.
+    """
+
+    def __init__(self, positions: StakePositions, total_supply: int, total_staked: int):
+        self.positions = positions
+        self.total_supply = int(total_supply)
+        # The pool's totalStaked, not the sum of `positions`, which may be one user's stakes
+        self.total_staked = int(total_staked)
+        self.base_apy_bps = base_apy_bps(self.total_staked, self.total_supply)
+
+        # Per-position annual reward in wei, shared by accrual and projections
+        multipliers = _MULTIPLIERS[positions.tiers]
+        self.apy_bps = self.base_apy_bps * multipliers // BASIS_POINTS
+        self.annual_rewards = positions.amounts * (self.base_apy_bps * multipliers).astype(object) // (BASIS_POINTS * BASIS_POINTS)
+
+    def unlock_times(self) -> np.ndarray:
+        return self.positions.start_times + _LOCK_PERIODS[self.positions.tiers]
+
+    def accrued(self, now: int, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Claimable rewards in wei per position (or per masked position) at `now`"""
+        mask = slice(None) if mask is None else mask
+        elapsed = np.maximum(now - self.positions.last_claims[mask], 0).astype(object)
+        return self.annual_rewards[mask] * elapsed // SECONDS_PER_YEAR + self.positions.pending_rewards[mask]
+
+    def projected(
+        self,
+        now: int,
+        horizons_days: Sequence[int] = DEFAULT_HORIZONS_DAYS,
+        mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """(positions x horizons) claimable rewards in wei if left unclaimed for each horizon"""
+        mask = slice(None) if mask is None else mask
+        elapsed = (
+            np.maximum(now - self.positions.last_claims[mask], 0)[:, None]
+            + np.asarray(horizons_days, dtype=np.int64)[None, :] * SECONDS_PER_DAY
+        )
+        annual = self.annual_rewards[mask][:, None]
+        return annual * elapsed.astype(object) // SECONDS_PER_YEAR + self.positions.pending_rewards[mask][:, None]
+
+    def pool_stats(self, now: int) -> Dict[str, Any]:
+        positions = self.positions
+        count = len(positions)
+        unlock_times = self.unlock_times()
+        tiers = []
+        for tier_id, (min_amount, lock_period, multiplier) in enumerate(STAKING_TIERS):
+            mask = positions.tiers == tier_id
+            tiers.append({
+                "tier": tier_id,
+                "min_amount": str(min_amount),
+                "lock_days": lock_period // SECONDS_PER_DAY,
+                "apy": f"{self.base_apy_bps * multiplier / BASIS_POINTS / 100:.1f}",
+                "positions": int(mask.sum()),
+                "total_staked": str(int(positions.amounts[mask].sum()) if mask.any() else 0)
+            })
+
+        amounts_float = positions.amounts.astype(np.float64)
+        return {
+            "total_staked": str(self.total_staked),
+            "total_stakers": int(np.unique(positions.owners).size) if count else 0,
+            "base_apy": f"{self.base_apy_bps / 100:.1f}",
+            # Stake-weighted average of each position's APY
+            "average_apy": f"{float(np.average(self.apy_bps, weights=amounts_float)) / 100:.2f}" if amounts_float.sum() > 0 else f"{self.base_apy_bps / 100:.2f}",
+            "pool_utilization": self.total_staked / self.total_supply if self.total_supply else 0.0,
+            "pending_rewards": str(int(self.accrued(now).sum()) if count else 0),
+            "annual_emission": str(int(self.annual_rewards.sum()) if count else 0),
+            "average_stake_days": float(np.mean(now - positions.start_times) / SECONDS_PER_DAY) if count else 0.0,
+            "locked_positions": int((unlock_times > now).sum()),
+            "tiers": tiers
+        }
+
+    def user_dashboard(self, owner: str, now: int, horizons_days: Sequence[int] = DEFAULT_HORIZONS_DAYS) -> Dict[str, Any]:
+        mask = self.positions.owners == owner.lower()
+        indices = np.flatnonzero(mask)
+        accrued = self.accrued(now, mask)
+        projected = self.projected(now, horizons_days, mask)
+        unlock_times = self.unlock_times()[mask]
+
+        positions = []
+        for row, index in enumerate(indices):
+            tier = int(self.positions.tiers[index])
+            positions.append({
+                "id": int(index),
+                "amount": str(self.positions.amounts[index]),
+                "tier": tier,
+                "start_time": int(self.positions.start_times[index]),
+                "last_claim": int(self.positions.last_claims[index]),
+                "duration": STAKING_TIERS[tier][1] // SECONDS_PER_DAY,
+                "unlock_time": int(unlock_times[row]),
+                "locked": bool(unlock_times[row] > now),
+                "apy": f"{int(self.apy_bps[index]) / 100:.1f}",
+                "pending_rewards": str(accrued[row]),
+                "projected_rewards": {
+                    f"{days}d": str(projected[row, column]) for column, days in enumerate(horizons_days)
+                }
+            })
+
+        return {
+            "total_staked": str(int(self.positions.amounts[mask].sum()) if len(indices) else 0),
+            "rewards_earned": str(int(accrued.sum()) if len(indices) else 0),
+            "staking_positions": positions
+        }
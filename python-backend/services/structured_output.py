@@ -0,0 +1,130 @@
+"""
+Structured AI Output
+Pydantic schemas for AI responses, incremental parsing of streamed JSON, and validation helpers
+"""
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, Field
+
+from services.prompt_templates import canonical_json
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Precedes the JSON schema appended to system prompts for structured calls
+SCHEMA_MARKER = "Respond with only a JSON object that matches this JSON schema:"
+
+class StructuredOutputError(Exception):
+    """Raised when an AI response cannot be coerced into the requested schema"""
+
+class AutonomousDecisionOutput(BaseModel):
+    """Autonomous platform decision"""
+    action: str = Field(description="The concrete action to take, in one sentence")
+    reasoning: str = Field(description="Justification for the action")
+    confidence: float = Field(ge=0, le=1, description="Confidence in the decision from 0 to 1")
+
+class DomainAnalysisOutput(BaseModel):
+    """Domain valuation analysis"""
+    analysis: str = Field(description="Summary of the domain's market potential, brand value and investment opportunity")
+    market_insights: List[str] = Field(description="Short market observations")
+    recommendations: List[str] = Field(description="Short actionable recommendations")
+    confidence: float = Field(ge=0, le=1, description="Confidence in the analysis from 0 to 1")
+
+class DomainSuggestionsOutput(BaseModel):
+    """Generated domain name ideas"""
+    suggestions: List[str] = Field(description="Domain names without a TLD, lowercase letters, digits and hyphens only")
+
+@lru_cache(maxsize=None)
+def schema_instructions(schema: Type[BaseModel]) -> str:
+    """System prompt suffix describing the expected JSON shape"""
+    return f"{SCHEMA_MARKER}\n{canonical_json(schema.model_json_schema())}"
+
+def extract_json_object(text: str) -> str:
+    """Cut the outermost JSON object out of a response that may carry prose or code fences"""
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end < start:
+        raise StructuredOutputError("Response contains no JSON object")
+    return text[start:end + 1]
+
+def parse_structured(text: str, schema: Type[ModelT]) -> ModelT:
+    """Validate a response against a schema, parsing the JSON straight into the model"""
+    return schema.model_validate_json(extract_json_object(text))
+
+class IncrementalJSONParser:
+    """
+    Parser for a JSON object that arrives in chunks.
+    Each top-level field is decoded as soon as its value is complete, so callers can act on
+    early fields while the rest of the completion is still streaming. Text before the
+    opening brace (prose, code fences) is ignored.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+
+        self._buffer = ""
+        self._position = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the fields it completed, in order"""
+        if self.complete or not chunk:
+            return []
+
+        self._buffer += chunk
+        completed: List[Tuple[str, Any]] = []
+
+        while self._position < len(self._buffer) and not self.complete:
+            char = self._buffer[self._position]
+            index = self._position
+            self._position += 1
+
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._member_start = self._position
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._close_member(index))
+                    self.complete = True
+            elif char == "," and self._depth == 1:
+                completed.extend(self._close_member(index))
+                self._member_start = self._position
+
+        return completed
+
+    def _close_member(self, end: int) -> List[Tuple[str, Any]]:
+        """Decode the `"key": value` member ending just before `end`"""
+        member = self._buffer[self._member_start:end].strip()
+        if not member:
+            return []
+        try:
+            decoded = json.loads("{" + member + "}")
+        except ValueError:
+            # Leave malformed members to final validation and the repair call
+            return []
+        self.fields.update(decoded)
+        return list(decoded.items())
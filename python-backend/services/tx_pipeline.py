@@ -0,0 +1,234 @@
+"""
+Transaction Pipeline
+Local nonce allocation and concurrent signing and broadcasting for one sending account
+"""
+import asyncio
+import heapq
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import structlog
+from eth_account.signers.local import LocalAccount
+
+from services.rpc_batcher import JsonRpcError
+
+logger = structlog.get_logger()
+
+# Nodes reject a same-nonce replacement unless every fee rises by at least 10%
+MIN_REPLACEMENT_BUMP = 1.1
+
+_NONCE_TOO_LOW = ("nonce too low", "nonce is too low", "oldnonce")
+_ALREADY_KNOWN = ("already known", "known transaction", "alreadyknown")
+_NONCE_TAKEN = ("replacement transaction underpriced", "replacement fee too low")
+
+class TransactionError(Exception):
+    """A transaction the node refused; the nonce has been handed back"""
+
+class NonceManager:
+    """
+    Allocates nonces for one account locally under a lock, so concurrent sends never
+    collide and no per-transaction eth_getTransactionCount is needed.
+
+    Nonces of transactions that never reached the node are released and handed out
+    again before new ones, so a failed send does not leave a gap that stalls every
+    later transaction. `resync()` realigns with the node's pending count and releases
+    every nonce from it on that is neither in flight nor, per `is_sent`, accepted by
+    the node, so an ambiguous failure below a later send is filled again too.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        fetch_pending_nonce: Callable[[], Awaitable[int]],
+        is_sent: Callable[[int], bool] = lambda nonce: False
+    ):
+        self.address = address
+        self.fetch_pending_nonce = fetch_pending_nonce
+        self.is_sent = is_sent
+        self.next_nonce: Optional[int] = None
+        self.in_flight: Set[int] = set()
+        self._released: List[int] = []
+        self._lock = asyncio.Lock()
+        self._needs_resync = False
+
+    async def allocate(self) -> int:
+        async with self._lock:
+            if self.next_nonce is None or self._needs_resync:
+                await self._resync_locked()
+
+            if self._released:
+                nonce = heapq.heappop(self._released)
+            else:
+                nonce = self.next_nonce
+                self.next_nonce += 1
+            self.in_flight.add(nonce)
+            return nonce
+
+    def confirm(self, nonce: int):
+        """The node accepted the transaction carrying `nonce`"""
+        self.in_flight.discard(nonce)
+
+    def release(self, nonce: int):
+        """The transaction never reached the node; reuse `nonce` for the next send"""
+        if nonce in self.in_flight:
+            self.in_flight.discard(nonce)
+            heapq.heappush(self._released, nonce)
+
+    def mark_uncertain(self, nonce: int):
+        """The send failed ambiguously; the node's pending count decides on the next allocation"""
+        self.in_flight.discard(nonce)
+        self._needs_resync = True
+
+    async def resync(self):
+        async with self._lock:
+            await self._resync_locked()
+
+    async def _resync_locked(self):
+        pending = await self.fetch_pending_nonce()
+        # Nonces still being signed or sent locally are not yet visible to the node
+        local = max(self.in_flight) + 1 if self.in_flight else 0
+        released = {nonce for nonce in self._released if nonce >= pending}
+        if self.next_nonce is not None:
+            # Handed out, yet neither pending locally nor known to the node: a gap to fill
+            released.update(
+                nonce for nonce in range(pending, self.next_nonce)
+                if nonce not in self.in_flight and not self.is_sent(nonce)
+            )
+        self.next_nonce = max(pending, local)
+        self._released = sorted(nonce for nonce in released if nonce < self.next_nonce)
+        self._needs_resync = False
+        logger.debug("Nonce resynchronised", address=self.address, next_nonce=self.next_nonce)
+
+@dataclass
+class SentTransaction:
+    """A broadcast transaction kept for replacement until it is mined"""
+    tx_hash: str
+    nonce: int
+    tx: Dict[str, Any]
+    replacements: int = field(default=0)
+
+class TransactionPipeline:
+    """
+    Fills nonce, chain id and fees, signs and broadcasts transactions from one account,
+    with up to `max_concurrency` in flight at once.
+
+    `rpc(method, *params)` is the network's JSON-RPC callable; `fee_fields()` returns
+    the fee keys to merge into transactions that do not set their own.
+    """
+
+    def __init__(
+        self,
+        account: LocalAccount,
+        network: str,
+        rpc: Callable[..., Awaitable[Any]],
+        fee_fields: Callable[[], Awaitable[Dict[str, int]]],
+        max_concurrency: int = 16,
+        max_attempts: int = 3
+    ):
+        self.account = account
+        self.network = network
+        self.rpc = rpc
+        self.fee_fields = fee_fields
+        self.max_attempts = max_attempts
+        self.nonces = NonceManager(
+            account.address,
+            lambda: self._quantity("eth_getTransactionCount", account.address, "pending"),
+            lambda nonce: nonce in self.sent
+        )
+        self.sent: Dict[int, SentTransaction] = {}
+        self._chain_id: Optional[int] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def send(self, tx: Dict[str, Any]) -> str:
+        """Sign and broadcast `tx`; returns the transaction hash"""
+        async with self._semaphore:
+            tx = dict(tx)
+            tx.setdefault("from", self.account.address)
+            if "chainId" not in tx:
+                tx["chainId"] = await self._get_chain_id()
+            if "gasPrice" not in tx and "maxFeePerGas" not in tx:
+                tx.update(await self.fee_fields())
+
+            for attempt in range(1, self.max_attempts + 1):
+                nonce = await self.nonces.allocate()
+                try:
+                    tx_hash = await self._broadcast({**tx, "nonce": nonce})
+                except TransactionError as e:
+                    message = str(e).lower()
+                    if any(marker in message for marker in _NONCE_TOO_LOW + _NONCE_TAKEN):
+                        # Another sender used this nonce; realign and try the next one
+                        self.nonces.in_flight.discard(nonce)
+                        await self.nonces.resync()
+                        if attempt < self.max_attempts:
+                            continue
+                    else:
+                        self.nonces.release(nonce)
+                    raise
+                except Exception:
+                    self.nonces.mark_uncertain(nonce)
+                    raise
+
+                self.nonces.confirm(nonce)
+                self.sent[nonce] = SentTransaction(tx_hash=tx_hash, nonce=nonce, tx={**tx, "nonce": nonce})
+                return tx_hash
+
+            raise TransactionError("Nonce allocation kept colliding with another sender")
+
+    async def send_many(self, txs: List[Dict[str, Any]]) -> List[Any]:
+        """Send concurrently; each entry is a hash or the exception that send raised"""
+        return await asyncio.gather(*[self.send(tx) for tx in txs], return_exceptions=True)
+
+    async def replace(self, nonce: int, bump: float = 1.125, **changes: Any) -> str:
+        """Re-broadcast the pending transaction at `nonce` with fees raised by `bump`"""
+        if bump < MIN_REPLACEMENT_BUMP:
+            raise ValueError(f"Replacement fees must rise by at least {MIN_REPLACEMENT_BUMP - 1:.0%}")
+        previous = self.sent.get(nonce)
+        if previous is None:
+            raise KeyError(f"No pending transaction with nonce {nonce}")
+
+        tx = {**previous.tx, **changes}
+        for key in ("gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"):
+            if key in previous.tx:
+                tx[key] = max(tx.get(key, 0), int(previous.tx[key] * bump) + 1)
+
+        async with self._semaphore:
+            tx_hash = await self._broadcast(tx)
+        self.sent[nonce] = SentTransaction(
+            tx_hash=tx_hash, nonce=nonce, tx=tx, replacements=previous.replacements + 1
+        )
+        logger.info("Transaction replaced", network=self.network, nonce=nonce, tx_hash=tx_hash)
+        return tx_hash
+
+    async def cancel(self, nonce: int, bump: float = 1.125) -> str:
+        """Replace the pending transaction at `nonce` with an empty transfer to self"""
+        return await self.replace(
+            nonce, bump, to=self.account.address, value=0, data=b"", gas=21000
+        )
+
+    def mark_mined(self, nonce: int):
+        """Stop tracking a transaction once a receipt for its nonce exists"""
+        self.sent.pop(nonce, None)
+
+    async def _broadcast(self, tx: Dict[str, Any]) -> str:
+        signable = {key: value for key, value in tx.items() if key != "from"}
+        signed = self.account.sign_transaction(signable)
+        tx_hash = "0x" + signed.hash.hex().removeprefix("0x")
+        try:
+            await self.rpc("eth_sendRawTransaction", "0x" + signed.raw_transaction.hex().removeprefix("0x"))
+        except Exception as e:
+            message = str(e).lower()
+            if any(marker in message for marker in _ALREADY_KNOWN):
+                # A retried broadcast of a transaction the node already has
+                return tx_hash
+            if isinstance(e, JsonRpcError):
+                raise TransactionError(str(e)) from e
+            raise
+        return tx_hash
+
+    async def _get_chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = await self._quantity("eth_chainId")
+        return self._chain_id
+
+    async def _quantity(self, method: str, *params: Any) -> int:
+        return int(await self.rpc(method, *params), 16)
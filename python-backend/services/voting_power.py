@@ -0,0 +1,178 @@
+"""
+Voting Power Store
+Checkpointed NXD balance and stake history from indexed token events, for voting power at any block
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import and_, delete, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from models.chain_index import ChainEvent, GovernanceProposal, PowerCheckpoint
+
+logger = structlog.get_logger()
+
+# Mints come from and burns go to the zero address, so its checkpoints carry the totals
+SUPPLY_ACCOUNT = "0x" + "00" * 20
+
+# Accounts per IN (...) lookup
+_LOOKUP_CHUNK = 500
+
+class VotingPowerStore:
+    """
+    Event indexer projection recording, per account, the NXD liquid balance and
+    stake after every block in which they changed.
+
+    Transfer, Staked and Unstaked events of each batch are summed into per-account,
+    per-block deltas and written as absolute checkpoints, so a batch only touches
+    the accounts it moved. Lookups at any block take each account's latest
+    checkpoint at or before it: a seek on the (network, account, block) key, whose
+    cost grows with the log of the history and does not depend on the holder count.
+
+    Every `compact_blocks` blocks, history older than `retain_blocks` (and older than
+    the snapshot of every proposal still open) is folded into one checkpoint per
+    account, so lookups stay exact at any block from that horizon on. The history is
+    complete only when the indexer follows the token from its deployment, i.e. with
+    a configured start block.
+    """
+
+    def __init__(self, event_indexer, retain_blocks: int = 50400, compact_blocks: int = 7200):
+        self.indexer = event_indexer
+        self.session_factory = event_indexer.session_factory
+        self.network = event_indexer.network
+        # Rollbacks rewrite at most reorg_depth blocks, which must stay uncompacted
+        self.retain_blocks = max(retain_blocks, event_indexer.reorg_depth)
+        self.compact_blocks = compact_blocks
+        self._compacted_at: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.indexer.start_block is not None and self.indexer.indexes("nxd_token")
+
+    async def apply(self, session: AsyncSession, events: Iterable[ChainEvent], to_block: int):
+        deltas: Dict[str, Dict[int, List[int]]] = {}
+
+        def add(account: str, block_number: int, balance: int = 0, staked: int = 0):
+            delta = deltas.setdefault(account, {}).setdefault(block_number, [0, 0])
+            delta[0] += balance
+            delta[1] += staked
+
+        for event in events:
+            if event.contract != "nxd_token":
+                continue
+            if event.event == "Transfer":
+                value = int(event.args["value"])
+                add(event.args["from"], event.block_number, balance=-value)
+                add(event.args["to"], event.block_number, balance=value)
+            elif event.event == "Staked":
+                amount = int(event.args["amount"])
+                add(event.account, event.block_number, staked=amount)
+                add(SUPPLY_ACCOUNT, event.block_number, staked=amount)
+            elif event.event == "Unstaked":
+                amount = int(event.args["amount"])
+                add(event.account, event.block_number, staked=-amount)
+                add(SUPPLY_ACCOUNT, event.block_number, staked=-amount)
+
+        if SUPPLY_ACCOUNT in deltas:
+            # A mint lowers the zero address "balance" by the amount; negated, that is the supply
+            for delta in deltas[SUPPLY_ACCOUNT].values():
+                delta[0] = -delta[0]
+
+        if deltas:
+            latest = await self._latest(session, list(deltas), to_block)
+            for account, by_block in deltas.items():
+                balance, staked = latest.get(account, (0, 0))
+                for block_number in sorted(by_block):
+                    balance += by_block[block_number][0]
+                    staked += by_block[block_number][1]
+                    session.add(PowerCheckpoint(
+                        network=self.network,
+                        account=account,
+                        block_number=block_number,
+                        balance=str(balance),
+                        staked=str(staked)
+                    ))
+
+        if self._compacted_at is None or to_block - self._compacted_at >= self.compact_blocks:
+            await self.compact(session, to_block)
+            self._compacted_at = to_block
+
+    async def rollback(self, session: AsyncSession, fork_block: int):
+        # Checkpoints are absolute values, so dropping those above the fork restores the state
+        await session.execute(delete(PowerCheckpoint).where(
+            PowerCheckpoint.network == self.network, PowerCheckpoint.block_number > fork_block
+        ))
+
+    async def compact(self, session: AsyncSession, to_block: int):
+        """Keep only each account's last checkpoint at or below the retention horizon"""
+        horizon = to_block - self.retain_blocks
+        open_snapshot = (await session.execute(
+            select(func.min(GovernanceProposal.snapshot_block)).where(
+                GovernanceProposal.network == self.network,
+                GovernanceProposal.end_block >= to_block,
+                GovernanceProposal.canceled_block.is_(None)
+            )
+        )).scalar_one_or_none()
+        if open_snapshot is not None:
+            horizon = min(horizon, open_snapshot)
+        if horizon <= 0:
+            return
+
+        newer = aliased(PowerCheckpoint)
+        result = await session.execute(delete(PowerCheckpoint).where(
+            PowerCheckpoint.network == self.network,
+            PowerCheckpoint.block_number < horizon,
+            exists().where(
+                newer.network == PowerCheckpoint.network,
+                newer.account == PowerCheckpoint.account,
+                newer.block_number > PowerCheckpoint.block_number,
+                newer.block_number <= horizon
+            )
+        ))
+        if result.rowcount:
+            logger.info("Voting power history compacted", network=self.network, horizon=horizon, removed=result.rowcount)
+
+    async def _latest(self, session: AsyncSession, accounts: List[str], block_number: int) -> Dict[str, Tuple[int, int]]:
+        """(balance, staked) of each account as of `block_number`; absent accounts hold nothing"""
+        balances: Dict[str, Tuple[int, int]] = {}
+        for start in range(0, len(accounts), _LOOKUP_CHUNK):
+            chunk = accounts[start:start + _LOOKUP_CHUNK]
+            latest = (
+                select(PowerCheckpoint.account, func.max(PowerCheckpoint.block_number).label("block_number"))
+                .where(
+                    PowerCheckpoint.network == self.network,
+                    PowerCheckpoint.account.in_(chunk),
+                    PowerCheckpoint.block_number <= block_number
+                )
+                .group_by(PowerCheckpoint.account)
+                .subquery()
+            )
+            rows = (await session.execute(
+                select(PowerCheckpoint).join(latest, and_(
+                    PowerCheckpoint.account == latest.c.account,
+                    PowerCheckpoint.block_number == latest.c.block_number
+                )).where(PowerCheckpoint.network == self.network)
+            )).scalars().all()
+            for row in rows:
+                balances[row.account] = (int(row.balance), int(row.staked))
+        return balances
+
+    async def balances_at(
+        self,
+        accounts: List[str],
+        block_number: int,
+        session: Optional[AsyncSession] = None
+    ) -> Dict[str, Tuple[int, int]]:
+        """(liquid balance, staked amount) of each account at the end of `block_number`"""
+        accounts = [account.lower() for account in accounts]
+        if session is None:
+            async with self.session_factory() as session:
+                latest = await self._latest(session, accounts, block_number)
+        else:
+            latest = await self._latest(session, accounts, block_number)
+        return {account: latest.get(account, (0, 0)) for account in accounts}
+
+    async def supply_at(self, block_number: int, session: Optional[AsyncSession] = None) -> Tuple[int, int]:
+        """(total supply, total staked) at the end of `block_number`"""
+        return (await self.balances_at([SUPPLY_ACCOUNT], block_number, session))[SUPPLY_ACCOUNT]